@@ -1,10 +1,23 @@
 from flask import Flask
 from flask_cors import CORS
 from config import Config
+from commands import register_commands
 from database import init_db
 from routes.task_routes import task_bp
+from routes.admin_routes import admin_bp
+from routes.health_routes import health_bp
+from routes.job_routes import job_bp
+from storage import init_storage
+from utils import cooperative
+from jobs.worker import register_jobs
+from utils.health_monitor import register_health_monitor
+from utils.dependency_cache import register_dependency_cache
 from utils.error_handlers import register_error_handlers
 from utils.logger import setup_logger
+from utils.profiler import register_profiler
+from utils.query_stats import register_query_stats
+from utils.sessions import register_causal_sessions
+from utils.write_coalescer import register_write_coalescing
 import logging
 
 def create_app(config_class=Config):
@@ -13,6 +26,7 @@ def create_app(config_class=Config):
     """
     app = Flask(__name__)
     app.config.from_object(config_class)
+    cooperative.check_app(app)
     
     # Setup logger
     setup_logger(app)
@@ -21,15 +35,42 @@ def create_app(config_class=Config):
     # Initialize CORS
     CORS(app)
     
+    # Initialize profiling, query statistics and the health monitor (their
+    # listeners must be attached before the client exists)
+    register_profiler(app)
+    register_query_stats(app)
+    register_health_monitor(app)
+    
     # Initialize database
     init_db(app)
     
+    # Task storage backend (MongoDB, or in-memory for tests and local dev)
+    init_storage(app)
+    
+    # Causally consistent sessions for read-your-writes on secondaries
+    register_causal_sessions(app)
+    
+    # Optional coalescing of bursts of writes to the same task
+    register_write_coalescing(app)
+    
+    # Dependency graphs of hot tenants kept in memory
+    register_dependency_cache(app)
+    
     # Register blueprints
     app.register_blueprint(task_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(job_bp, url_prefix='/api')
+    app.register_blueprint(health_bp)
     
     # Register error handlers
     register_error_handlers(app)
     
+    # Optional in-process job worker
+    register_jobs(app)
+    
+    # Register CLI commands
+    register_commands(app)
+    
     app.logger.info("Application initialized successfully")
     
     return app
@@ -0,0 +1 @@
+# benchmarks - Performance benchmarks and load tests for the Task API
@@ -0,0 +1,142 @@
+# benchmarks/bench_dependencies.py - Dependency graph traversal benchmark
+"""
+Seed one tenant with a project-shaped dependency graph (every task depends
+on up to three of the tasks created shortly before it) and time the
+dependency closure and unblocked-task endpoints, served by the storage
+backend's traversal ($graphLookup, recursive CTE) and by the in-process
+graph cache.
+
+Usage:
+    python -m benchmarks.bench_dependencies                       # 10k tasks, memory backend
+    python -m benchmarks.bench_dependencies --backend mongo --nodes 10000
+    python -m benchmarks.bench_dependencies --backend sqlite --update-baseline
+"""
+import argparse
+import random
+import sys
+import time
+from bson import ObjectId
+from config import Config
+from models.task import Task
+from storage import BACKENDS
+from utils.dependency_cache import DependencyCache, DependencyGraph
+from benchmarks.bench_tasks import create_bench_app
+from benchmarks.harness import (
+    BenchmarkResult, run_benchmark, load_baselines, save_baselines, compare_to_baselines, print_report
+)
+from benchmarks.seed import generate_task_documents
+
+
+def generate_graph(count, rng=None, window=50):
+    """
+    Generate tasks forming a dependency DAG
+
+    Args:
+        count: Number of tasks
+        rng: Optional random.Random instance for reproducible data
+        window: Dependencies are picked among this many preceding tasks
+
+    Returns:
+        List of task documents with _id and depends_on set
+    """
+    rng = rng or random.Random(42)
+    documents = generate_task_documents(count, rng=rng)
+    for i, document in enumerate(documents):
+        document['_id'] = ObjectId()
+        earlier = range(max(0, i - window), i)
+        document['depends_on'] = [documents[j]['_id'] for j in rng.sample(earlier, min(len(earlier), rng.randint(0, 3)))]
+    return documents
+
+
+def bench_paths(app, client, documents, iterations):
+    """Time both endpoints through the backend traversal, then the cached graph"""
+    results = []
+    target = documents[-1]['_id']
+    tenant = Task.resolve_tenant()
+
+    def closure():
+        response = client.get(f'/api/tasks/{target}/dependencies')
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    def closure_ids():
+        response = client.get(f'/api/tasks/{target}/dependencies?ids_only=true')
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    def unblocked():
+        response = client.get('/api/tasks/unblocked?limit=20')
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    previous = app.extensions.pop('dependency_cache', None)
+    try:
+        results.append(run_benchmark(f'dependencies:backend:n={len(documents)}', closure, iterations=iterations))
+        results.append(run_benchmark(f'dependency_ids:backend:n={len(documents)}', closure_ids, iterations=iterations))
+        results.append(run_benchmark(f'unblocked:backend:n={len(documents)}', unblocked, iterations=iterations))
+
+        timings = []
+        for _ in range(max(3, iterations // 10)):
+            start = time.perf_counter()
+            DependencyGraph(Task.backend().dependency_edges(tenant))
+            timings.append(time.perf_counter() - start)
+        results.append(BenchmarkResult(f'graph_build:n={len(documents)}', timings))
+
+        app.extensions['dependency_cache'] = DependencyCache(max_tenants=1, ttl=3600, hot_reads=1)
+        results.append(run_benchmark(f'dependencies:cached:n={len(documents)}', closure, iterations=iterations))
+        results.append(run_benchmark(f'dependency_ids:cached:n={len(documents)}', closure_ids, iterations=iterations))
+        results.append(run_benchmark(f'unblocked:cached:n={len(documents)}', unblocked, iterations=iterations))
+    finally:
+        app.extensions.pop('dependency_cache', None)
+        if previous is not None:
+            app.extensions['dependency_cache'] = previous
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark dependency graph traversals')
+    parser.add_argument('--nodes', type=int, default=10000, help='Tasks in the dependency graph')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--mongomock', action='store_true', help='Use mongomock instead of a local mongod')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='memory')
+    parser.add_argument('--baseline-file', default=Config.BENCHMARK_BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=Config.BENCHMARK_REGRESSION_THRESHOLD,
+                        help='Allowed fractional throughput drop before failing')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    app = create_bench_app(use_mongomock=args.mongomock, backend=args.backend)
+
+    with app.app_context():
+        backend = Task.backend()
+        tenant = Task.resolve_tenant()
+        backend.clear(tenant)
+        documents = generate_graph(args.nodes)
+        backend.insert_many(tenant, documents)
+        print(f"Seeded a dependency graph of {len(documents)} tasks", file=sys.stderr)
+
+        try:
+            results = bench_paths(app, app.test_client(), documents, args.iterations)
+        finally:
+            backend.clear(tenant)
+
+    # Keep each backend's baselines apart from the MongoDB ones
+    if args.backend != 'mongo':
+        for result in results:
+            result.name = f'{result.name}@{args.backend}'
+
+    baselines = load_baselines(args.baseline_file)
+    print_report(results, baselines)
+
+    if args.update_baseline:
+        save_baselines(results, args.baseline_file, existing=baselines)
+        print(f"Baselines written to {args.baseline_file}")
+        return 0
+
+    regressions = compare_to_baselines(results, baselines, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# benchmarks/bench_gevent.py - Thousands of concurrent clients against one worker
+"""
+Start a single gunicorn worker in gevent mode (and, for contrast, a single
+gthread worker) and hold --clients concurrent keep-alive connections
+against it. The clients are greenlets too, so one load process can open
+thousands of connections.
+
+Requires gevent. With --backend mongo (a local mongod) the requests wait on
+MongoDB round trips, which is where greenlets overlap requests; the memory
+backend measures connection handling alone.
+
+Usage:
+    python -m benchmarks.bench_gevent --clients 2000 --duration 15
+"""
+from utils import cooperative
+
+# The load generator's threads and sockets become greenlets
+cooperative.patch()
+
+import argparse
+import os
+import resource
+import sys
+from benchmarks.bench_serving import start_server, stop_server, wait_until_ready, print_comparison
+from benchmarks.harness import save_baselines
+from benchmarks.load import HttpTarget, run_load
+
+
+def raise_file_limit(needed):
+    """Raise the open file limit towards needed (client and server sockets share it)"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    return max(soft, target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent connections per gevent worker')
+    parser.add_argument('--clients', type=int, default=2000, help='Concurrent keep-alive clients')
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--path', default='/api/tasks?limit=20')
+    parser.add_argument('--servers', default='gunicorn-gevent,gunicorn-gthread')
+    parser.add_argument('--backend', choices=['memory', 'sqlite', 'mongo'], default='memory')
+    parser.add_argument('--seed', type=int, default=1000, help='Tasks seeded before serving')
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    limit = raise_file_limit(args.clients * 2 + 256)
+    if limit < args.clients * 2 + 256:
+        print(f"open file limit is {limit}; some of {args.clients} clients may fail to connect", file=sys.stderr)
+
+    env = dict(
+        os.environ,
+        APP_CONFIG=os.environ.get('APP_CONFIG', 'production'),
+        LOG_LEVEL='WARNING',
+        STORAGE_BACKEND=args.backend,
+        BENCH_SEED_TASKS=str(args.seed),
+        GUNICORN_WORKERS='1',
+        GUNICORN_WORKER_CONNECTIONS=str(args.clients + 100),
+        GUNICORN_MAX_REQUESTS='0',
+        # Idle keep-alive connections must outlive the run
+        GUNICORN_KEEPALIVE=str(int(args.duration) + 30)
+    )
+    rows = []
+
+    for name in args.servers.split(','):
+        process = start_server(name, args.port, env)
+        try:
+            if not wait_until_ready(args.port):
+                print(f"{name} did not become ready", file=sys.stderr)
+                continue
+
+            target = HttpTarget(f'http://127.0.0.1:{args.port}', timeout=args.duration + 30)
+            result = run_load(target, f'gevent:{name}:c={args.clients}', 'GET', args.path,
+                              concurrency=args.clients, duration=args.duration)
+            rows.append((args.path, name, True, args.clients, result))
+        finally:
+            stop_server(process)
+
+    print_comparison(rows)
+
+    if args.output:
+        save_baselines([row[-1] for row in rows], args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
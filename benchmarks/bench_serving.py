@@ -0,0 +1,255 @@
+# benchmarks/bench_serving.py - Throughput and latency of the app under different servers
+"""
+Start each server one after the other against the same seeded app
+(benchmarks/serve_app.py) and drive every endpoint with concurrent HTTP/1.1
+clients, with and without keep-alive, at several payload sizes. Prints
+requests per second and latency percentiles per endpoint, server and
+connection mode.
+
+Servers whose packages are not installed (gevent, uvicorn + asgiref,
+hypercorn) are skipped with a message.
+
+Usage:
+    python -m benchmarks.bench_serving --backend memory --concurrency 8,64 --duration 10
+    python -m benchmarks.bench_serving --servers werkzeug,gunicorn-gthread --keep-alive on
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from benchmarks.harness import save_baselines
+from benchmarks.load import HttpTarget, run_load
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP = 'benchmarks.serve_app:app'
+
+
+def gunicorn(worker_class, *extra):
+    """Command line for gunicorn.conf.py with a given worker class"""
+    def command(port):
+        return [
+            sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+            '--bind', f'127.0.0.1:{port}', '--worker-class', worker_class, *extra, APP
+        ]
+    return command
+
+
+# Server name -> (modules it needs, command line for a port)
+SERVERS = {
+    'werkzeug': ((), lambda port: [
+        sys.executable, '-c',
+        'from benchmarks.serve_app import app; '
+        f'app.run(host="127.0.0.1", port={port}, threaded=True, use_reloader=False)'
+    ]),
+    'gunicorn-sync': (('gunicorn',), gunicorn('sync', '--threads', '1')),
+    'gunicorn-gthread': (('gunicorn',), gunicorn('gthread')),
+    'gunicorn-gevent': (('gunicorn', 'gevent'), gunicorn('gevent')),
+    'uvicorn': (('uvicorn', 'asgiref'), lambda port: [
+        sys.executable, '-m', 'uvicorn', '--factory', 'benchmarks.serve_app:asgi_app',
+        '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'
+    ]),
+    # Hypercorn serves WSGI apps directly and speaks HTTP/2 (h2c or TLS)
+    'hypercorn': (('hypercorn',), lambda port: [
+        sys.executable, '-m', 'hypercorn', '--bind', f'127.0.0.1:{port}', APP
+    ])
+}
+
+# Extra environment per server: gevent mode patches in the gunicorn master
+# before the app is preloaded (see gunicorn.conf.py)
+SERVER_ENV = {
+    'gunicorn-gevent': {'CONCURRENCY_MODE': 'gevent'}
+}
+
+# Payload size -> list page size and created task description length
+PAYLOADS = {
+    'small': {'limit': 5, 'description': 16},
+    'medium': {'limit': 20, 'description': 200},
+    'large': {'limit': 100, 'description': 1000}
+}
+
+# Endpoint -> (uses payload size, request builder for a payload and a task ID)
+ENDPOINTS = {
+    'health': (False, lambda payload, task_id: ('GET', '/api/health', None)),
+    'list': (True, lambda payload, task_id: ('GET', f"/api/tasks?limit={payload['limit']}", None)),
+    'get': (False, lambda payload, task_id: ('GET', f'/api/tasks/{task_id}', None)),
+    'stats': (False, lambda payload, task_id: ('GET', '/api/tasks/stats', None)),
+    'create': (True, lambda payload, task_id: ('POST', '/api/tasks', {
+        'title': 'Benchmark task',
+        'description': 'x' * payload['description'],
+        'priority': 'medium'
+    }))
+}
+
+
+def missing_modules(name):
+    """Modules a server needs that are not installed"""
+    return [module for module in SERVERS[name][0] if importlib.util.find_spec(module) is None]
+
+
+def build_cases(endpoints, payloads, task_id):
+    """
+    Expand endpoints and payload sizes into load cases
+
+    Endpoints that do not depend on the payload size run once.
+
+    Returns:
+        List of (label, method, path, body)
+    """
+    cases = []
+    for endpoint in endpoints:
+        sized, build = ENDPOINTS[endpoint]
+        for payload in (payloads if sized else payloads[:1]):
+            label = f'{endpoint}:{payload}' if sized else endpoint
+            cases.append((label, *build(PAYLOADS[payload], task_id)))
+    return cases
+
+
+def request_json(port, method, path):
+    """Send one request and decode the JSON response, or None if the server is not answering"""
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+        conn.request(method, path)
+        response = conn.getresponse()
+        if response.status != 200:
+            return None
+        return json.loads(response.read())
+    except (OSError, ValueError):
+        return None
+
+
+def wait_until_ready(port, timeout=30):
+    """Poll the health endpoint until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if request_json(port, 'GET', '/api/health') is not None:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def start_server(name, port, env):
+    """Launch a server in its own process group"""
+    return subprocess.Popen(
+        SERVERS[name][1](port), cwd=ROOT, env=dict(env, **SERVER_ENV.get(name, {})),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def stop_server(process):
+    """Stop a server and all of its workers"""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def print_comparison(rows):
+    """
+    Print one table per endpoint comparing servers and connection modes
+
+    Args:
+        rows: List of (case label, server, keep_alive, concurrency, LoadResult)
+    """
+    for label in dict.fromkeys(row[0] for row in rows):
+        print(f"\n{label}")
+        print(f"{'server':<20} {'conn':<6} {'c':>5} {'req/s':>10} {'p50 ms':>9} "
+              f"{'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        print('-' * 82)
+
+        for _, server, keep_alive, concurrency, result in (row for row in rows if row[0] == label):
+            stats = result.to_dict()
+            print(
+                f"{server:<20} {'keep' if keep_alive else 'close':<6} {concurrency:>5} "
+                f"{stats['ops_per_sec']:>10.1f} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                f"{stats['p99_ms']:>9.2f} {result.errors:>7}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare serving throughput and latency')
+    parser.add_argument('--servers', default=','.join(SERVERS))
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--payloads', default='small,large', help=f"Comma separated: {', '.join(PAYLOADS)}")
+    parser.add_argument('--keep-alive', choices=['on', 'off', 'both'], default='both')
+    parser.add_argument('--concurrency', default='32', help='Comma separated client counts')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per case')
+    parser.add_argument('--warmup', type=float, default=1.0, help='Untimed seconds before each case')
+    parser.add_argument('--backend', choices=['memory', 'sqlite', 'mongo'], default='memory',
+                        help='Storage backend the servers use (mongo needs a local mongod)')
+    parser.add_argument('--seed', type=int, default=1000, help='Tasks seeded before serving')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    endpoints = args.endpoints.split(',')
+    payloads = args.payloads.split(',')
+    for value, known in [(endpoints, ENDPOINTS), (payloads, PAYLOADS), (args.servers.split(','), SERVERS)]:
+        unknown = [item for item in value if item not in known]
+        if unknown:
+            parser.error(f"unknown value(s): {', '.join(unknown)}")
+
+    modes = {'on': [True], 'off': [False], 'both': [True, False]}[args.keep_alive]
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    env = dict(
+        os.environ,
+        APP_CONFIG=os.environ.get('APP_CONFIG', 'production'),
+        LOG_LEVEL='WARNING',
+        STORAGE_BACKEND=args.backend,
+        SQLITE_PATH=os.path.join(ROOT, 'data', 'tasks_serving.db'),
+        BENCH_SEED_TASKS=str(args.seed),
+        GUNICORN_WORKERS=str(args.workers),
+        # Workers would otherwise recycle mid-run and lose in-memory tasks
+        GUNICORN_MAX_REQUESTS='0'
+    )
+    rows = []
+
+    for name in args.servers.split(','):
+        missing = missing_modules(name)
+        if missing:
+            print(f"skipping {name}: {', '.join(missing)} not installed", file=sys.stderr)
+            continue
+
+        process = start_server(name, args.port, env)
+        try:
+            if not wait_until_ready(args.port):
+                print(f"{name} did not become ready", file=sys.stderr)
+                continue
+
+            page = request_json(args.port, 'GET', '/api/tasks?limit=1') or {}
+            tasks = page.get('data', {}).get('tasks') or [{'id': '000000000000000000000000'}]
+
+            for label, method, path, body in build_cases(endpoints, payloads, tasks[0]['id']):
+                for keep_alive in modes:
+                    for concurrency in levels:
+                        target = HttpTarget(f'http://127.0.0.1:{args.port}', keep_alive=keep_alive)
+                        if args.warmup:
+                            run_load(target, 'warmup', method, path, body,
+                                     concurrency=concurrency, duration=args.warmup)
+
+                        result_name = (f"serve:{name}:{label}:c={concurrency}:"
+                                       f"{'keep' if keep_alive else 'close'}")
+                        result = run_load(target, result_name, method, path, body,
+                                          concurrency=concurrency, duration=args.duration)
+                        rows.append((label, name, keep_alive, concurrency, result))
+        finally:
+            stop_server(process)
+
+    print_comparison(rows)
+
+    if args.output:
+        save_baselines([row[-1] for row in rows], args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# benchmarks/bench_startup.py - Cold-start time benchmark
+"""
+Measure import and create_app time in fresh interpreters.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --update-baseline
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from config import Config
+from benchmarks.harness import (
+    BenchmarkResult, load_baselines, save_baselines, compare_to_baselines, print_report
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({'import': imported - start, 'create_app': created - imported}))
+"""
+
+
+def measure(runs, env):
+    """Run the probe in fresh interpreters and collect its timings"""
+    timings = {'import': [], 'create_app': [], 'total': []}
+
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        sample = json.loads(output)
+        timings['import'].append(sample['import'])
+        timings['create_app'].append(sample['create_app'])
+        timings['total'].append(sample['import'] + sample['create_app'])
+
+    return [BenchmarkResult(f'startup:{phase}', values) for phase, values in timings.items()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark application startup time')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--baseline-file', default=Config.BENCHMARK_BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=Config.BENCHMARK_REGRESSION_THRESHOLD)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, LOG_LEVEL=os.environ.get('LOG_LEVEL', 'WARNING'))
+    results = measure(args.runs, env)
+
+    baselines = load_baselines(args.baseline_file)
+    print_report(results, baselines)
+
+    if args.update_baseline:
+        save_baselines(results, args.baseline_file, existing=baselines)
+        return 0
+
+    regressions = compare_to_baselines(results, baselines, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
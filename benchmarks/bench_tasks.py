@@ -0,0 +1,190 @@
+# benchmarks/bench_tasks.py - Endpoint and model micro-benchmarks
+"""
+Benchmark every task endpoint against a local MongoDB (or mongomock), the
+embedded SQLite backend, or the in-memory storage backend as a baseline
+free of database time.
+
+Usage:
+    python -m benchmarks.bench_tasks                      # compare against baselines
+    python -m benchmarks.bench_tasks --update-baseline    # record new baselines
+    python -m benchmarks.bench_tasks --sizes 10000,100000 --mongomock
+    python -m benchmarks.bench_tasks --backend memory     # in-memory baseline
+    python -m benchmarks.bench_tasks --backend sqlite     # compare SQLite latency
+
+Exits with status 1 when any case is slower than its baseline by more
+than the configured threshold (BENCHMARK_REGRESSION_THRESHOLD).
+"""
+import argparse
+import logging
+import random
+import sys
+from bson import ObjectId
+from app import create_app
+from config import Config, TestingConfig
+from database import Database
+from models.task import Task
+from storage import BACKENDS
+from benchmarks.harness import (
+    run_benchmark, load_baselines, save_baselines, compare_to_baselines, print_report
+)
+from benchmarks.seed import generate_task_documents, seed_tasks
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+# (name, query string) pairs exercised against every dataset size
+GET_TASKS_CASES = [
+    ('page_1', 'page=1&limit=20'),
+    ('page_10', 'page=10&limit=20'),
+    ('page_100', 'page=100&limit=20'),
+    ('priority_high', 'priority=high&limit=20'),
+    ('completed_false', 'completed=false&limit=20'),
+    ('status_in_progress_page_10', 'status=in_progress&page=10&limit=20'),
+    ('sort_due_date_asc', 'sort_by=due_date&sort_order=asc&limit=20')
+]
+
+
+class BenchmarkConfig(TestingConfig):
+    """Benchmark configuration"""
+    DATABASE_NAME = 'taskmanagement_bench'
+    LOG_LEVEL = 'WARNING'
+    STORAGE_BACKEND = 'mongo'
+    SQLITE_PATH = 'data/tasks_bench.db'
+
+
+def create_bench_app(use_mongomock=False, backend='mongo'):
+    """Create an application wired to the benchmark database or storage backend"""
+    BenchmarkConfig.STORAGE_BACKEND = backend
+    if use_mongomock:
+        try:
+            import mongomock
+        except ImportError:
+            raise SystemExit('mongomock is not installed: pip install mongomock')
+        Database.client_class = mongomock.MongoClient
+
+    app = create_app(BenchmarkConfig)
+    logging.getLogger().setLevel(logging.WARNING)
+    return app
+
+
+def bench_serialize(iterations):
+    """Benchmark Task.serialize on a page worth of documents"""
+    documents = generate_task_documents(100)
+    for document in documents:
+        document['_id'] = ObjectId()
+
+    def serialize_page():
+        for document in documents:
+            Task.serialize(document)
+
+    return run_benchmark('serialize:page_100', serialize_page,
+                         iterations=iterations, operations_per_call=len(documents))
+
+
+def bench_create_task(client, iterations):
+    """Benchmark POST /api/tasks"""
+    payload = {
+        'title': 'Benchmark create',
+        'description': 'Created by the benchmark suite',
+        'priority': 'high',
+        'status': 'pending',
+        'due_date': '2030-12-31T23:59:59'
+    }
+
+    def create():
+        response = client.post('/api/tasks', json=payload)
+        assert response.status_code == 201, response.get_data(as_text=True)
+
+    return run_benchmark('create_task', create, iterations=iterations)
+
+
+def bench_get_tasks(client, size, iterations):
+    """Benchmark GET /api/tasks across page depths and filters"""
+    results = []
+
+    for case, query in GET_TASKS_CASES:
+        def get_tasks(query=query):
+            response = client.get(f'/api/tasks?{query}')
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+        results.append(run_benchmark(f'get_tasks:{case}:n={size}', get_tasks, iterations=iterations))
+
+    return results
+
+
+def bench_get_task_stats(client, size, iterations):
+    """Benchmark GET /api/tasks/stats"""
+    def get_stats():
+        response = client.get('/api/tasks/stats')
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    return run_benchmark(f'get_task_stats:n={size}', get_stats, iterations=iterations)
+
+
+def run_suite(app, sizes, iterations):
+    """Run all benchmark cases and return their results"""
+    client = app.test_client()
+    backend = Task.backend()
+    tenant = Task.resolve_tenant()
+    rng = random.Random(42)
+    results = []
+
+    results.append(bench_serialize(iterations))
+
+    backend.clear(tenant)
+    results.append(bench_create_task(client, iterations))
+    backend.clear(tenant)
+
+    for size in sorted(sizes):
+        inserted = seed_tasks(backend, size, tenant=tenant, rng=rng)
+        print(f"Seeded {inserted} tasks (total {size})", file=sys.stderr)
+
+        results.extend(bench_get_tasks(client, size, iterations))
+        # Aggregations over large collections are slow; scale iterations down
+        results.append(bench_get_task_stats(client, size, max(3, iterations // max(1, size // 10000))))
+
+    backend.clear(tenant)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Task API')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma separated dataset sizes to seed')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--mongomock', action='store_true', help='Use mongomock instead of a local mongod')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='mongo',
+                        help='Task storage backend (memory gives a baseline without database time)')
+    parser.add_argument('--baseline-file', default=Config.BENCHMARK_BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=Config.BENCHMARK_REGRESSION_THRESHOLD,
+                        help='Allowed fractional throughput drop before failing')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    app = create_bench_app(use_mongomock=args.mongomock, backend=args.backend)
+
+    with app.app_context():
+        results = run_suite(app, sizes, args.iterations)
+
+    # Keep each backend's baselines apart from the MongoDB ones
+    if args.backend != 'mongo':
+        for result in results:
+            result.name = f'{result.name}@{args.backend}'
+
+    baselines = load_baselines(args.baseline_file)
+    print_report(results, baselines)
+
+    if args.update_baseline:
+        save_baselines(results, args.baseline_file, existing=baselines)
+        print(f"Baselines written to {args.baseline_file}")
+        return 0
+
+    regressions = compare_to_baselines(results, baselines, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# benchmarks/bench_timestamps.py - Timestamp parse/format benchmark
+"""
+Compare the timestamp codec against the previous per-value code path.
+
+Usage:
+    python -m benchmarks.bench_timestamps
+    python -m benchmarks.bench_timestamps --update-baseline
+"""
+import argparse
+import random
+import sys
+from datetime import datetime
+from bson import ObjectId
+from config import Config
+from models.task import Task
+from utils.timestamps import parse_iso
+from benchmarks.harness import (
+    run_benchmark, load_baselines, save_baselines, compare_to_baselines, print_report
+)
+from benchmarks.seed import generate_task_documents
+
+
+def legacy_parse(value):
+    """Due date parsing as previously done in Task.create/update"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def parse_many(values):
+    """Parse a batch of ISO due dates with the codec, each distinct string once (falsy values map to None)"""
+    memo = {}
+    parsed = []
+
+    for value in values:
+        if not value:
+            parsed.append(None)
+            continue
+
+        result = memo.get(value)
+        if result is None:
+            result = memo[value] = parse_iso(value)
+        parsed.append(result)
+
+    return parsed
+
+
+def legacy_serialize(task):
+    """Task.serialize as it was before the timestamp codec"""
+    return {
+        'id': str(task['_id']),
+        'title': task.get('title', ''),
+        'description': task.get('description', ''),
+        'completed': task.get('completed', False),
+        'priority': task.get('priority', 'medium'),
+        'status': task.get('status', 'pending'),
+        'due_date': task['due_date'].isoformat() if task.get('due_date') else None,
+        'created_at': task['created_at'].isoformat() if task.get('created_at') else None,
+        'updated_at': task['updated_at'].isoformat() if task.get('updated_at') else None
+    }
+
+
+def generate_due_dates(count, distinct, rng):
+    """Generate ISO due dates drawn from a small set of distinct values"""
+    pool = [f'2025-{month:02d}-{day:02d}T17:00:00Z'
+            for month in range(1, 13) for day in range(1, 29)][:distinct]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark timestamp parsing and formatting')
+    parser.add_argument('--batch', type=int, default=10000, help='Due dates per import batch')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--baseline-file', default=Config.BENCHMARK_BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=Config.BENCHMARK_REGRESSION_THRESHOLD)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    due_dates = generate_due_dates(args.batch, 60, rng)
+    page = generate_task_documents(100, rng=rng)
+    for document in page:
+        document['_id'] = ObjectId()
+
+    results = [
+        run_benchmark('timestamps:parse_batch:legacy', lambda: [legacy_parse(value) for value in due_dates],
+                      iterations=args.iterations, operations_per_call=len(due_dates)),
+        run_benchmark('timestamps:parse_batch:codec', lambda: parse_many(due_dates),
+                      iterations=args.iterations, operations_per_call=len(due_dates)),
+        run_benchmark('timestamps:serialize_page:legacy', lambda: [legacy_serialize(task) for task in page],
+                      iterations=args.iterations * 10, operations_per_call=len(page)),
+        run_benchmark('timestamps:serialize_page:codec', lambda: Task.serialize_many(page),
+                      iterations=args.iterations * 10, operations_per_call=len(page))
+    ]
+
+    baselines = load_baselines(args.baseline_file)
+    print_report(results, baselines)
+
+    if args.update_baseline:
+        save_baselines(results, args.baseline_file, existing=baselines)
+        return 0
+
+    regressions = compare_to_baselines(results, baselines, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# benchmarks/bench_validators.py - Task payload validation benchmark
+"""
+Validate a large number of task payloads through the compiled schema.
+
+Usage:
+    python -m benchmarks.bench_validators                  # 1M payloads
+    python -m benchmarks.bench_validators --payloads 100000 --update-baseline
+"""
+import argparse
+import random
+import sys
+from config import Config
+from utils.validators import validate_task_data
+from benchmarks.harness import (
+    BenchmarkResult, load_baselines, save_baselines, compare_to_baselines, print_report
+)
+import time
+
+
+def generate_payloads(count, rng=None):
+    """Generate a mix of valid and invalid task payloads"""
+    rng = rng or random.Random(42)
+    payloads = []
+
+    for i in range(count):
+        payload = {
+            'title': f'Imported task {i}',
+            'description': 'x' * rng.randint(0, 200),
+            'priority': rng.choice(Config.VALID_PRIORITIES),
+            'status': rng.choice(Config.VALID_STATUSES),
+            'completed': rng.random() < 0.3
+        }
+        if rng.random() < 0.6:
+            # Imports repeat due dates heavily (end of sprint, end of month, ...)
+            payload['due_date'] = f'2025-{rng.randint(1, 12):02d}-28T17:00:00Z'
+        if rng.random() < 0.05:
+            payload['priority'] = 'urgent'
+        payloads.append(payload)
+
+    return payloads
+
+
+def bench_pass(name, func, payloads, rounds):
+    """Time full passes over the payloads"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(payloads)
+        timings.append(time.perf_counter() - start)
+    return BenchmarkResult(name, timings, operations_per_call=len(payloads))
+
+
+def validate_each(payloads):
+    for payload in payloads:
+        validate_task_data(payload)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark task payload validation')
+    parser.add_argument('--payloads', type=int, default=1000000)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--baseline-file', default=Config.BENCHMARK_BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=Config.BENCHMARK_REGRESSION_THRESHOLD)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    payloads = generate_payloads(args.payloads)
+    results = [
+        bench_pass('validate:single', validate_each, payloads, args.rounds)
+    ]
+
+    baselines = load_baselines(args.baseline_file)
+    print_report(results, baselines)
+
+    if args.update_baseline:
+        save_baselines(results, args.baseline_file, existing=baselines)
+        return 0
+
+    regressions = compare_to_baselines(results, baselines, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# benchmarks/harness.py - Timing, baseline storage and regression checks
+import json
+import math
+import os
+import statistics
+import time
+
+
+def percentile(values, pct):
+    """
+    Return the given percentile of a list of numbers
+
+    Args:
+        values: List of numbers
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Percentile value (nearest-rank), or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class BenchmarkResult:
+    """Timings collected for a single benchmark case"""
+
+    def __init__(self, name, timings, operations_per_call=1):
+        self.name = name
+        self.timings = timings
+        self.operations_per_call = operations_per_call
+
+    @property
+    def total_time(self):
+        return sum(self.timings)
+
+    @property
+    def ops_per_sec(self):
+        if not self.total_time:
+            return 0.0
+        return len(self.timings) * self.operations_per_call / self.total_time
+
+    def to_dict(self):
+        """Convert result to a JSON serializable dictionary"""
+        return {
+            'iterations': len(self.timings),
+            'ops_per_sec': round(self.ops_per_sec, 2),
+            'mean_ms': round(statistics.mean(self.timings) * 1000, 3) if self.timings else 0.0,
+            'p50_ms': round(percentile(self.timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(self.timings, 95) * 1000, 3),
+            'p99_ms': round(percentile(self.timings, 99) * 1000, 3)
+        }
+
+
+def run_benchmark(name, func, iterations=100, warmup=5, operations_per_call=1):
+    """
+    Time repeated calls of a function
+
+    Args:
+        name: Benchmark case name used for baselines
+        func: Zero-argument callable to time
+        iterations: Number of timed calls
+        warmup: Number of untimed calls made first
+        operations_per_call: Logical operations performed by one call
+
+    Returns:
+        BenchmarkResult
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return BenchmarkResult(name, timings, operations_per_call)
+
+
+def load_baselines(path):
+    """Load stored baselines, returning an empty dict if none exist yet"""
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results, path, existing=None):
+    """
+    Store benchmark results as the new baselines
+
+    Args:
+        results: List of BenchmarkResult
+        path: Baseline JSON file path
+        existing: Previously stored baselines to merge with
+    """
+    baselines = dict(existing or {})
+    for result in results:
+        baselines[result.name] = result.to_dict()
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+
+def compare_to_baselines(results, baselines, threshold):
+    """
+    Find benchmark cases whose throughput regressed
+
+    Args:
+        results: List of BenchmarkResult
+        baselines: Dictionary loaded from the baseline file
+        threshold: Allowed fractional throughput drop (0.2 = 20%)
+
+    Returns:
+        List of human readable regression messages
+    """
+    regressions = []
+
+    for result in results:
+        baseline = baselines.get(result.name)
+        if not baseline or not baseline.get('ops_per_sec'):
+            continue
+
+        minimum = baseline['ops_per_sec'] * (1 - threshold)
+        if result.ops_per_sec < minimum:
+            drop = 1 - result.ops_per_sec / baseline['ops_per_sec']
+            regressions.append(
+                f"{result.name}: {result.ops_per_sec:.1f} ops/s vs baseline "
+                f"{baseline['ops_per_sec']:.1f} ops/s ({drop:.0%} slower)"
+            )
+
+    return regressions
+
+
+def print_report(results, baselines=None):
+    """Print a table of benchmark results"""
+    baselines = baselines or {}
+
+    print(f"{'benchmark':<48} {'ops/s':>12} {'p50 ms':>10} {'p95 ms':>10} {'baseline':>12}")
+    print('-' * 96)
+
+    for result in results:
+        stats = result.to_dict()
+        baseline = baselines.get(result.name, {}).get('ops_per_sec')
+        baseline_text = f"{baseline:.1f}" if baseline else '-'
+        print(
+            f"{result.name:<48} {stats['ops_per_sec']:>12.1f} "
+            f"{stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} {baseline_text:>12}"
+        )
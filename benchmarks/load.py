@@ -0,0 +1,205 @@
+# benchmarks/load.py - Concurrent load driver for the Task API
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+from benchmarks.harness import (
+    BenchmarkResult, load_baselines, save_baselines,
+    compare_to_baselines, print_report
+)
+
+
+class TestClientTarget:
+    """Send requests through an in-process Flask test client"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def connect(self):
+        client = self.app.test_client()
+
+        def send(method, path, body=None):
+            response = client.open(path, method=method, json=body)
+            return response.status_code
+
+        return send
+
+
+class HttpTarget:
+    """Send requests to a running server over HTTP/1.1"""
+
+    def __init__(self, base_url, keep_alive=True, timeout=30):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+
+    def connect(self):
+        state = {'conn': None}
+
+        def send(method, path, body=None):
+            if state['conn'] is None:
+                state['conn'] = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+            headers = {'Connection': 'keep-alive' if self.keep_alive else 'close'}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body)
+                headers['Content-Type'] = 'application/json'
+
+            try:
+                state['conn'].request(method, path, body=payload, headers=headers)
+                response = state['conn'].getresponse()
+                response.read()
+                status = response.status
+            except (http.client.HTTPException, OSError):
+                state['conn'].close()
+                state['conn'] = None
+                raise
+
+            if not self.keep_alive:
+                state['conn'].close()
+                state['conn'] = None
+
+            return status
+
+        return send
+
+
+class LoadResult(BenchmarkResult):
+    """Result of a load run, measured as requests per second of wall time"""
+
+    def __init__(self, name, timings, elapsed, errors):
+        super().__init__(name, timings)
+        self.elapsed = elapsed
+        self.errors = errors
+
+    @property
+    def ops_per_sec(self):
+        if not self.elapsed:
+            return 0.0
+        return len(self.timings) / self.elapsed
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['errors'] = self.errors
+        return data
+
+
+def run_load(target, name, method, path, body=None, concurrency=8, duration=10.0, max_requests=None):
+    """
+    Drive concurrent requests against a target
+
+    Args:
+        target: TestClientTarget or HttpTarget
+        name: Result name used for baselines
+        method: HTTP method
+        path: Request path (including query string)
+        body: Optional JSON body
+        concurrency: Number of worker threads, each with its own connection
+        duration: Seconds to keep sending requests
+        max_requests: Optional cap on the total number of requests
+
+    Returns:
+        LoadResult
+    """
+    timings = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        send = target.connect()
+        local_timings = []
+        local_errors = 0
+
+        while time.perf_counter() < deadline:
+            if max_requests is not None:
+                with lock:
+                    if len(timings) + len(local_timings) >= max_requests:
+                        break
+
+            start = time.perf_counter()
+            try:
+                status = send(method, path, body)
+                if status >= 400:
+                    local_errors += 1
+            except Exception:
+                local_errors += 1
+                continue
+            local_timings.append(time.perf_counter() - start)
+
+            # Flush periodically so max_requests is honoured across threads
+            if max_requests is not None and len(local_timings) >= 50:
+                with lock:
+                    timings.extend(local_timings)
+                local_timings = []
+
+        with lock:
+            timings.extend(local_timings)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return LoadResult(name, timings, elapsed, errors[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the Task API')
+    parser.add_argument('--url', help='Base URL of a running server (default: in-process test client)')
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--path', default='/api/tasks')
+    parser.add_argument('--body', help='JSON request body')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--no-keep-alive', action='store_true')
+    parser.add_argument('--mongomock', action='store_true', help='Use mongomock for the in-process app')
+    parser.add_argument('--name', help='Result name for baselines')
+    parser.add_argument('--baseline-file')
+    parser.add_argument('--threshold', type=float)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    from config import Config
+
+    if args.url:
+        target = HttpTarget(args.url, keep_alive=not args.no_keep_alive)
+    else:
+        from benchmarks.bench_tasks import create_bench_app
+        target = TestClientTarget(create_bench_app(use_mongomock=args.mongomock))
+
+    name = args.name or f"load:{args.method} {args.path} c={args.concurrency}"
+    body = json.loads(args.body) if args.body else None
+
+    result = run_load(target, name, args.method, args.path, body,
+                      concurrency=args.concurrency, duration=args.duration)
+
+    baseline_file = args.baseline_file or Config.BENCHMARK_BASELINE_FILE
+    threshold = args.threshold if args.threshold is not None else Config.BENCHMARK_REGRESSION_THRESHOLD
+    baselines = load_baselines(baseline_file)
+
+    print_report([result], baselines)
+    print(f"errors: {result.errors}")
+
+    if args.update_baseline:
+        save_baselines([result], baseline_file, existing=baselines)
+        return 0
+
+    regressions = compare_to_baselines([result], baselines, threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# benchmarks/seed.py - Synthetic task data for benchmarks
+import random
+from datetime import timedelta
+from config import Config
+from utils.timestamps import utcnow
+
+# Tag vocabulary for generated tasks (a few common tags, a longer tail)
+SEED_TAGS = ['bug', 'feature', 'docs', 'ops', 'backend', 'frontend', 'urgent', 'customer'] + [
+    f'area:{i}' for i in range(24)
+]
+
+
+def generate_task_documents(count, start=0, rng=None, tenant=None):
+    """
+    Generate task documents shaped like the ones Task.create stores
+
+    Args:
+        count: Number of documents to generate
+        start: Offset used to number generated titles
+        rng: Optional random.Random instance for reproducible data
+        tenant: Tenant ID stored on the documents (default tenant if omitted)
+
+    Returns:
+        List of task documents
+    """
+    rng = rng or random.Random(42)
+    tenant = tenant or Config.DEFAULT_TENANT
+    now = utcnow()
+    documents = []
+
+    for i in range(start, start + count):
+        status = rng.choice(Config.VALID_STATUSES)
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        due_date = created_at + timedelta(days=rng.randint(1, 60)) if rng.random() < 0.7 else None
+
+        document = {
+            'tenant_id': tenant,
+            'title': f'Benchmark task {i}',
+            'description': 'Generated for benchmarking' if rng.random() < 0.5 else '',
+            'completed': status == 'completed',
+            'completed_at': created_at if status == 'completed' else None,
+            'priority': rng.choice(Config.VALID_PRIORITIES),
+            'status': status,
+            'due_date': due_date,
+            'is_deleted': False,
+            'deleted_at': None,
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+        document['priority_rank'] = Config.PRIORITY_RANKS[document['priority']]
+        tags = {SEED_TAGS[min(int(rng.expovariate(0.3)), len(SEED_TAGS) - 1)] for _ in range(rng.randint(0, 3))}
+        document['tags'] = sorted(tags)
+        document['depends_on'] = []
+        documents.append(document)
+
+    return documents
+
+
+def seed_tasks(backend, target_count, tenant=None, batch_size=10000, rng=None):
+    """
+    Top up a tenant's tasks so it holds at least target_count of them
+
+    Args:
+        backend: Storage backend to seed (see storage/)
+        target_count: Desired number of tasks
+        tenant: Tenant to seed (default tenant if omitted)
+        batch_size: Documents inserted per insert_many call
+        rng: Optional random.Random instance for reproducible data
+
+    Returns:
+        Number of documents inserted
+    """
+    rng = rng or random.Random(42)
+    tenant = tenant or Config.DEFAULT_TENANT
+    existing = backend.count(tenant)
+    inserted = 0
+
+    while existing + inserted < target_count:
+        batch = min(batch_size, target_count - existing - inserted)
+        backend.insert_many(
+            tenant,
+            generate_task_documents(batch, start=existing + inserted, rng=rng, tenant=tenant)
+        )
+        inserted += batch
+
+    return inserted
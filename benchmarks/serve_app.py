@@ -0,0 +1,23 @@
+# benchmarks/serve_app.py - Seeded application entry point for serving benchmarks
+"""
+wsgi:app with BENCH_SEED_TASKS tasks (default 1000) inserted on import.
+
+Servers started by bench_serving load this module instead of wsgi.py. With
+gunicorn's preload_app the master seeds once and every worker forks with
+the same tasks, so the in-memory backend serves identical data everywhere.
+
+    gunicorn -c gunicorn.conf.py benchmarks.serve_app:app
+    uvicorn --factory benchmarks.serve_app:asgi_app
+"""
+import os
+from benchmarks.seed import seed_tasks
+from storage import get_backend
+from wsgi import app
+
+seed_tasks(get_backend(), int(os.environ.get('BENCH_SEED_TASKS', 1000)))
+
+
+def asgi_app():
+    """Wrap the WSGI app for ASGI servers (requires asgiref)"""
+    from asgiref.wsgi import WsgiToAsgi
+    return WsgiToAsgi(app)
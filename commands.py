@@ -0,0 +1,101 @@
+# commands.py - Flask CLI commands
+import signal
+import click
+from database import Database
+from jobs.worker import Worker
+from models.archive import TaskArchive
+from migrations.runner import MigrationRunner
+from storage import get_backend
+from utils.tenancy import validate_tenant_id
+
+def require_feature(feature):
+    """Refuse a command when the storage backend lacks a MongoDB-only feature"""
+    backend = get_backend()
+    if not backend.supports(feature):
+        raise click.ClickException(f'{feature} requires the mongo storage backend (configured: {backend.name})')
+
+def register_commands(app):
+    """Register CLI commands on the Flask application"""
+    
+    @app.cli.command('create-indexes')
+    def create_indexes():
+        """Create task indexes, schema validator and sharding"""
+        if Database.reconcile_indexes():
+            click.echo('Indexes reconciled')
+        else:
+            raise click.ClickException(f'Index reconciliation failed: {Database.last_error}')
+    
+    @app.cli.command('archive-tasks')
+    @click.option('--days', type=int, default=None, help='Archive tasks completed/deleted more than N days ago')
+    @click.option('--batch-size', type=int, default=None, help='Documents moved per batch')
+    @click.option('--pause-ms', type=float, default=None, help='Pause between batches')
+    def archive_tasks(days, batch_size, pause_ms):
+        """Move old completed and soft-deleted tasks to the archive collections"""
+        require_feature('archive')
+        
+        totals = TaskArchive.run(older_than_days=days, batch_size=batch_size, pause_ms=pause_ms)
+        for name, count in totals.items():
+            click.echo(f'{name}: {count} archived')
+    
+    @app.cli.command('reconcile-tag-counts')
+    @click.option('--tenant', default=None, help='Only this tenant (default: every tenant)')
+    def reconcile_tag_counts(tenant):
+        """Recount tags from the tasks and repair drifted tag counters"""
+        if tenant is not None:
+            try:
+                validate_tenant_id(tenant)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint='--tenant')
+        
+        totals = get_backend().reconcile_tag_counts(tenant)
+        click.echo(f"{totals['corrected']} tag counters corrected, {totals['removed']} removed")
+    
+    @app.cli.command('migrate')
+    @click.option('--to', 'target', type=int, default=None, help='Stop after this migration version')
+    @click.option('--batch-size', type=int, default=None, help='Documents upgraded per batch')
+    @click.option('--pause-ms', type=float, default=None, help='Pause between batches')
+    @click.option('--max-batches', type=int, default=None, help='Stop after N batches (resume later)')
+    def migrate(target, batch_size, pause_ms, max_batches):
+        """Apply pending task document migrations in batches"""
+        if app.config['STORAGE_BACKEND'] != 'mongo':
+            raise click.ClickException('Document migrations apply to the mongo storage backend only')
+        
+        totals = MigrationRunner.run(target=target, batch_size=batch_size, pause_ms=pause_ms,
+                                     max_batches=max_batches)
+        for migration_id, count in totals.items():
+            click.echo(f'{migration_id}: {count} upgraded')
+    
+    @app.cli.command('migration-status')
+    def migration_status():
+        """Show the progress of every task document migration"""
+        for migration in MigrationRunner.status():
+            click.echo(f"{migration['id']:<20} {migration['state']:<8} {migration['processed']:>10}  "
+                       f"{migration['description']}")
+    
+    @app.cli.command('run-worker')
+    @click.option('--concurrency', type=int, default=2, help='Jobs run at the same time')
+    @click.option('--mode', type=click.Choice(['thread', 'process']), default='thread',
+                  help='Run jobs on a thread pool or a process pool')
+    @click.option('--types', default='', help='Comma-separated job types to run (default: all)')
+    @click.option('--drain', is_flag=True, help='Exit once the queue is empty')
+    def run_worker(concurrency, mode, types, drain):
+        """Run a dedicated background job worker"""
+        require_feature('jobs')
+        
+        worker = Worker(
+            app.config,
+            concurrency=concurrency,
+            mode=mode,
+            job_types=[t for t in types.split(',') if t] or None
+        )
+        
+        if drain:
+            worker.drain()
+            worker.executor.shutdown(wait=True)
+            return
+        
+        signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            worker.executor.shutdown(wait=True)
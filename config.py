@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -14,6 +15,22 @@ class Config:
     MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/')
     DATABASE_NAME = os.environ.get('DATABASE_NAME', 'taskmanagement')
     COLLECTION_NAME = 'tasks'
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+    # When to create indexes/validators: 'background' (thread at startup),
+    # 'startup' (blocking) or 'off' (run `flask create-indexes` instead)
+    INDEX_RECONCILIATION = os.environ.get('INDEX_RECONCILIATION', 'background')
+    
+    # Task storage: 'mongo', 'sqlite' (single-node deployments) or 'memory'
+    # (indexed in-process store for tests, local development and benchmark
+    # baselines; nothing is persisted)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
+    SQLITE_PATH = os.environ.get('SQLITE_PATH', 'data/tasks.db')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHED_STATEMENTS = 256  # prepared statements kept per connection
+    
+    # 'threads' or 'gevent' (greenlets; wsgi.py and gunicorn.conf.py patch
+    # the standard library first - see utils/cooperative.py)
+    CONCURRENCY_MODE = os.environ.get('CONCURRENCY_MODE', 'threads')
     
     # Logging Configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -23,10 +40,128 @@ class Config:
     # Pagination
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
+    MAX_LOOKUP_IDS = int(os.environ.get('MAX_LOOKUP_IDS', 100))  # IDs per batch lookup
     
     # Task Configuration
     VALID_PRIORITIES = ['low', 'medium', 'high']
+    # Numeric priority stored as priority_rank so priorities sort by importance
+    PRIORITY_RANKS = {'low': 1, 'medium': 2, 'high': 3}
+    NEXT_TASKS_LIMIT = int(os.environ.get('NEXT_TASKS_LIMIT', 10))  # default size of /api/tasks/next
     VALID_STATUSES = ['pending', 'in_progress', 'completed']
+    MAX_TAGS_PER_TASK = int(os.environ.get('MAX_TAGS_PER_TASK', 20))
+    TAG_MAX_LENGTH = 32
+    TAG_FILTER_MAX = 10  # tags accepted in one ?tags= filter
+    STATS_TOP_TAGS = 10  # tags listed in /api/tasks/stats
+    MAX_DEPENDENCIES = int(os.environ.get('MAX_DEPENDENCIES', 50))  # depends_on entries per task
+    
+    # Multi-tenancy
+    # 'shared': one collection, every document carries tenant_id
+    # 'collection': one collection per tenant (tasks_<tenant>); the default
+    #               tenant keeps using the base collection
+    TENANCY_MODE = os.environ.get('TENANCY_MODE', 'shared')
+    TENANT_HEADER = 'X-Tenant-ID'
+    DEFAULT_TENANT = os.environ.get('DEFAULT_TENANT', 'default')
+    SHARDING_ENABLED = os.environ.get('SHARDING_ENABLED', 'False').lower() == 'true'
+    
+    # Read/write splitting: read preference per operation type. Paths that
+    # read their own writes (create/update/toggle responses, get by ID)
+    # always use the primary.
+    READ_PREFERENCES = {
+        'list': os.environ.get('READ_PREFERENCE_LIST', 'secondaryPreferred'),
+        'stats': os.environ.get('READ_PREFERENCE_STATS', 'secondaryPreferred'),
+        'export': os.environ.get('READ_PREFERENCE_EXPORT', 'secondaryPreferred')
+    }
+    MAX_STALENESS_SECONDS = int(os.environ.get('MAX_STALENESS_SECONDS', 90))  # -1 disables
+    
+    # Causally consistent sessions: clients echo the X-Operation-Time header
+    # back so reads from secondaries observe their own earlier writes
+    CAUSAL_CONSISTENCY = os.environ.get('CAUSAL_CONSISTENCY', 'False').lower() == 'true'
+    OPERATION_TIME_HEADER = 'X-Operation-Time'
+    
+    # Server-side schema validation ($jsonSchema built from utils.validators.TASK_SCHEMA)
+    MONGO_SCHEMA_VALIDATION = os.environ.get('MONGO_SCHEMA_VALIDATION', 'True').lower() == 'true'
+    MONGO_SCHEMA_VALIDATION_LEVEL = os.environ.get('MONGO_SCHEMA_VALIDATION_LEVEL', 'moderate')
+    MONGO_SCHEMA_VALIDATION_ACTION = os.environ.get('MONGO_SCHEMA_VALIDATION_ACTION', 'error')
+    
+    # Admin access (empty token disables admin-only features)
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+    
+    # Profiling (hooks are not installed at all unless enabled)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILING_HEADER = 'X-Profile'
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.0))
+    PROFILING_MODE = os.environ.get('PROFILING_MODE', 'sample')  # 'sample' or 'cprofile'
+    PROFILING_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILING_SAMPLE_INTERVAL_MS', 5))
+    PROFILING_OUTPUT_DIR = os.environ.get('PROFILING_OUTPUT_DIR', 'logs/profiles')
+    PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES', 50))
+    
+    # Slow-query log and query-shape statistics
+    QUERY_STATS_ENABLED = os.environ.get('QUERY_STATS_ENABLED', 'True').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'True').lower() == 'true'
+    QUERY_STATS_MAX_SHAPES = 500
+    QUERY_STATS_SAMPLE_SIZE = 1000
+    
+    # Archival of completed and soft-deleted tasks (`flask archive-tasks`)
+    ARCHIVE_COLLECTION_SUFFIX = '_archive'
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    ARCHIVE_BATCH_PAUSE_MS = float(os.environ.get('ARCHIVE_BATCH_PAUSE_MS', 200))
+    ARCHIVE_MAX_REPLICATION_LAG = float(os.environ.get('ARCHIVE_MAX_REPLICATION_LAG', 10))
+    
+    # Online migrations of task documents (`flask migrate`, migrations/)
+    MIGRATIONS_COLLECTION = 'migrations'
+    MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 1000))
+    MIGRATION_BATCH_PAUSE_MS = float(os.environ.get('MIGRATION_BATCH_PAUSE_MS', 100))
+    MIGRATION_MAX_REPLICATION_LAG = float(os.environ.get('MIGRATION_MAX_REPLICATION_LAG', 10))
+    # Seconds a collection's migration state is cached while migrations are pending
+    MIGRATION_STATE_TTL = float(os.environ.get('MIGRATION_STATE_TTL', 30))
+    
+    # Background jobs (`flask run-worker` runs dedicated workers)
+    JOBS_COLLECTION = 'jobs'
+    JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 3))
+    JOBS_LEASE_SECONDS = float(os.environ.get('JOBS_LEASE_SECONDS', 60))
+    JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', 1))
+    JOBS_RETRY_BASE_SECONDS = float(os.environ.get('JOBS_RETRY_BASE_SECONDS', 10))
+    JOBS_RETENTION_SECONDS = int(os.environ.get('JOBS_RETENTION_SECONDS', 7 * 24 * 3600))
+    JOBS_INPROCESS_WORKERS = int(os.environ.get('JOBS_INPROCESS_WORKERS', 0))
+    
+    # Asynchronous exports (POST /api/tasks/exports)
+    EXPORT_DIR = os.environ.get('EXPORT_DIR', 'exports')
+    EXPORT_PARTITIONS = int(os.environ.get('EXPORT_PARTITIONS', 4))
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+    EXPORT_RETENTION_SECONDS = int(os.environ.get('EXPORT_RETENTION_SECONDS', 24 * 3600))
+    
+    # Per-tenant tag counters (GET /api/tasks/tags)
+    TAG_COUNTS_COLLECTION = 'tag_counts'
+    
+    # In-process dependency graphs of hot tenants (GET /api/tasks/unblocked and
+    # /api/tasks/<id>/dependencies); 0 tenants (the default) disables the
+    # cache. Each process only sees its own writes, so with several workers
+    # reads may lag other workers' writes by up to DEPENDENCY_CACHE_TTL
+    DEPENDENCY_CACHE_TENANTS = int(os.environ.get('DEPENDENCY_CACHE_TENANTS', 0))
+    DEPENDENCY_CACHE_TTL = float(os.environ.get('DEPENDENCY_CACHE_TTL', 30))
+    DEPENDENCY_CACHE_HOT_READS = int(os.environ.get('DEPENDENCY_CACHE_HOT_READS', 3))
+    
+    # Analytics rollups (GET /api/tasks/analytics)
+    ROLLUP_COLLECTION = 'task_rollups'
+    ANALYTICS_MAX_BUCKETS = int(os.environ.get('ANALYTICS_MAX_BUCKETS', 366))
+    
+    # Write coalescing for bursts of updates/toggles to the same task
+    WRITE_COALESCING_ENABLED = os.environ.get('WRITE_COALESCING_ENABLED', 'False').lower() == 'true'
+    WRITE_COALESCING_WINDOW_MS = float(os.environ.get('WRITE_COALESCING_WINDOW_MS', 5))
+    WRITE_COALESCING_MAX_BATCH = int(os.environ.get('WRITE_COALESCING_MAX_BATCH', 64))
+    
+    # Health monitor behind /readyz (checks run in a background thread)
+    HEALTH_CHECK_INTERVAL = float(os.environ.get('HEALTH_CHECK_INTERVAL', 5))
+    HEALTH_FAILURE_THRESHOLD = int(os.environ.get('HEALTH_FAILURE_THRESHOLD', 3))
+    HEALTH_RECOVERY_THRESHOLD = int(os.environ.get('HEALTH_RECOVERY_THRESHOLD', 2))
+    HEALTH_MAX_POOL_UTILIZATION = float(os.environ.get('HEALTH_MAX_POOL_UTILIZATION', 0.9))
+    HEALTH_MAX_REPLICATION_LAG = float(os.environ.get('HEALTH_MAX_REPLICATION_LAG', 30))
+    
+    # Benchmarks
+    BENCHMARK_BASELINE_FILE = os.environ.get('BENCHMARK_BASELINE_FILE', 'benchmarks/baselines.json')
+    BENCHMARK_REGRESSION_THRESHOLD = float(os.environ.get('BENCHMARK_REGRESSION_THRESHOLD', 0.2))
     
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -40,6 +175,12 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DATABASE_NAME = 'taskmanagement_test'
+    ADMIN_TOKEN = 'test-admin-token'
+    INDEX_RECONCILIATION = 'startup'
+    # TEST_STORAGE_BACKEND=memory runs the suite without MongoDB (tests
+    # marked 'mongo' are skipped)
+    STORAGE_BACKEND = os.environ.get('TEST_STORAGE_BACKEND', 'mongo')
+    SQLITE_PATH = os.path.join(tempfile.gettempdir(), 'taskmanagement_test.db')
 
 # Configuration dictionary
 config = {
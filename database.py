@@ -1,5 +1,10 @@
+import os
+import threading
+import time
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+from utils.validators import task_json_schema
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,54 +14,340 @@ class Database:
     
     client = None
     db = None
+    config = None
+    
+    # Client implementation used by init_db (benchmarks may swap in mongomock)
+    client_class = MongoClient
+    
+    # pymongo monitoring listeners attached to the client when it is created
+    event_listeners = []
+    
+    @staticmethod
+    def add_event_listener(listener):
+        """Register a pymongo monitoring listener (must run before init_db)"""
+        if listener not in Database.event_listeners:
+            Database.event_listeners.append(listener)
+    
+    # Set in a forked child until it has created its own client
+    _forked = False
+    _connect_lock = threading.Lock()
+    
+    # Readiness: 'starting' until MongoDB has answered, then 'ready' or 'unavailable'
+    state = 'starting'
+    last_error = None
+    # Index reconciliation: 'pending', 'running', 'done', 'failed' or 'skipped'
+    index_state = 'pending'
+    
+    @staticmethod
+    def _connect(config):
+        """Create the MongoClient and database handle from configuration"""
+        # connect=False: no sockets or monitor threads until the first operation
+        Database.client = Database.client_class(
+            config['MONGO_URI'],
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=config.get('MONGO_MAX_POOL_SIZE', 100),
+            tz_aware=True,
+            connect=False,
+            event_listeners=list(Database.event_listeners)
+        )
+        Database.db = Database.client[config['DATABASE_NAME']]
+        Database._forked = False
+    
+    @staticmethod
+    def _mark_forked():
+        """Runs in the child after fork: the inherited client must not be used"""
+        Database._forked = True
+        Database._connect_lock = threading.Lock()
+    
+    @staticmethod
+    def _ensure_client():
+        """Create the client on first use, or again in a forked worker"""
+        if Database.client is not None and not Database._forked:
+            return
+        if Database.config is None:
+            raise Exception("Database not initialized")
+        
+        with Database._connect_lock:
+            if Database.client is not None and not Database._forked:
+                return
+            forked = Database._forked
+            Database._connect(Database.config)
+            if forked:
+                logger.info(f"MongoDB client created for worker {os.getpid()}")
+    
+    @staticmethod
+    def reconnect_after_fork():
+        """
+        Give a forked worker its own MongoClient
+        
+        MongoClient is not fork-safe: its sockets and monitor threads belong
+        to the parent. The inherited client is dropped without closing it
+        (closing would touch the parent's sockets) and a new one is created.
+        """
+        if Database._forked:
+            Database._ensure_client()
     
     @staticmethod
     def init_db(app):
-        """Initialize database connection"""
+        """
+        Initialize database configuration
+        
+        No connection is made here: the client connects on first use, and
+        index reconciliation runs according to INDEX_RECONCILIATION
+        ('background', 'startup' or 'off'; use `flask create-indexes` for
+        one-off runs). It is skipped when tasks use another storage backend.
+        """
+        Database.config = app.config
+        # Created here rather than at import so it is a gevent lock when the
+        # process is monkey-patched (see utils/cooperative.py)
+        Database._connect_lock = threading.Lock()
+        Database._read_preferences = {}
+        Database.client = None
+        Database.db = None
+        Database.state = 'starting'
+        Database.last_error = None
+        Database.index_state = 'pending'
+        
+        mode = app.config.get('INDEX_RECONCILIATION', 'background')
+        if app.config.get('STORAGE_BACKEND', 'mongo') != 'mongo':
+            # Tasks are not stored in MongoDB: there are no task indexes to build
+            mode = 'off'
+        
+        if mode == 'startup':
+            Database.reconcile_indexes()
+        elif mode == 'background':
+            threading.Thread(
+                target=Database._reconcile_in_background,
+                name='index-reconciliation',
+                daemon=True
+            ).start()
+        else:
+            Database.index_state = 'skipped'
+        
+        logger.info(f"Database configured: {app.config['DATABASE_NAME']} (indexes: {mode})")
+    
+    @staticmethod
+    def _reconcile_in_background():
+        """Retry index reconciliation with backoff until MongoDB is reachable"""
+        delay = 1
+        while not Database.reconcile_indexes():
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+    
+    @staticmethod
+    def ping():
+        """
+        Check MongoDB reachability and update the readiness state
+        
+        Returns:
+            True if MongoDB answered
+        """
         try:
-            Database.client = MongoClient(
-                app.config['MONGO_URI'],
-                serverSelectionTimeoutMS=5000
-            )
-            # Test connection
-            Database.client.admin.command('ping')
+            Database.get_client().admin.command('ping')
+            Database.state = 'ready'
+            Database.last_error = None
+            return True
+        except Exception as e:
+            Database.state = 'unavailable'
+            Database.last_error = str(e)
+            return False
+    
+    @staticmethod
+    def reconcile_indexes():
+        """
+        Create indexes, the schema validator and sharding for the shared collection
+        
+        Returns:
+            True on success
+        """
+        Database.index_state = 'running'
+        try:
+            if not Database.ping():
+                raise ConnectionFailure(Database.last_error)
             
-            Database.db = Database.client[app.config['DATABASE_NAME']]
+            logger.info(f"Connected to MongoDB database: {Database.config['DATABASE_NAME']}")
             
-            logger.info(f"Connected to MongoDB database: {app.config['DATABASE_NAME']}")
+            # Create indexes and the schema validator for the shared collection
+            Database.prepare_task_collection(Database.config['COLLECTION_NAME'])
+            Database.prepare_archive_collection(
+                Database.config['COLLECTION_NAME'] + Database.config['ARCHIVE_COLLECTION_SUFFIX']
+            )
             
-            # Create indexes for better performance
-            Database._create_indexes(app)
+            # Distribute the shared collection across shards by tenant
+            if Database.config.get('SHARDING_ENABLED'):
+                Database._shard_task_collection()
+            
+            Database.index_state = 'done'
+            return True
             
         except ConnectionFailure as e:
             logger.error(f"Failed to connect to MongoDB: {str(e)}")
-            raise
         except Exception as e:
-            logger.error(f"Database initialization error: {str(e)}")
-            raise
+            logger.error(f"Index reconciliation error: {str(e)}")
+        
+        Database.index_state = 'failed'
+        return False
+    
+    # Soft-deleted tasks stay in the live collection until archived; the
+    # query indexes skip them so they do not bloat what every read touches.
+    LIVE_FILTER = {'is_deleted': False}
+    
+    # Task indexes as (keys, options). tenant_id leads every query index so
+    # per-tenant queries never scan other tenants and the indexes line up
+    # with the shard key (which cannot be partial).
+    TASK_INDEXES = [
+        ([('tenant_id', 1), ('_id', 1)], {}),
+        ([('tenant_id', 1), ('created_at', -1)], {'live': True}),
+        ([('tenant_id', 1), ('priority', 1), ('created_at', -1)], {'live': True}),
+        ([('tenant_id', 1), ('status', 1), ('created_at', -1)], {'live': True}),
+        ([('tenant_id', 1), ('completed', 1), ('created_at', -1)], {'live': True}),
+        ([('tenant_id', 1), ('due_date', 1)], {'live': True}),
+        ([('tenant_id', 1), ('completed_at', 1)], {'live': True}),
+        # Tag filters (multikey: one entry per tag)
+        ([('tenant_id', 1), ('tags', 1), ('created_at', -1)], {'live': True}),
+        # Next-task view: incomplete tasks by priority, then due date
+        ([('tenant_id', 1), ('completed', 1), ('priority_rank', -1), ('due_date', 1)], {'live': True}),
+        # Archival candidates
+        ([('deleted_at', 1)], {'name': 'archive_deleted', 'partialFilterExpression': {'is_deleted': True}}),
+        ([('completed_at', 1)], {'name': 'archive_completed',
+                                 'partialFilterExpression': {'completed': True, 'is_deleted': False}})
+    ]
+    
+    # Archive collections are only read by include_archived queries
+    ARCHIVE_INDEXES = [
+        [('tenant_id', 1), ('_id', 1)],
+        [('tenant_id', 1), ('created_at', -1)]
+    ]
+    
+    @staticmethod
+    def index_name(keys):
+        """Default MongoDB index name for a key specification"""
+        return '_'.join(f'{field}_{direction}' for field, direction in keys)
     
     @staticmethod
-    def _create_indexes(app):
-        """Create database indexes"""
+    def prepare_task_collection(collection_name):
+        """Create indexes and the schema validator for a tasks collection"""
+        Database._create_indexes(collection_name)
+        
+        # Enforce the task schema on the server as well
+        if Database.config.get('MONGO_SCHEMA_VALIDATION'):
+            Database._apply_schema_validation(collection_name)
+    
+    @staticmethod
+    def _create_indexes(collection_name):
+        """Create database indexes, replacing full indexes superseded by partial ones"""
         try:
-            collection = Database.db[app.config['COLLECTION_NAME']]
+            collection = Database.get_collection(collection_name)
+            existing = collection.index_information()
             
             # Create indexes
-            collection.create_index('created_at')
-            collection.create_index('priority')
-            collection.create_index('completed')
-            collection.create_index('due_date')
+            for keys, options in Database.TASK_INDEXES:
+                options = dict(options)
+                if options.pop('live', False):
+                    options['name'] = f'{Database.index_name(keys)}_live'
+                    options['partialFilterExpression'] = Database.LIVE_FILTER
+                    
+                    # Drop the full index this partial index replaces
+                    legacy = Database.index_name(keys)
+                    if legacy in existing and 'partialFilterExpression' not in existing[legacy]:
+                        collection.drop_index(legacy)
+                
+                # Named indexes whose keys changed are rebuilt under the same name
+                name = options.get('name')
+                if name in existing and [(field, int(direction)) for field, direction in existing[name]['key']] != keys:
+                    collection.drop_index(name)
+                
+                collection.create_index(keys, **options)
             
-            logger.info("Database indexes created successfully")
+            logger.info(f"Database indexes created successfully for {collection_name}")
         except Exception as e:
             logger.warning(f"Failed to create indexes: {str(e)}")
     
     @staticmethod
-    def get_collection(collection_name):
-        """Get a collection from the database"""
-        if Database.db is None:
-            raise Exception("Database not initialized")
-        return Database.db[collection_name]
+    def prepare_archive_collection(collection_name):
+        """Create indexes for an archive collection"""
+        try:
+            collection = Database.get_collection(collection_name)
+            for keys in Database.ARCHIVE_INDEXES:
+                collection.create_index(keys)
+        except Exception as e:
+            logger.warning(f"Failed to create archive indexes: {str(e)}")
+    
+    @staticmethod
+    def _apply_schema_validation(collection_name):
+        """Install the task $jsonSchema as a collection validator"""
+        try:
+            validator = {'$jsonSchema': task_json_schema()}
+            options = {
+                'validator': validator,
+                'validationLevel': Database.config['MONGO_SCHEMA_VALIDATION_LEVEL'],
+                'validationAction': Database.config['MONGO_SCHEMA_VALIDATION_ACTION']
+            }
+            
+            if collection_name in Database.db.list_collection_names():
+                Database.db.command('collMod', collection_name, **options)
+            else:
+                Database.db.create_collection(collection_name, **options)
+            
+            logger.info(f"Task schema validator applied to {collection_name}")
+        except Exception as e:
+            logger.warning(f"Failed to apply schema validator: {str(e)}")
+    
+    @staticmethod
+    def _shard_task_collection():
+        """Shard the shared tasks collection on (tenant_id, _id)"""
+        try:
+            config = Database.config
+            namespace = f"{config['DATABASE_NAME']}.{config['COLLECTION_NAME']}"
+            Database.get_client().admin.command('enableSharding', config['DATABASE_NAME'])
+            Database.get_client().admin.command(
+                'shardCollection', namespace,
+                key={'tenant_id': 1, '_id': 1}
+            )
+            logger.info(f"Sharding enabled for {namespace}")
+        except Exception as e:
+            logger.warning(f"Failed to shard tasks collection: {str(e)}")
+    
+    # Read preference objects by operation, built on first use
+    _read_preferences = {}
+    
+    @staticmethod
+    def read_preference(operation):
+        """Get the configured read preference for an operation type"""
+        if operation in Database._read_preferences:
+            return Database._read_preferences[operation]
+        
+        name = (Database.config or {}).get('READ_PREFERENCES', {}).get(operation, 'primary')
+        mode = read_pref_mode_from_name(name)
+        max_staleness = -1
+        if name != 'primary':
+            max_staleness = Database.config.get('MAX_STALENESS_SECONDS', -1)
+        
+        preference = make_read_preference(mode, None, max_staleness=max_staleness)
+        Database._read_preferences[operation] = preference
+        return preference
+    
+    @staticmethod
+    def get_client():
+        """Get the MongoClient owned by the current process"""
+        Database._ensure_client()
+        return Database.client
+    
+    @staticmethod
+    def get_collection(collection_name, operation=None):
+        """
+        Get a collection from the database
+        
+        Args:
+            collection_name: Collection name
+            operation: Optional operation type ('list', 'stats', 'export')
+                whose configured read preference should be applied
+        """
+        Database._ensure_client()
+        collection = Database.db[collection_name]
+        if operation is not None:
+            collection = collection.with_options(read_preference=Database.read_preference(operation))
+        return collection
     
     @staticmethod
     def close_connection():
@@ -65,10 +356,15 @@ class Database:
             Database.client.close()
             logger.info("Database connection closed")
 
+# Pre-fork servers (gunicorn, uWSGI) fork after the app is created
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=Database._mark_forked)
+
 def init_db(app):
     """Initialize database (wrapper function)"""
     Database.init_db(app)
 
 def get_db():
     """Get database instance"""
+    Database._ensure_client()
     return Database.db
\ No newline at end of file
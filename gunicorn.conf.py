@@ -0,0 +1,58 @@
+# gunicorn.conf.py - Pre-fork production server configuration
+#
+# Usage:
+#     gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Graceful reload: kill -HUP <master pid> starts new workers and lets the old
+# ones finish in-flight requests. Graceful shutdown: kill -TERM <master pid>.
+import multiprocessing
+import os
+from utils import cooperative
+
+# gevent mode (CONCURRENCY_MODE=gevent or GUNICORN_WORKER_CLASS=gevent): the
+# master patches the standard library before preloading the app, so the
+# app's locks, logging handlers and MongoClient are gevent-aware in workers
+if os.environ.get('GUNICORN_WORKER_CLASS') == 'gevent':
+    os.environ['CONCURRENCY_MODE'] = 'gevent'
+if cooperative.requested():
+    cooperative.patch()
+
+bind = os.environ.get('GUNICORN_BIND', f"{os.environ.get('FLASK_HOST', '0.0.0.0')}:{os.environ.get('FLASK_PORT', 5000)}")
+
+# Request handling is I/O bound (MongoDB round trips), so each worker runs a
+# few threads; workers scale with cores.
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+if cooperative.requested():
+    worker_class = 'gevent'
+# Concurrent connections (greenlets) per gevent worker
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Load the app once in the master so workers fork with it already imported.
+# Each worker then creates its own MongoClient (see post_fork).
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# Draining: workers get graceful_timeout seconds to finish in-flight requests
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically; jitter avoids restarting them all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', None)
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+
+
+def post_fork(server, worker):
+    """Create the worker's own MongoClient; the master's is not fork-safe"""
+    from database import Database
+    Database.reconnect_after_fork()
+    server.log.info(f"Worker {worker.pid} connected to MongoDB")
+
+
+def worker_int(worker):
+    worker.log.info(f"Worker {worker.pid} interrupted, draining")
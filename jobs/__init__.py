@@ -0,0 +1 @@
+# jobs - Background job handlers and workers
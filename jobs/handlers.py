@@ -0,0 +1,41 @@
+# jobs/handlers.py - Built-in maintenance job handlers
+from database import Database
+from jobs.registry import job_handler
+from models.archive import TaskArchive
+from models.export import TaskExport
+from storage import get_backend
+from utils.tenancy import validate_tenant_id
+
+@job_handler('reconcile_indexes')
+def reconcile_indexes(payload, context):
+    """Create indexes, validators and sharding for the task collections"""
+    if not Database.reconcile_indexes():
+        raise RuntimeError(f"Index reconciliation failed: {Database.last_error}")
+    return {'indexes': Database.index_state}
+
+@job_handler('archive_tasks')
+def archive_tasks(payload, context):
+    """Archive old completed and soft-deleted tasks"""
+    totals = TaskArchive.run(
+        older_than_days=payload.get('days'),
+        batch_size=payload.get('batch_size'),
+        pause_ms=payload.get('pause_ms')
+    )
+    return {'archived': totals}
+
+@job_handler('export_tasks')
+def export_tasks(payload, context):
+    """Export a tenant's tasks to a compressed file"""
+    return TaskExport.run(
+        context.job_id,
+        context.tenant,
+        export_format=payload.get('format', 'ndjson'),
+        filters=payload.get('filters'),
+        progress=context.progress
+    )
+
+@job_handler('reconcile_tag_counts')
+def reconcile_tag_counts(payload, context):
+    """Recount tags from the tasks and repair drifted tag counters"""
+    tenant = payload.get('tenant')
+    return get_backend().reconcile_tag_counts(validate_tenant_id(tenant) if tenant is not None else None)
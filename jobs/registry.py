@@ -0,0 +1,44 @@
+# jobs/registry.py - Job handler registry
+from models.job import Job
+
+# Job type -> handler(payload, context)
+JOB_HANDLERS = {}
+
+def job_handler(job_type):
+    """
+    Register a function as the handler for a job type
+    
+    Handlers receive the job payload and a JobContext and return a
+    JSON-serializable result. Raising marks the attempt failed.
+    
+    Args:
+        job_type: Name used when enqueueing the job
+    """
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+def get_handler(job_type):
+    """
+    Look up the handler for a job type
+    
+    Raises:
+        KeyError: If no handler is registered
+    """
+    if job_type not in JOB_HANDLERS:
+        raise KeyError(f"No handler registered for job type '{job_type}'")
+    return JOB_HANDLERS[job_type]
+
+class JobContext:
+    """What a handler may know about the job it is running (picklable)"""
+    
+    def __init__(self, job_id, worker_id, attempt, tenant=None):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.attempt = attempt
+        self.tenant = tenant
+    
+    def progress(self, value):
+        """Report progress (any JSON-serializable value)"""
+        Job.set_progress(self.job_id, self.worker_id, value)
@@ -0,0 +1,196 @@
+# jobs/worker.py - Job worker with thread or process pools
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from database import Database
+from jobs.registry import JOB_HANDLERS, JobContext, get_handler
+from models.job import Job
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def execute(job_type, payload, context):
+    """Run a job's handler (module-level so process pools can pickle it)"""
+    import jobs.handlers  # noqa: F401 - registers the built-in handlers
+    return get_handler(job_type)(payload, context)
+
+
+def _init_process(config):
+    """Process pool initializer: give the child its own database client"""
+    import jobs.handlers  # noqa: F401
+    Database.config = config
+    Database.client = None
+    Database.db = None
+    Database._forked = False
+    Database._read_preferences = {}
+
+
+class Worker:
+    """
+    Claim jobs from the jobs collection and run them on a pool
+
+    Thread pools suit I/O-bound jobs (most maintenance is MongoDB-bound);
+    process pools keep CPU-heavy jobs from holding the web process's GIL.
+    Leases of running jobs are renewed every third of the lease period.
+    """
+
+    def __init__(self, config, concurrency=2, mode='thread', job_types=None):
+        import jobs.handlers  # noqa: F401
+
+        self.config = config
+        self.concurrency = concurrency
+        self.mode = mode
+        self.job_types = list(job_types or JOB_HANDLERS)
+        self.lease_seconds = config['JOBS_LEASE_SECONDS']
+        self.poll_interval = config['JOBS_POLL_INTERVAL']
+        self.retry_base_seconds = config['JOBS_RETRY_BASE_SECONDS']
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        if mode == 'process':
+            self.executor = ProcessPoolExecutor(
+                max_workers=concurrency,
+                initializer=_init_process,
+                initargs=(dict(config),)
+            )
+        elif mode == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job')
+        else:
+            raise ValueError("mode must be 'thread' or 'process'")
+
+        self._running = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_renewal = 0.0
+
+    def free_slots(self):
+        with self._lock:
+            return self.concurrency - len(self._running)
+
+    def run_once(self):
+        """
+        Fill free pool slots with newly claimed jobs
+
+        Returns:
+            Number of jobs started
+        """
+        started = 0
+
+        while self.free_slots() > 0:
+            job = Job.claim(self.worker_id, self.lease_seconds, self.job_types)
+            if job is None:
+                break
+
+            job_id = str(job['_id'])
+            context = JobContext(job_id, self.worker_id, job['attempts'], job.get('tenant_id'))
+            logger.info(f"Running job {job['type']} ({job_id}), attempt {job['attempts']}")
+
+            future = self.executor.submit(execute, job['type'], job['payload'], context)
+            with self._lock:
+                self._running[job_id] = future
+            future.add_done_callback(lambda done, job_id=job_id: self._finish(job_id, done))
+            started += 1
+
+        return started
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            self._running.pop(job_id, None)
+
+        try:
+            error = future.exception()
+            if error is None:
+                if not Job.complete(job_id, self.worker_id, future.result()):
+                    logger.warning(f"Job {job_id} finished after its lease was lost")
+            else:
+                Job.fail(job_id, self.worker_id, f"{type(error).__name__}: {error}", self.retry_base_seconds)
+        except Exception as e:
+            logger.error(f"Failed to record result of job {job_id}: {str(e)}")
+
+    def renew_leases(self):
+        """Extend the leases of every job still running here"""
+        with self._lock:
+            job_ids = list(self._running)
+
+        for job_id in job_ids:
+            if not Job.renew_lease(job_id, self.worker_id, self.lease_seconds):
+                logger.warning(f"Lost lease on job {job_id}")
+
+    def run(self):
+        """Poll for jobs until stop() is called"""
+        logger.info(f"Job worker {self.worker_id} started ({self.mode}, {self.concurrency} slots)")
+
+        while not self._stop.is_set():
+            try:
+                Job.reap_expired()
+                self.run_once()
+
+                if time.monotonic() - self._last_renewal >= self.lease_seconds / 3:
+                    self.renew_leases()
+                    self._last_renewal = time.monotonic()
+            except Exception as e:
+                logger.error(f"Job worker error: {str(e)}")
+
+            self._stop.wait(self.poll_interval)
+
+        self.executor.shutdown(wait=True)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    def stop(self):
+        """Stop claiming jobs; run() returns once running jobs finish"""
+        self._stop.set()
+
+    def drain(self, timeout=None):
+        """
+        Run jobs until the queue is empty and nothing is running
+
+        Returns:
+            True if drained before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while deadline is None or time.monotonic() < deadline:
+            started = self.run_once()
+            if not started and self.free_slots() == self.concurrency:
+                return True
+            time.sleep(0.01)
+
+        return False
+
+
+def register_jobs(app):
+    """
+    Optionally run a job worker inside the web process
+
+    With JOBS_INPROCESS_WORKERS > 0 a thread-pool worker starts on the first
+    request in each process (so pre-fork workers each get their own).
+    Dedicated workers run with `flask run-worker`.
+
+    Args:
+        app: Flask application instance
+    """
+    slots = app.config.get('JOBS_INPROCESS_WORKERS', 0)
+    if not slots:
+        return
+    if not app.extensions['storage'].supports('jobs'):
+        logger.warning(f"JOBS_INPROCESS_WORKERS ignored: jobs need the mongo storage backend "
+                       f"(configured: {app.extensions['storage'].name})")
+        return
+
+    state = {'pid': None}
+    lock = threading.Lock()
+
+    @app.before_request
+    def start_inprocess_worker():
+        if state['pid'] == os.getpid():
+            return
+        with lock:
+            if state['pid'] == os.getpid():
+                return
+            worker = Worker(app.config, concurrency=slots, mode='thread')
+            threading.Thread(target=worker.run, name='job-worker', daemon=True).start()
+            app.extensions['job_worker'] = worker
+            state['pid'] = os.getpid()
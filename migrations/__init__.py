@@ -0,0 +1,48 @@
+# migrations - Versioned online migrations of task documents (MongoDB)
+"""
+Each migration lives in its own mNNNN_<name>.py module and is listed in
+MIGRATIONS in version order. `flask migrate` backfills them batch by batch
+(see migrations/runner.py); until it has, upgrade_document applies them to
+documents as they are read.
+"""
+from migrations.m0001_tenant_id import TenantId
+from migrations.m0002_soft_delete import SoftDelete
+from migrations.m0003_completed_at import CompletedAt
+from migrations.m0004_priority_rank import PriorityRank
+from migrations.m0005_tags import Tags
+from migrations.m0006_depends_on import DependsOn
+
+MIGRATIONS = [
+    TenantId(),
+    SoftDelete(),
+    CompletedAt(),
+    PriorityRank(),
+    Tags(),
+    DependsOn()
+]
+
+
+def get_migration(version):
+    """
+    Look up a migration by version
+
+    Raises:
+        ValueError: If no migration has this version
+    """
+    for migration in MIGRATIONS:
+        if migration.version == version:
+            return migration
+    raise ValueError(f"Unknown migration version: {version}")
+
+
+def upgrade_document(document):
+    """
+    Apply every migration a document still needs, in memory
+
+    Returns the document itself when it is fully migrated, otherwise an
+    upgraded copy (the stored document is not changed).
+    """
+    for migration in MIGRATIONS:
+        if migration.is_pending(document):
+            document = {**document, **migration.upgrade(document)}
+    return document
@@ -0,0 +1,54 @@
+# migrations/base.py - Base class for versioned document migrations
+
+
+class Migration:
+    """
+    One versioned change to the shape of task documents
+
+    A migration names the documents that still need it (pending_query) and
+    the fields to set on one of them (upgrade). The runner applies upgrade
+    in batches; Task.serialize applies it on read to documents the runner
+    has not reached yet, so upgrade must be a pure function of the document.
+    """
+
+    version = 0
+    name = ''
+    description = ''
+
+    @property
+    def id(self):
+        """Stable identifier used in the migrations collection"""
+        return f'{self.version:04d}_{self.name}'
+
+    def pending_query(self):
+        """MongoDB query matching documents not yet migrated"""
+        raise NotImplementedError
+
+    def is_pending(self, document):
+        """Whether a document read from storage still needs this migration"""
+        raise NotImplementedError
+
+    def upgrade(self, document):
+        """
+        Fields to set on a document that needs this migration
+
+        Args:
+            document: Task document as stored
+
+        Returns:
+            Dictionary of field values
+        """
+        raise NotImplementedError
+
+
+class AddField(Migration):
+    """Migration adding fields that older documents lack"""
+
+    # Field whose absence marks a document as not yet migrated
+    field = None
+
+    def pending_query(self):
+        return {self.field: {'$exists': False}}
+
+    def is_pending(self, document):
+        return self.field not in document
@@ -0,0 +1,15 @@
+# migrations/m0001_tenant_id.py - Assign pre-tenancy tasks to the default tenant
+from config import Config
+from migrations.base import AddField
+
+
+class TenantId(AddField):
+    """Tasks written before multi-tenancy belong to the default tenant"""
+
+    version = 1
+    name = 'tenant_id'
+    description = 'Set tenant_id to DEFAULT_TENANT on tasks created before tenancy'
+    field = 'tenant_id'
+
+    def upgrade(self, document):
+        return {'tenant_id': Config.DEFAULT_TENANT}
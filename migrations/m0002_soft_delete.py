@@ -0,0 +1,14 @@
+# migrations/m0002_soft_delete.py - Soft-delete flags on older tasks
+from migrations.base import AddField
+
+
+class SoftDelete(AddField):
+    """Tasks written before soft-delete are live"""
+
+    version = 2
+    name = 'soft_delete'
+    description = 'Set is_deleted=False and deleted_at=None on tasks created before soft-delete'
+    field = 'is_deleted'
+
+    def upgrade(self, document):
+        return {'is_deleted': False, 'deleted_at': None}
@@ -0,0 +1,15 @@
+# migrations/m0003_completed_at.py - Completion timestamps on older tasks
+from migrations.base import AddField
+
+
+class CompletedAt(AddField):
+    """Completed tasks without completed_at take their last update time"""
+
+    version = 3
+    name = 'completed_at'
+    description = 'Set completed_at (updated_at for completed tasks, else None) where missing'
+    field = 'completed_at'
+
+    def upgrade(self, document):
+        # The closest recorded time to the completion is the last update
+        return {'completed_at': document.get('updated_at') if document.get('completed') else None}
@@ -0,0 +1,16 @@
+# migrations/m0004_priority_rank.py - Numeric priority for the next-task view
+from config import Config
+from migrations.base import AddField
+
+
+class PriorityRank(AddField):
+    """Tasks need priority_rank to appear in /api/tasks/next and sort by importance"""
+
+    version = 4
+    name = 'priority_rank'
+    description = 'Set priority_rank from priority (Config.PRIORITY_RANKS)'
+    field = 'priority_rank'
+
+    def upgrade(self, document):
+        # Unknown priorities get a null rank so they are not picked up again
+        return {'priority_rank': Config.PRIORITY_RANKS.get(document.get('priority', 'medium'))}
@@ -0,0 +1,14 @@
+# migrations/m0005_tags.py - Tags on every task
+from migrations.base import AddField
+
+
+class Tags(AddField):
+    """Tasks created before tags existed get an empty tag list"""
+
+    version = 5
+    name = 'tags'
+    description = 'Set tags to an empty list'
+    field = 'tags'
+
+    def upgrade(self, document):
+        return {'tags': []}
@@ -0,0 +1,14 @@
+# migrations/m0006_depends_on.py - Dependencies between tasks
+from migrations.base import AddField
+
+
+class DependsOn(AddField):
+    """Tasks created before dependencies existed depend on nothing"""
+
+    version = 6
+    name = 'depends_on'
+    description = 'Set depends_on to an empty list'
+    field = 'depends_on'
+
+    def upgrade(self, document):
+        return {'depends_on': []}
@@ -0,0 +1,209 @@
+# migrations/runner.py - Batched, resumable and throttled migration runs
+import time
+from pymongo import UpdateOne
+from database import Database
+from migrations import MIGRATIONS
+from migrations.state import MigrationState
+from models.archive import TaskArchive
+from storage.mongo import MongoTaskBackend
+from utils.timestamps import utcnow
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationRunner:
+    """
+    Apply migrations to every live tasks collection while the app serves
+
+    Documents are visited in _id order, one batch at a time. After each
+    batch the last _id is recorded in the migrations collection (one state
+    document per migration and tasks collection), so an interrupted run
+    resumes where it stopped. Batches are separated by a pause and held back
+    while replication lag is high, like archival.
+    """
+
+    @staticmethod
+    def state_collection():
+        """Collection tracking migration progress"""
+        return MigrationState.collection()
+
+    @staticmethod
+    def state_id(migration, collection_name):
+        return MigrationState.state_id(migration, collection_name)
+
+    @staticmethod
+    def migrate_batch(migration, collection_name, after_id, batch_size):
+        """
+        Upgrade the next batch of pending documents after an _id
+
+        Each update re-checks the pending query, so documents the app has
+        rewritten in the meantime are left alone.
+
+        Args:
+            migration: Migration to apply
+            collection_name: Tasks collection
+            after_id: Only documents with a greater _id (None to start at the beginning)
+            batch_size: Maximum documents upgraded
+
+        Returns:
+            Tuple of (documents upgraded, last _id of the batch), or (0, None)
+            when no pending documents remain after after_id
+        """
+        collection = Database.get_collection(collection_name)
+        query = migration.pending_query()
+        if after_id is not None:
+            query = {'$and': [query, {'_id': {'$gt': after_id}}]}
+
+        documents = list(collection.find(query).sort('_id', 1).limit(batch_size))
+        if not documents:
+            return 0, None
+
+        result = collection.bulk_write([
+            UpdateOne({'_id': document['_id'], **migration.pending_query()}, {'$set': migration.upgrade(document)})
+            for document in documents
+        ], ordered=False)
+        return result.modified_count, documents[-1]['_id']
+
+    @staticmethod
+    def run_migration(migration, batch_size, pause_ms=0, max_lag=None, max_batches=None):
+        """
+        Apply one migration to every tasks collection, resuming recorded progress
+
+        Args:
+            migration: Migration to apply
+            batch_size: Documents per batch
+            pause_ms: Pause between batches
+            max_lag: Wait while replication lag exceeds this many seconds
+            max_batches: Stop after this many batches (the run can be resumed)
+
+        Returns:
+            Tuple of (documents upgraded, True if every collection is done)
+        """
+        states = MigrationRunner.state_collection()
+        upgraded = 0
+        batches = 0
+
+        for name in MongoTaskBackend.task_collection_names():
+            state_id = MigrationRunner.state_id(migration, name)
+            state = states.find_one({'_id': state_id}) or {}
+            if state.get('state') == 'done':
+                continue
+
+            now = utcnow()
+            states.update_one(
+                {'_id': state_id},
+                {
+                    '$set': {'state': 'running', 'updated_at': now, 'error': None},
+                    '$setOnInsert': {
+                        'migration': migration.id, 'version': migration.version, 'collection': name,
+                        'last_id': None, 'processed': 0, 'started_at': now
+                    }
+                },
+                upsert=True
+            )
+            last_id = state.get('last_id')
+
+            try:
+                while True:
+                    if max_batches is not None and batches >= max_batches:
+                        states.update_one({'_id': state_id}, {'$set': {'state': 'paused'}})
+                        return upgraded, False
+
+                    count, batch_last_id = MigrationRunner.migrate_batch(migration, name, last_id, batch_size)
+                    if batch_last_id is None:
+                        states.update_one(
+                            {'_id': state_id},
+                            {'$set': {'state': 'done', 'finished_at': utcnow(), 'updated_at': utcnow()}}
+                        )
+                        # Queries in this process switch to the migrated shape right away
+                        MigrationState.reset()
+                        break
+
+                    last_id = batch_last_id
+                    upgraded += count
+                    batches += 1
+                    states.update_one(
+                        {'_id': state_id},
+                        {'$set': {'last_id': last_id, 'updated_at': utcnow()}, '$inc': {'processed': count}}
+                    )
+
+                    if pause_ms:
+                        time.sleep(pause_ms / 1000.0)
+                    if max_lag is not None:
+                        TaskArchive.wait_for_replication(max_lag)
+
+            except Exception as e:
+                logger.error(f"Migration {migration.id} failed on {name}: {str(e)}")
+                states.update_one({'_id': state_id}, {'$set': {'state': 'failed', 'error': str(e)}})
+                raise
+
+            logger.info(f"Migration {migration.id} done on {name}")
+
+        return upgraded, True
+
+    @staticmethod
+    def run(target=None, batch_size=None, pause_ms=None, max_lag=None, max_batches=None):
+        """
+        Apply every migration up to target version, in version order
+
+        Returns:
+            Dictionary mapping migration id to documents upgraded in this run
+        """
+        config = Database.config
+        batch_size = batch_size or config['MIGRATION_BATCH_SIZE']
+        pause_ms = config['MIGRATION_BATCH_PAUSE_MS'] if pause_ms is None else pause_ms
+        max_lag = config['MIGRATION_MAX_REPLICATION_LAG'] if max_lag is None else max_lag
+
+        totals = {}
+        for migration in MIGRATIONS:
+            if target is not None and migration.version > target:
+                break
+
+            totals[migration.id], done = MigrationRunner.run_migration(
+                migration, batch_size, pause_ms, max_lag, max_batches
+            )
+            if not done:
+                # Later migrations wait until this one has finished
+                break
+
+        return totals
+
+    @staticmethod
+    def status():
+        """
+        Progress of every migration
+
+        Returns:
+            List of dictionaries with id, description, state ('pending',
+            'running', 'paused', 'failed' or 'done'), processed and the
+            per-collection state documents
+        """
+        collections = MongoTaskBackend.task_collection_names()
+        states = {state['_id']: state for state in MigrationRunner.state_collection().find()}
+
+        report = []
+        for migration in MIGRATIONS:
+            per_collection = [
+                states.get(MigrationRunner.state_id(migration, name), {'collection': name, 'state': 'pending'})
+                for name in collections
+            ]
+            values = {state['state'] for state in per_collection}
+
+            if values <= {'done'}:
+                overall = 'done'
+            elif 'failed' in values:
+                overall = 'failed'
+            elif values == {'pending'}:
+                overall = 'pending'
+            else:
+                overall = 'running' if 'running' in values else 'paused'
+
+            report.append({
+                'id': migration.id,
+                'description': migration.description,
+                'state': overall,
+                'processed': sum(state.get('processed', 0) for state in per_collection),
+                'collections': per_collection
+            })
+        return report
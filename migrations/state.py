@@ -0,0 +1,94 @@
+# migrations/state.py - Which migrations are done on which tasks collections
+import time
+from database import Database
+from migrations import MIGRATIONS
+from utils.timestamps import utcnow
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationState:
+    """
+    Cached view of the migrations finished on each tasks collection
+
+    Queries use it to decide whether documents may still lack a migrated
+    field, in which case they must not filter on it. 'done' never goes back,
+    so a collection with every migration done is cached for good; otherwise
+    the state is read again after MIGRATION_STATE_TTL seconds, so workers
+    notice a `flask migrate` run from another process. An empty collection
+    has nothing to migrate, so every migration is recorded as done on it
+    straight away (fresh databases and new tenant collections).
+    """
+
+    # collection name -> (monotonic time read, set of migration ids done)
+    _cache = {}
+
+    @staticmethod
+    def collection():
+        """Collection holding one state document per migration and tasks collection"""
+        return Database.get_collection(Database.config['MIGRATIONS_COLLECTION'])
+
+    @staticmethod
+    def state_id(migration, collection_name):
+        """_id of a migration's state document for one tasks collection"""
+        return f'{migration.id}:{collection_name}'
+
+    @staticmethod
+    def done(collection_name):
+        """
+        Ids of the migrations done on a tasks collection
+
+        Returns the cached set while it is fresh; when the state cannot be
+        read, no migration is assumed done (queries stay correct, only
+        slower).
+        """
+        cached = MigrationState._cache.get(collection_name)
+        now = time.monotonic()
+        if cached is not None and (
+                len(cached[1]) == len(MIGRATIONS) or now - cached[0] < Database.config['MIGRATION_STATE_TTL']):
+            return cached[1]
+
+        try:
+            done = {
+                state['migration'] for state in MigrationState.collection().find(
+                    {'collection': collection_name, 'state': 'done'}, {'migration': 1}
+                )
+            }
+            if len(done) < len(MIGRATIONS) and \
+                    Database.get_collection(collection_name).estimated_document_count() == 0:
+                MigrationState.mark_done(collection_name, [m for m in MIGRATIONS if m.id not in done])
+                done = {migration.id for migration in MIGRATIONS}
+        except Exception as e:
+            logger.warning(f"Failed to read migration state of {collection_name}: {str(e)}")
+            return cached[1] if cached is not None else set()
+
+        MigrationState._cache[collection_name] = (now, done)
+        return done
+
+    @staticmethod
+    def is_done(migration, collection_name):
+        return migration.id in MigrationState.done(collection_name)
+
+    @staticmethod
+    def mark_done(collection_name, migrations):
+        """Record migrations as done on a collection that holds no documents to upgrade"""
+        now = utcnow()
+        for migration in migrations:
+            MigrationState.collection().update_one(
+                {'_id': MigrationState.state_id(migration, collection_name)},
+                {
+                    '$set': {'state': 'done', 'finished_at': now, 'updated_at': now},
+                    '$setOnInsert': {
+                        'migration': migration.id, 'version': migration.version, 'collection': collection_name,
+                        'last_id': None, 'processed': 0, 'started_at': now
+                    }
+                },
+                upsert=True
+            )
+        logger.info(f"Migrations recorded as done on empty collection {collection_name}")
+
+    @staticmethod
+    def reset():
+        """Forget cached states (after a migration run in this process)"""
+        MigrationState._cache.clear()
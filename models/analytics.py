@@ -0,0 +1,195 @@
+# models/analytics.py - Time-bucketed task analytics with persisted rollups
+import statistics
+from datetime import timedelta
+from pymongo import ASCENDING, UpdateOne
+from database import Database
+from models.task import Task
+from utils.sessions import current_session
+from utils.timestamps import utcnow, to_utc
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TaskAnalytics:
+    """
+    Created/completed counts and median lead time per day or week
+
+    Buckets are computed with $dateTrunc and saved to a rollup collection.
+    A bucket that has fully ended is final and is read back from the rollup
+    from then on, so a query over a long range only aggregates the buckets
+    that are missing or still open.
+    """
+
+    UNITS = ('day', 'week')
+
+    # Rollup collections already prepared in this process
+    _prepared_collections = set()
+
+    @staticmethod
+    def get_rollup_collection():
+        """Get the rollup collection, creating its unique index on first use"""
+        name = Database.config['ROLLUP_COLLECTION']
+        collection = Database.get_collection(name)
+
+        if name not in TaskAnalytics._prepared_collections:
+            try:
+                collection.create_index(
+                    [('tenant_id', ASCENDING), ('unit', ASCENDING), ('bucket', ASCENDING)],
+                    unique=True
+                )
+            except Exception as e:
+                logger.warning(f"Failed to create rollup index: {str(e)}")
+            TaskAnalytics._prepared_collections.add(name)
+
+        return collection
+
+    @staticmethod
+    def truncate(value, unit):
+        """Start of the UTC day or ISO week (Monday) containing value"""
+        day = to_utc(value).replace(hour=0, minute=0, second=0, microsecond=0)
+        if unit == 'week':
+            day -= timedelta(days=day.weekday())
+        return day
+
+    @staticmethod
+    def step(unit):
+        return timedelta(days=7 if unit == 'week' else 1)
+
+    @staticmethod
+    def bucket_starts(start, end, unit):
+        """Bucket starts covering [start, end)"""
+        buckets = []
+        bucket = TaskAnalytics.truncate(start, unit)
+        while bucket < end:
+            buckets.append(bucket)
+            bucket += TaskAnalytics.step(unit)
+        return buckets
+
+    @staticmethod
+    def aggregate_buckets(tenant, unit, start, end):
+        """
+        Aggregate created and completed counts for buckets in [start, end)
+
+        Returns:
+            Dictionary mapping bucket start to its metrics
+        """
+        collection = Task.get_collection(tenant, operation='stats')
+
+        def truncated(field):
+            return {'$dateTrunc': {'date': f'${field}', 'unit': unit, 'timezone': 'UTC', 'startOfWeek': 'monday'}}
+
+        pipeline = [
+            {'$match': Task.tenant_query(tenant, {'$or': [
+                {'created_at': {'$gte': start, '$lt': end}},
+                {'completed_at': {'$gte': start, '$lt': end}}
+            ]})},
+            {'$facet': {
+                'created': [
+                    {'$match': {'created_at': {'$gte': start, '$lt': end}}},
+                    {'$group': {'_id': truncated('created_at'), 'count': {'$sum': 1}}}
+                ],
+                'completed': [
+                    {'$match': {'completed_at': {'$gte': start, '$lt': end}}},
+                    {'$group': {
+                        '_id': truncated('completed_at'),
+                        'count': {'$sum': 1},
+                        'lead_times': {'$push': {'$subtract': ['$completed_at', '$created_at']}}
+                    }}
+                ]
+            }}
+        ]
+
+        result = list(collection.aggregate(pipeline, session=current_session()))[0]
+        buckets = {}
+
+        def bucket_for(key):
+            key = to_utc(key)
+            return buckets.setdefault(key, {
+                'created': 0, 'completed': 0, 'median_lead_time_ms': None
+            })
+
+        for item in result['created']:
+            bucket_for(item['_id'])['created'] = item['count']
+
+        for item in result['completed']:
+            metrics = bucket_for(item['_id'])
+            metrics['completed'] = item['count']
+            lead_times = [value for value in item['lead_times'] if value is not None]
+            if lead_times:
+                metrics['median_lead_time_ms'] = statistics.median(lead_times)
+
+        return buckets
+
+    @staticmethod
+    def get_series(tenant=None, unit='day', start=None, end=None, refresh=False):
+        """
+        Get per-bucket analytics for a tenant
+
+        Args:
+            tenant: Tenant ID
+            unit: 'day' or 'week'
+            start: Range start (datetime)
+            end: Range end, exclusive (datetime)
+            refresh: Recompute every bucket, ignoring saved rollups
+
+        Returns:
+            Tuple of (list of bucket dictionaries, number of buckets computed)
+        """
+        try:
+            tenant = Task.resolve_tenant(tenant)
+            now = utcnow()
+            step = TaskAnalytics.step(unit)
+            buckets = TaskAnalytics.bucket_starts(start, end, unit)
+            if not buckets:
+                return [], 0
+
+            rollups = TaskAnalytics.get_rollup_collection()
+            saved = {}
+            if not refresh:
+                for doc in rollups.find({
+                    'tenant_id': tenant,
+                    'unit': unit,
+                    'bucket': {'$gte': buckets[0], '$lte': buckets[-1]},
+                    'final': True
+                }):
+                    saved[to_utc(doc['bucket'])] = doc
+
+            missing = [bucket for bucket in buckets if bucket not in saved]
+            computed = {}
+            if missing:
+                computed = TaskAnalytics.aggregate_buckets(tenant, unit, missing[0], missing[-1] + step)
+
+                operations = []
+                for bucket in missing:
+                    metrics = computed.get(bucket) or {'created': 0, 'completed': 0, 'median_lead_time_ms': None}
+                    computed[bucket] = metrics
+                    operations.append(UpdateOne(
+                        {'tenant_id': tenant, 'unit': unit, 'bucket': bucket},
+                        {'$set': {**metrics, 'final': bucket + step <= now, 'computed_at': now}},
+                        upsert=True
+                    ))
+                rollups.bulk_write(operations, ordered=False)
+
+            series = []
+            for bucket in buckets:
+                metrics = saved.get(bucket) or computed[bucket]
+                series.append({
+                    'bucket': bucket,
+                    'created': metrics['created'],
+                    'completed': metrics['completed'],
+                    'median_lead_time_ms': metrics['median_lead_time_ms']
+                })
+
+            logger.info(f"Analytics for {tenant}: {len(buckets)} buckets, {len(missing)} computed")
+            return series, len(missing)
+
+        except Exception as e:
+            logger.error(f"Error getting analytics: {str(e)}")
+            raise
+
+    @staticmethod
+    def default_range(unit, now=None):
+        """Last 30 days or 12 weeks, ending after the current bucket"""
+        now = now or utcnow()
+        end = TaskAnalytics.truncate(now, unit) + TaskAnalytics.step(unit)
+        return end - TaskAnalytics.step(unit) * (30 if unit == 'day' else 12), end
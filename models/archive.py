@@ -0,0 +1,151 @@
+# models/archive.py - Archival of completed and soft-deleted tasks
+import time
+from datetime import timedelta
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError
+from database import Database
+from storage.mongo import MongoTaskBackend
+from utils.health_monitor import replication_lag_seconds
+from utils.timestamps import utcnow
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TaskArchive:
+    """Move old completed and soft-deleted tasks out of the live collections"""
+
+    @staticmethod
+    def candidate_query(cutoff):
+        """
+        Query matching tasks that are due for archival
+
+        Each branch matches one of the partial archive_* indexes. Completed
+        tasks age from completion, so later edits do not keep them live.
+        """
+        return {'$or': [
+            {'is_deleted': True, 'deleted_at': {'$lt': cutoff}},
+            {'completed': True, 'is_deleted': False, 'completed_at': {'$lt': cutoff}}
+        ]}
+
+    @staticmethod
+    def task_collection_names():
+        """Names of every live tasks collection (shared and per-tenant)"""
+        return MongoTaskBackend.task_collection_names()
+
+    @staticmethod
+    def wait_for_replication(max_lag, max_wait=60.0):
+        """Block while secondaries are further behind than max_lag seconds"""
+        deadline = time.monotonic() + max_wait
+
+        while time.monotonic() < deadline:
+            lag = replication_lag_seconds(Database.get_client())
+            if lag is None or lag <= max_lag:
+                return
+            logger.info(f"Archival paused: replication lag {lag:.1f}s")
+            time.sleep(min(lag, 5.0))
+
+    @staticmethod
+    def archive_collection_name(collection_name):
+        """Archive collection of a live tasks collection"""
+        return collection_name + Database.config['ARCHIVE_COLLECTION_SUFFIX']
+
+    @staticmethod
+    def archive_batch(collection_name, cutoff, batch_size):
+        """
+        Move one batch of archivable tasks into the archive collection
+
+        Documents are copied first and deleted second, so a crash in between
+        leaves duplicates (skipped on the next run) rather than lost tasks.
+        The archive collection must already be prepared (run does that once
+        per collection).
+
+        Args:
+            collection_name: Live tasks collection
+            cutoff: Tasks completed/deleted before this datetime are archived
+            batch_size: Maximum documents moved
+
+        Returns:
+            Tuple of (documents fetched, documents archived); fewer are
+            archived than fetched when tasks changed in between
+        """
+        majority = WriteConcern('majority')
+        live = Database.get_collection(collection_name).with_options(write_concern=majority)
+        archive = Database.get_collection(
+            TaskArchive.archive_collection_name(collection_name)
+        ).with_options(write_concern=majority)
+
+        query = TaskArchive.candidate_query(cutoff)
+        documents = list(live.find(query).limit(batch_size))
+        if not documents:
+            return 0, 0
+
+        archived_at = utcnow()
+        for document in documents:
+            document['archived_at'] = archived_at
+
+        try:
+            archive.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Duplicates come from an interrupted earlier run
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+
+        ids = [document['_id'] for document in documents]
+        result = live.delete_many({'_id': {'$in': ids}, **query})
+
+        remaining = set()
+        if result.deleted_count < len(ids):
+            # Some tasks changed (e.g. were reopened) after being copied
+            remaining = {doc['_id'] for doc in live.find({'_id': {'$in': ids}}, {'_id': 1})}
+            if remaining:
+                archive.delete_many({'_id': {'$in': list(remaining)}})
+
+        # Tag counters cover live tasks; soft-deleted ones were already subtracted
+        MongoTaskBackend.count_tags(
+            (document.get('tenant_id'), document.get('tags'), -1)
+            for document in documents
+            if document['_id'] not in remaining and not document.get('is_deleted')
+        )
+
+        return len(documents), result.deleted_count
+
+    @staticmethod
+    def run(older_than_days=None, batch_size=None, pause_ms=None, max_lag=None):
+        """
+        Archive every due task, batch by batch, in all task collections
+
+        Batches are separated by pause_ms and held back while replication
+        lag exceeds max_lag, so archival never swamps the secondaries.
+
+        Returns:
+            Dictionary mapping collection name to documents archived
+        """
+        config = Database.config
+        older_than_days = config['ARCHIVE_AFTER_DAYS'] if older_than_days is None else older_than_days
+        batch_size = batch_size or config['ARCHIVE_BATCH_SIZE']
+        pause_ms = config['ARCHIVE_BATCH_PAUSE_MS'] if pause_ms is None else pause_ms
+        max_lag = config['ARCHIVE_MAX_REPLICATION_LAG'] if max_lag is None else max_lag
+
+        cutoff = utcnow() - timedelta(days=older_than_days)
+        totals = {}
+
+        for name in TaskArchive.task_collection_names():
+            totals[name] = 0
+            # Indexes once per collection, not once per batch
+            Database.prepare_archive_collection(TaskArchive.archive_collection_name(name))
+            while True:
+                fetched, moved = TaskArchive.archive_batch(name, cutoff, batch_size)
+                totals[name] += moved
+                # A short fetch means nothing due is left (a short delete only
+                # means some tasks changed after being fetched)
+                if fetched < batch_size:
+                    break
+
+                if pause_ms:
+                    time.sleep(pause_ms / 1000.0)
+                TaskArchive.wait_for_replication(max_lag)
+
+            if totals[name]:
+                logger.info(f"Archived {totals[name]} tasks from {name}")
+
+        return totals
@@ -0,0 +1,129 @@
+# models/dependency.py - Dependencies between tasks (depends_on)
+from bson import ObjectId
+from storage import get_backend
+from utils.dependency_cache import current_dependency_cache, next_order_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TaskDependencies:
+    """
+    Checks and traversals of the depends_on graph
+
+    Reads use the in-process graph of hot tenants when there is one and the
+    storage backend's traversal ($graphLookup on MongoDB) otherwise. Write
+    checks always ask the backend (the primary on MongoDB), so they never see
+    a stale graph.
+    """
+
+    @staticmethod
+    def graph(tenant):
+        """Cached dependency graph of a hot tenant, or None"""
+        cache = current_dependency_cache()
+        if cache is None:
+            return None
+        return cache.get(tenant, lambda: get_backend().dependency_edges(tenant))
+
+    @staticmethod
+    def prepare(tenant, object_id, dependency_ids):
+        """
+        Validate a task's new dependencies
+
+        Every dependency must be a live task of the tenant, and none may
+        (transitively) depend on the task itself. Two concurrent writes can
+        still close a cycle between them; traversals stop at revisited tasks,
+        so such a cycle is harmless and the next write to either task
+        reports it.
+
+        Args:
+            tenant: Tenant ID
+            object_id: ObjectId of the task being changed (None when creating it)
+            dependency_ids: Task ID strings (validated format)
+
+        Returns:
+            List of dependency ObjectIds, without duplicates
+
+        Raises:
+            ValueError: For self-dependencies, unknown tasks and cycles
+        """
+        dependencies = list(dict.fromkeys(ObjectId(dependency_id) for dependency_id in dependency_ids))
+        if not dependencies:
+            return []
+
+        if object_id in dependencies:
+            raise ValueError("A task cannot depend on itself")
+
+        backend = get_backend()
+        found = {task['_id'] for task in backend.find_many(tenant, dependencies)}
+        missing = [str(dependency) for dependency in dependencies if dependency not in found]
+        if missing:
+            raise ValueError(f"Unknown dependencies: {', '.join(missing)}")
+
+        if object_id is not None:
+            reachable = {task['_id'] for task in backend.dependency_closure(tenant, dependencies, for_write=True)}
+            if object_id in reachable:
+                raise ValueError("Dependencies would create a cycle")
+
+        return dependencies
+
+    @staticmethod
+    def sort(tasks):
+        """Order tasks by priority, then due date (the next-task order)"""
+        return sorted(tasks, key=lambda task: (
+            next_order_key(task.get('priority_rank'), task.get('due_date')), task['_id']
+        ))
+
+    @staticmethod
+    def closure(tenant, object_id, ids_only=False):
+        """
+        Live tasks a task depends on, directly or transitively
+
+        Args:
+            tenant: Tenant ID
+            object_id: Task ObjectId
+            ids_only: Return the set of _ids only (no task reads for hot tenants)
+
+        Returns:
+            List of task documents in next-task order, or a set of _ids
+        """
+        graph = TaskDependencies.graph(tenant)
+        if graph is not None:
+            ids = graph.closure([object_id])
+            if ids_only:
+                return ids
+            tasks = get_backend().find_many(tenant, list(ids))
+        else:
+            tasks = get_backend().dependency_closure(tenant, [object_id])
+            if ids_only:
+                return {task['_id'] for task in tasks}
+        return TaskDependencies.sort(tasks)
+
+    @staticmethod
+    def unblocked(tenant, limit):
+        """
+        Incomplete tasks whose live dependencies are all completed
+
+        Returns:
+            List of at most limit task documents in next-task order
+        """
+        graph = TaskDependencies.graph(tenant)
+        if graph is None:
+            return get_backend().unblocked_tasks(tenant, limit)
+
+        ids = graph.unblocked(limit)
+        found = {task['_id']: task for task in get_backend().find_many(tenant, ids)}
+        return [found[object_id] for object_id in ids if object_id in found]
+
+    @staticmethod
+    def task_written(tenant, task):
+        """Keep a cached graph in step with a created or changed task"""
+        cache = current_dependency_cache()
+        if cache is not None and task:
+            cache.task_written(tenant, task)
+
+    @staticmethod
+    def task_removed(tenant, object_id):
+        """Keep a cached graph in step with a deleted task"""
+        cache = current_dependency_cache()
+        if cache is not None:
+            cache.task_removed(tenant, object_id)
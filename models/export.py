@@ -0,0 +1,199 @@
+# models/export.py - Bulk task exports to compressed files
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId
+from database import Database
+from models.task import Task
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TaskExport:
+    """
+    Export a tenant's tasks to a gzip file
+
+    The _id range is split into partitions that are scanned in parallel
+    (each on the tenant_id/_id index), written to separate gzip parts and
+    concatenated at the end: concatenated gzip members form a valid gzip file.
+    """
+
+    # format -> file extension
+    FORMATS = {
+        'ndjson': 'ndjson.gz',
+        'columnar': 'columnar.json.gz'
+    }
+
+    @staticmethod
+    def file_path(job_id, export_format):
+        """Path of the finished export file for a job"""
+        return os.path.join(
+            Database.config['EXPORT_DIR'],
+            f"{job_id}.{TaskExport.FORMATS[export_format]}"
+        )
+
+    @staticmethod
+    def partition_bounds(collection, query, partitions):
+        """
+        Split the matching _id range into contiguous partitions
+
+        ObjectIds start with their creation time, so the range between the
+        first and last _id is split evenly by time.
+
+        Returns:
+            List of (lower, upper) ObjectId bounds; upper is exclusive, None means open
+        """
+        first = collection.find_one(query, {'_id': 1}, sort=[('_id', 1)])
+        last = collection.find_one(query, {'_id': 1}, sort=[('_id', -1)])
+        if first is None:
+            return []
+
+        start = first['_id'].generation_time.timestamp()
+        end = last['_id'].generation_time.timestamp()
+        partitions = max(1, min(partitions, int(end - start) + 1))
+        step = (end - start) / partitions
+
+        bounds = [first['_id']]
+        for i in range(1, partitions):
+            bounds.append(ObjectId(int(start + step * i).to_bytes(4, 'big') + b'\x00' * 8))
+
+        return [
+            (bounds[i], bounds[i + 1] if i + 1 < len(bounds) else None)
+            for i in range(len(bounds))
+        ]
+
+    @staticmethod
+    def encode_chunk(tasks, export_format):
+        """Encode serialized tasks as NDJSON lines or one columnar row group"""
+        if export_format == 'columnar':
+            columns = {field: [task[field] for task in tasks] for field in tasks[0]}
+            return json.dumps({'rows': len(tasks), 'columns': columns}) + '\n'
+        return ''.join(json.dumps(task) + '\n' for task in tasks)
+
+    @staticmethod
+    def write_partition(collection, query, bounds, path, export_format, chunk_size, on_chunk):
+        """
+        Write one _id partition to its own gzip part
+
+        Returns:
+            Number of tasks written
+        """
+        lower, upper = bounds
+        id_range = {'$gte': lower}
+        if upper is not None:
+            id_range['$lt'] = upper
+
+        cursor = collection.find({**query, '_id': id_range}).sort('_id', 1).batch_size(chunk_size)
+        written = 0
+        chunk = []
+
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as output:
+            for task in cursor:
+                chunk.append(task)
+                if len(chunk) >= chunk_size:
+                    output.write(TaskExport.encode_chunk(Task.serialize_many(chunk), export_format))
+                    written += len(chunk)
+                    on_chunk(len(chunk))
+                    chunk = []
+
+            if chunk:
+                output.write(TaskExport.encode_chunk(Task.serialize_many(chunk), export_format))
+                written += len(chunk)
+                on_chunk(len(chunk))
+
+        return written
+
+    @staticmethod
+    def purge_expired(directory, max_age_seconds):
+        """Delete export files older than max_age_seconds"""
+        if not os.path.isdir(directory):
+            return
+
+        cutoff = time.time() - max_age_seconds
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError as e:
+                logger.warning(f"Failed to remove expired export {name}: {str(e)}")
+
+    @staticmethod
+    def run(job_id, tenant, export_format='ndjson', filters=None, progress=None):
+        """
+        Export a tenant's live tasks to a compressed file
+
+        Args:
+            job_id: Export job ID (names the file)
+            tenant: Tenant whose tasks are exported
+            export_format: 'ndjson' or 'columnar'
+            filters: Optional task filters (completed, priority, status)
+            progress: Optional callback receiving a progress dictionary
+
+        Returns:
+            Dictionary with file, format, count and size_bytes
+        """
+        config = Database.config
+        directory = config['EXPORT_DIR']
+        os.makedirs(directory, exist_ok=True)
+        TaskExport.purge_expired(directory, config['EXPORT_RETENTION_SECONDS'])
+
+        collection = Task.get_collection(tenant, operation='export')
+        query = Task.tenant_query(tenant, filters)
+        total = collection.count_documents(query)
+        partitions = TaskExport.partition_bounds(collection, query, config['EXPORT_PARTITIONS'])
+
+        path = TaskExport.file_path(job_id, export_format)
+        part_paths = [f"{path}.part{i}" for i in range(len(partitions))]
+        state = {'exported': 0, 'last_report': 0.0}
+        lock = threading.Lock()
+
+        def on_chunk(count):
+            with lock:
+                state['exported'] += count
+                now = time.monotonic()
+                if progress is None or now - state['last_report'] < 1.0:
+                    return
+                state['last_report'] = now
+                exported = state['exported']
+            progress({'exported': exported, 'total': total})
+
+        try:
+            if partitions:
+                with ThreadPoolExecutor(max_workers=len(partitions), thread_name_prefix='export') as pool:
+                    futures = [
+                        pool.submit(TaskExport.write_partition, collection, query, bounds, part_path,
+                                    export_format, config['EXPORT_CHUNK_SIZE'], on_chunk)
+                        for bounds, part_path in zip(partitions, part_paths)
+                    ]
+                    for future in futures:
+                        future.result()
+
+                # Concatenated gzip members decompress as one stream
+                with open(path + '.tmp', 'wb') as output:
+                    for part_path in part_paths:
+                        with open(part_path, 'rb') as part:
+                            shutil.copyfileobj(part, output)
+            else:
+                with gzip.open(path + '.tmp', 'wt', encoding='utf-8'):
+                    pass
+            os.replace(path + '.tmp', path)
+        finally:
+            for part_path in part_paths:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+
+        if progress is not None:
+            progress({'exported': state['exported'], 'total': total})
+
+        logger.info(f"Exported {state['exported']} tasks for tenant {tenant} to {path}")
+        return {
+            'file': os.path.basename(path),
+            'format': export_format,
+            'count': state['exported'],
+            'size_bytes': os.path.getsize(path)
+        }
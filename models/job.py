@@ -0,0 +1,276 @@
+# models/job.py - Background job model with leases and retries
+from datetime import timedelta
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from database import Database
+from utils.timestamps import utcnow, format_iso
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Job:
+    """
+    Background job persisted in MongoDB
+
+    Workers claim a job by taking a time-limited lease on it. A worker that
+    dies stops renewing its lease, and the job becomes claimable again once
+    the lease expires, so several app instances can share one queue without
+    running a job twice at the same time.
+    """
+
+    STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+    # Jobs collections already prepared in this process
+    _prepared_collections = set()
+
+    @staticmethod
+    def get_collection():
+        """Get the jobs collection, creating its indexes on first use"""
+        name = Database.config['JOBS_COLLECTION']
+        collection = Database.get_collection(name)
+
+        if name not in Job._prepared_collections:
+            try:
+                collection.create_index([('status', ASCENDING), ('run_at', ASCENDING)])
+                collection.create_index([('status', ASCENDING), ('lease_expires_at', ASCENDING)])
+                # Finished jobs expire after the retention period
+                collection.create_index(
+                    'finished_at',
+                    expireAfterSeconds=Database.config['JOBS_RETENTION_SECONDS']
+                )
+            except Exception as e:
+                logger.warning(f"Failed to create job indexes: {str(e)}")
+            Job._prepared_collections.add(name)
+
+        return collection
+
+    @staticmethod
+    def serialize(job):
+        """Convert a job document to JSON serializable format"""
+        if not job:
+            return None
+
+        return {
+            'id': str(job['_id']),
+            'type': job['type'],
+            'status': job['status'],
+            'attempts': job.get('attempts', 0),
+            'max_attempts': job.get('max_attempts'),
+            'progress': job.get('progress'),
+            'result': job.get('result'),
+            'error': job.get('error'),
+            'created_at': format_iso(job.get('created_at')),
+            'started_at': format_iso(job.get('started_at')),
+            'finished_at': format_iso(job.get('finished_at'))
+        }
+
+    @staticmethod
+    def enqueue(job_type, payload=None, tenant=None, max_attempts=None, delay_seconds=0):
+        """
+        Queue a job
+
+        Args:
+            job_type: Registered handler name
+            payload: JSON-like handler arguments
+            tenant: Tenant the job belongs to (None for system jobs)
+            max_attempts: Attempts before the job fails for good
+            delay_seconds: Earliest start, relative to now
+
+        Returns:
+            Created job document
+        """
+        try:
+            now = utcnow()
+            job = {
+                'type': job_type,
+                'payload': payload or {},
+                'tenant_id': tenant,
+                'status': 'queued',
+                'attempts': 0,
+                'max_attempts': max_attempts or Database.config['JOBS_MAX_ATTEMPTS'],
+                'run_at': now + timedelta(seconds=delay_seconds),
+                'lease_owner': None,
+                'lease_expires_at': None,
+                'progress': None,
+                'result': None,
+                'error': None,
+                'created_at': now,
+                'updated_at': now,
+                'started_at': None,
+                'finished_at': None
+            }
+
+            result = Job.get_collection().insert_one(job)
+            job['_id'] = result.inserted_id
+            logger.info(f"Job queued: {job_type} ({result.inserted_id})")
+            return job
+
+        except Exception as e:
+            logger.error(f"Error queueing job: {str(e)}")
+            raise
+
+    @staticmethod
+    def claim(worker_id, lease_seconds, job_types=None):
+        """
+        Atomically lease the next runnable job
+
+        Runnable jobs are queued jobs whose run_at has passed, and running
+        jobs whose lease expired while attempts remain.
+
+        Returns:
+            Claimed job document, or None if the queue is empty
+        """
+        now = utcnow()
+        query = {
+            '$or': [
+                {'status': 'queued', 'run_at': {'$lte': now}},
+                {'status': 'running', 'lease_expires_at': {'$lt': now}}
+            ],
+            '$expr': {'$lt': ['$attempts', '$max_attempts']}
+        }
+        if job_types:
+            query['type'] = {'$in': list(job_types)}
+
+        return Job.get_collection().find_one_and_update(
+            query,
+            {
+                '$set': {
+                    'status': 'running',
+                    'lease_owner': worker_id,
+                    'lease_expires_at': now + timedelta(seconds=lease_seconds),
+                    'started_at': now,
+                    'updated_at': now
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('run_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def _owned(job_id, worker_id):
+        """Query matching a job only while worker_id holds its lease"""
+        return {'_id': ObjectId(job_id), 'status': 'running', 'lease_owner': worker_id}
+
+    @staticmethod
+    def renew_lease(job_id, worker_id, lease_seconds):
+        """
+        Extend a lease the worker still holds
+
+        Returns:
+            False if the lease was lost to another worker
+        """
+        now = utcnow()
+        result = Job.get_collection().update_one(
+            Job._owned(job_id, worker_id),
+            {'$set': {'lease_expires_at': now + timedelta(seconds=lease_seconds), 'updated_at': now}}
+        )
+        return result.matched_count == 1
+
+    @staticmethod
+    def set_progress(job_id, worker_id, progress):
+        """Record handler progress (ignored once the lease is lost)"""
+        Job.get_collection().update_one(
+            Job._owned(job_id, worker_id),
+            {'$set': {'progress': progress, 'updated_at': utcnow()}}
+        )
+
+    @staticmethod
+    def complete(job_id, worker_id, result=None):
+        """Mark a job succeeded; returns False if the lease was lost"""
+        now = utcnow()
+        update = Job.get_collection().update_one(
+            Job._owned(job_id, worker_id),
+            {'$set': {
+                'status': 'succeeded',
+                'result': result,
+                'error': None,
+                'lease_owner': None,
+                'lease_expires_at': None,
+                'finished_at': now,
+                'updated_at': now
+            }}
+        )
+        return update.matched_count == 1
+
+    @staticmethod
+    def fail(job_id, worker_id, error, retry_base_seconds):
+        """
+        Record a failed attempt
+
+        The job is queued again with exponential backoff until it runs out of
+        attempts, then marked failed.
+
+        Returns:
+            New status ('queued' or 'failed'), or None if the lease was lost
+        """
+        collection = Job.get_collection()
+        job = collection.find_one(Job._owned(job_id, worker_id))
+        if job is None:
+            return None
+
+        now = utcnow()
+        update = {
+            'error': error,
+            'lease_owner': None,
+            'lease_expires_at': None,
+            'updated_at': now
+        }
+
+        if job['attempts'] < job['max_attempts']:
+            update['status'] = 'queued'
+            update['run_at'] = now + timedelta(seconds=retry_base_seconds * 2 ** (job['attempts'] - 1))
+        else:
+            update['status'] = 'failed'
+            update['finished_at'] = now
+
+        collection.update_one(Job._owned(job_id, worker_id), {'$set': update})
+        logger.warning(f"Job {job_id} attempt {job['attempts']} failed ({update['status']}): {error}")
+        return update['status']
+
+    @staticmethod
+    def reap_expired():
+        """
+        Fail jobs whose lease expired on their last allowed attempt
+
+        Returns:
+            Number of jobs marked failed
+        """
+        now = utcnow()
+        result = Job.get_collection().update_many(
+            {
+                'status': 'running',
+                'lease_expires_at': {'$lt': now},
+                '$expr': {'$gte': ['$attempts', '$max_attempts']}
+            },
+            {'$set': {
+                'status': 'failed',
+                'error': 'Lease expired on the final attempt',
+                'lease_owner': None,
+                'lease_expires_at': None,
+                'finished_at': now,
+                'updated_at': now
+            }}
+        )
+        return result.modified_count
+
+    @staticmethod
+    def find_by_id(job_id, tenant=None, any_tenant=False):
+        """
+        Find a job by ID
+
+        Args:
+            job_id: Job ID string
+            tenant: Tenant the job must belong to
+            any_tenant: Skip the tenant check (admin access)
+
+        Raises:
+            ValueError: If the ID is not a valid ObjectId
+        """
+        if not ObjectId.is_valid(job_id):
+            raise ValueError("Invalid job ID format")
+
+        query = {'_id': ObjectId(job_id)}
+        if not any_tenant:
+            query['tenant_id'] = tenant
+        return Job.get_collection().find_one(query)
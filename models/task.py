@@ -1,23 +1,42 @@
 # models/task.py - Task model and data operations
-from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
+from config import Config
 from database import Database
+from migrations import upgrade_document
+from models.dependency import TaskDependencies
+from utils.validators import normalize_tags, parse_due_date, validate_task_data
+from utils.timestamps import utcnow, format_iso
+from storage import get_backend
+from storage.mongo import MongoTaskBackend
 import logging
 
 logger = logging.getLogger(__name__)
 
 class Task:
-    """Task model for database operations"""
+    """
+    Task model for database operations
     
-    COLLECTION_NAME = 'tasks'
+    Validation, document shape and serialization live here; reads and
+    writes go through the configured storage backend.
+    """
+    
+    COLLECTION_NAME = MongoTaskBackend.COLLECTION_NAME
     
     @staticmethod
-    def serialize(task):
+    def serialize(task, format_timestamp=format_iso):
         """Convert MongoDB document to JSON serializable format"""
         if not task:
             return None
         
+        # Documents the migrations have not reached yet are upgraded on read
+        task = upgrade_document(task)
+        
+        due_date = task.get('due_date')
+        created_at = task.get('created_at')
+        updated_at = task.get('updated_at')
+        completed_at = task.get('completed_at')
+        
         return {
             'id': str(task['_id']),
             'title': task.get('title', ''),
@@ -25,15 +44,70 @@ class Task:
             'completed': task.get('completed', False),
             'priority': task.get('priority', 'medium'),
             'status': task.get('status', 'pending'),
-            'due_date': task['due_date'].isoformat() if task.get('due_date') else None,
-            'created_at': task['created_at'].isoformat() if task.get('created_at') else None,
-            'updated_at': task['updated_at'].isoformat() if task.get('updated_at') else None
+            'due_date': format_timestamp(due_date) if due_date else None,
+            'tags': task.get('tags') or [],
+            'depends_on': [str(dependency) for dependency in task.get('depends_on') or []],
+            'completed_at': format_timestamp(completed_at) if completed_at else None,
+            'created_at': format_timestamp(created_at) if created_at else None,
+            'updated_at': format_timestamp(updated_at) if updated_at else None,
+            'archived': 'archived_at' in task
         }
     
     @staticmethod
-    def get_collection():
-        """Get tasks collection"""
-        return Database.get_collection(Task.COLLECTION_NAME)
+    def serialize_many(tasks):
+        """Serialize a list of tasks, formatting each distinct timestamp once"""
+        memo = {}
+        
+        def format_timestamp(value):
+            formatted = memo.get(value)
+            if formatted is None:
+                formatted = memo[value] = format_iso(value)
+            return formatted
+        
+        return [Task.serialize(task, format_timestamp) for task in tasks]
+    
+    @staticmethod
+    def backend():
+        """Storage backend holding tasks (see storage/)"""
+        return get_backend()
+    
+    @staticmethod
+    def resolve_tenant(tenant=None):
+        """Return the given tenant or the configured default tenant"""
+        if tenant:
+            return tenant
+        return Database.config['DEFAULT_TENANT'] if Database.config else 'default'
+    
+    @staticmethod
+    def collection_name(tenant=None):
+        """Name of the MongoDB tasks collection holding a tenant's documents"""
+        return MongoTaskBackend.collection_name(Task.resolve_tenant(tenant))
+    
+    @staticmethod
+    def archive_collection_name(tenant=None):
+        """Name of the archive collection paired with a tenant's tasks collection"""
+        return MongoTaskBackend.archive_collection_name(Task.resolve_tenant(tenant))
+    
+    @staticmethod
+    def get_collection(tenant=None, operation=None):
+        """
+        Get the MongoDB tasks collection holding a tenant's documents
+        
+        Args:
+            tenant: Tenant ID (default tenant if omitted)
+            operation: Optional operation type selecting a read preference
+        """
+        return MongoTaskBackend.get_collection(Task.resolve_tenant(tenant), operation)
+    
+    @staticmethod
+    def get_archive_collection(tenant=None, operation=None):
+        """Get the archive collection for a tenant's tasks"""
+        return MongoTaskBackend.get_archive_collection(Task.resolve_tenant(tenant), operation)
+    
+    @staticmethod
+    def tenant_query(tenant=None, query=None):
+        """Scope a MongoDB query to a tenant's live (not soft-deleted) tasks"""
+        return MongoTaskBackend.tenant_query(Task.resolve_tenant(tenant), query)
     
     @staticmethod
     def validate_id(task_id):
@@ -43,51 +117,79 @@ class Task:
         return ObjectId(task_id)
     
     @staticmethod
-    def create(data):
+    def validate_ids(task_ids):
+        """
+        Validate a list of task IDs in one pass
+        
+        Raises:
+            ValueError: Naming every invalid ID
+        """
+        invalid = [task_id for task_id in task_ids if not isinstance(task_id, str) or not ObjectId.is_valid(task_id)]
+        if invalid:
+            raise ValueError(f"Invalid task ID format: {', '.join(str(task_id) for task_id in invalid)}")
+        return [ObjectId(task_id) for task_id in task_ids]
+    
+    @staticmethod
+    def create(data, tenant=None):
         """Create a new task"""
         try:
-            collection = Task.get_collection()
+            tenant = Task.resolve_tenant(tenant)
             
             # Parse due_date if provided
             due_date = None
             if data.get('due_date'):
-                try:
-                    due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
-                except ValueError:
-                    raise ValueError('Invalid due_date format. Use ISO format')
+                due_date = parse_due_date(data['due_date'])
             
             # Create task document
+            now = utcnow()
+            completed = data.get('completed', False)
             task_doc = {
+                'tenant_id': tenant,
                 'title': data['title'],
                 'description': data.get('description', ''),
-                'completed': data.get('completed', False),
+                'completed': completed,
+                'completed_at': now if completed else None,
                 'priority': data.get('priority', 'medium'),
+                'priority_rank': Config.PRIORITY_RANKS[data.get('priority', 'medium')],
                 'status': data.get('status', 'pending'),
                 'due_date': due_date,
-                'created_at': datetime.utcnow(),
-                'updated_at': datetime.utcnow()
+                'tags': normalize_tags(data.get('tags') or []),
+                'depends_on': TaskDependencies.prepare(tenant, None, data.get('depends_on') or []),
+                'is_deleted': False,
+                'deleted_at': None,
+                'created_at': now,
+                'updated_at': now
             }
             
             # Insert task
-            result = collection.insert_one(task_doc)
-            logger.info(f"Task created with ID: {result.inserted_id}")
+            task = Task.backend().insert(tenant, task_doc)
+            TaskDependencies.task_written(tenant, task)
+            logger.info(f"Task created with ID: {task['_id']}")
             
-            # Return created task
-            return collection.find_one({'_id': result.inserted_id})
+            return task
             
         except Exception as e:
             logger.error(f"Error creating task: {str(e)}")
             raise
     
     @staticmethod
-    def find_all(filters=None, sort_by='created_at', sort_order=-1, skip=0, limit=20):
-        """Find all tasks with optional filtering and pagination"""
+    def find_all(filters=None, sort_by='created_at', sort_order=-1, skip=0, limit=20, tenant=None,
+                 include_archived=False):
+        """
+        Find all tasks with optional filtering and pagination
+        
+        With include_archived, archived tasks are merged in before sorting
+        and paging. sort_by='priority' sorts by importance (priority_rank),
+        not alphabetically.
+        """
         try:
-            collection = Task.get_collection()
-            query = filters or {}
+            if sort_by == 'priority':
+                sort_by = 'priority_rank'
             
-            cursor = collection.find(query).sort(sort_by, sort_order).skip(skip).limit(limit)
-            tasks = [task for task in cursor]
+            tasks = Task.backend().find(
+                Task.resolve_tenant(tenant), filters, sort_by, sort_order, skip, limit,
+                include_archived=include_archived
+            )
             
             logger.info(f"Retrieved {len(tasks)} tasks")
             return tasks
@@ -97,13 +199,11 @@ class Task:
             raise
     
     @staticmethod
-    def find_by_id(task_id):
-        """Find a task by ID"""
+    def find_by_id(task_id, tenant=None, include_archived=False):
+        """Find a task by ID, falling back to the archive if requested"""
         try:
-            collection = Task.get_collection()
             object_id = Task.validate_id(task_id)
-            
-            task = collection.find_one({'_id': object_id})
+            task = Task.backend().find_by_id(Task.resolve_tenant(tenant), object_id, include_archived)
             
             if task:
                 logger.info(f"Task found: {task_id}")
@@ -120,42 +220,142 @@ class Task:
             raise
     
     @staticmethod
-    def update(task_id, data):
+    def find_many(task_ids, tenant=None, include_archived=False):
+        """
+        Find several tasks by ID with a single query
+        
+        Args:
+            task_ids: Task ID strings (duplicates are returned once)
+            tenant: Tenant ID
+            include_archived: Also look in the archive
+            
+        Returns:
+            Tuple of (tasks in request order, IDs that were not found)
+        """
+        try:
+            task_ids = list(dict.fromkeys(task_ids))
+            object_ids = Task.validate_ids(task_ids)
+            
+            found = {
+                task['_id']: task
+                for task in Task.backend().find_many(Task.resolve_tenant(tenant), object_ids, include_archived)
+            }
+            tasks = [found[object_id] for object_id in object_ids if object_id in found]
+            missing = [task_id for task_id, object_id in zip(task_ids, object_ids) if object_id not in found]
+            
+            logger.info(f"Looked up {len(task_ids)} tasks, {len(missing)} missing")
+            return tasks, missing
+            
+        except ValueError as e:
+            logger.error(str(e))
+            raise
+        except Exception as e:
+            logger.error(f"Error looking up tasks: {str(e)}")
+            raise
+    
+    @staticmethod
+    def find_next(limit, tenant=None):
+        """
+        Find the incomplete tasks to work on next
+        
+        Highest priority first, then earliest due date (tasks without one
+        lead their priority), read with one scan of the next-task index.
+        """
+        try:
+            tasks = Task.backend().next_tasks(Task.resolve_tenant(tenant), limit)
+            
+            logger.info(f"Retrieved {len(tasks)} next tasks")
+            return tasks
+            
+        except Exception as e:
+            logger.error(f"Error finding next tasks: {str(e)}")
+            raise
+    
+    @staticmethod
+    def find_dependencies(task_id, tenant=None, ids_only=False):
+        """
+        Find everything a task depends on, directly or transitively
+        
+        Returns:
+            Tuple of (task, dependency tasks in next-task order, or with
+            ids_only a sorted list of their ID strings), or (None, None) if
+            the task does not exist
+        """
+        try:
+            object_id = Task.validate_id(task_id)
+            tenant = Task.resolve_tenant(tenant)
+            
+            task = Task.backend().find_by_id(tenant, object_id)
+            if task is None:
+                logger.warning(f"Task not found for dependencies: {task_id}")
+                return None, None
+            
+            dependencies = TaskDependencies.closure(tenant, object_id, ids_only)
+            if ids_only:
+                dependencies = sorted(str(dependency) for dependency in dependencies)
+            logger.info(f"Task {task_id} depends on {len(dependencies)} tasks")
+            return task, dependencies
+            
+        except ValueError:
+            logger.error(f"Invalid task ID: {task_id}")
+            raise
+        except Exception as e:
+            logger.error(f"Error finding dependencies: {str(e)}")
+            raise
+    
+    @staticmethod
+    def find_unblocked(limit, tenant=None):
+        """
+        Find incomplete tasks that nothing incomplete blocks
+        
+        Highest priority first, then earliest due date, like find_next.
+        """
+        try:
+            tasks = TaskDependencies.unblocked(Task.resolve_tenant(tenant), limit)
+            
+            logger.info(f"Retrieved {len(tasks)} unblocked tasks")
+            return tasks
+            
+        except Exception as e:
+            logger.error(f"Error finding unblocked tasks: {str(e)}")
+            raise
+    
+    @staticmethod
+    def update(task_id, data, tenant=None):
         """Update an existing task"""
         try:
-            collection = Task.get_collection()
             object_id = Task.validate_id(task_id)
+            tenant = Task.resolve_tenant(tenant)
             
             # Build update document
-            update_doc = {'updated_at': datetime.utcnow()}
+            update_doc = {'updated_at': utcnow()}
             
             # Update fields if provided
-            allowed_fields = ['title', 'description', 'completed', 'priority', 'status', 'due_date']
+            allowed_fields = ['title', 'description', 'completed', 'priority', 'status', 'due_date', 'tags', 'depends_on']
             
             for field in allowed_fields:
                 if field in data:
-                    if field == 'due_date' and data[field]:
-                        try:
-                            update_doc[field] = datetime.fromisoformat(data[field].replace('Z', '+00:00'))
-                        except ValueError:
-                            raise ValueError('Invalid due_date format. Use ISO format')
+                    if field == 'due_date':
+                        update_doc[field] = parse_due_date(data[field]) if data[field] else None
+                    elif field == 'tags':
+                        update_doc[field] = normalize_tags(data[field] or [])
+                    elif field == 'depends_on':
+                        update_doc[field] = TaskDependencies.prepare(tenant, object_id, data[field] or [])
                     else:
                         update_doc[field] = data[field]
+            if 'priority' in update_doc:
+                update_doc['priority_rank'] = Config.PRIORITY_RANKS[update_doc['priority']]
             
             # Update task
-            result = collection.update_one(
-                {'_id': object_id},
-                {'$set': update_doc}
-            )
+            task = Task.backend().update(tenant, object_id, update_doc)
             
-            if result.matched_count == 0:
+            if task is None:
                 logger.warning(f"Task not found for update: {task_id}")
                 return None
             
+            TaskDependencies.task_written(tenant, task)
             logger.info(f"Task updated: {task_id}")
-            
-            # Return updated task
-            return collection.find_one({'_id': object_id})
+            return task
             
         except ValueError as e:
             logger.error(f"Validation error: {str(e)}")
@@ -164,19 +364,116 @@ class Task:
             logger.error(f"Error updating task: {str(e)}")
             raise
     
+    # Fields a merge patch may set, and the value a null resets each to
+    # (fields without a reset value cannot be removed)
+    PATCHABLE_FIELDS = ('title', 'description', 'completed', 'priority', 'status', 'due_date', 'tags', 'depends_on')
+    PATCH_NULL_VALUES = {'description': '', 'due_date': None, 'tags': [], 'depends_on': []}
+    
+    @staticmethod
+    def merge_patch_changes(patch):
+        """
+        Turn a JSON Merge Patch (RFC 7386) into validated field changes
+        
+        Tasks are flat, so a member replaces the field (lists as a whole)
+        and null removes it, which resets optional fields to their default.
+        
+        Raises:
+            ValueError: If the patch is not an object or sets invalid values
+        """
+        if not isinstance(patch, dict):
+            raise ValueError("Merge patch must be a JSON object")
+        
+        unknown = sorted(set(patch) - set(Task.PATCHABLE_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown or read-only fields: {', '.join(unknown)}")
+        
+        changes = {}
+        values = {}
+        for field, value in patch.items():
+            if value is None:
+                if field not in Task.PATCH_NULL_VALUES:
+                    raise ValueError(f"{field} cannot be removed")
+                changes[field] = Task.PATCH_NULL_VALUES[field]
+            else:
+                values[field] = value
+        
+        is_valid, error_msg = validate_task_data(values, is_update=True)
+        if not is_valid:
+            raise ValueError(error_msg)
+        
+        for field, value in values.items():
+            if field == 'due_date':
+                value = parse_due_date(value) if value else None
+            elif field == 'tags':
+                value = normalize_tags(value)
+            changes[field] = value
+        
+        return changes
+    
     @staticmethod
-    def delete(task_id):
-        """Delete a task"""
+    def patch(task_id, patch, tenant=None):
+        """
+        Apply a JSON Merge Patch to a task
+        
+        Only fields whose value actually changes are written; a patch that
+        changes nothing leaves the task (and its updated_at) untouched.
+        
+        Returns:
+            Tuple of (task, dictionary of changed fields), or (None, None)
+            if the task does not exist
+            
+        Raises:
+            ValueError: For invalid IDs or patches
+        """
         try:
-            collection = Task.get_collection()
             object_id = Task.validate_id(task_id)
+            tenant = Task.resolve_tenant(tenant)
+            changes = Task.merge_patch_changes(patch)
+            if 'priority' in changes:
+                changes['priority_rank'] = Config.PRIORITY_RANKS[changes['priority']]
+            if 'depends_on' in changes:
+                changes['depends_on'] = TaskDependencies.prepare(tenant, object_id, changes['depends_on'])
+            
+            result = Task.backend().patch(tenant, object_id, changes, utcnow())
+            if result is None:
+                logger.warning(f"Task not found for patch: {task_id}")
+                return None, None
+            
+            task, changed = result
+            if changed:
+                TaskDependencies.task_written(tenant, task)
+            # priority_rank is internal: report the priority change only
+            changed.pop('priority_rank', None)
+            if changed:
+                logger.info(f"Task patched: {task_id} ({', '.join(sorted(changed))})")
+            else:
+                logger.info(f"Task patch was a no-op: {task_id}")
+            return task, changed
             
-            result = collection.delete_one({'_id': object_id})
+        except ValueError as e:
+            logger.error(f"Validation error: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error patching task: {str(e)}")
+            raise
+    
+    @staticmethod
+    def delete(task_id, tenant=None):
+        """
+        Soft-delete a task
+        
+        The document is flagged and hidden from every query; the archiver
+        moves it out of the live collection later.
+        """
+        try:
+            object_id = Task.validate_id(task_id)
+            tenant = Task.resolve_tenant(tenant)
             
-            if result.deleted_count == 0:
+            if not Task.backend().soft_delete(tenant, object_id, utcnow()):
                 logger.warning(f"Task not found for deletion: {task_id}")
                 return False
             
+            TaskDependencies.task_removed(tenant, object_id)
             logger.info(f"Task deleted: {task_id}")
             return True
             
@@ -188,85 +485,63 @@ class Task:
             raise
     
     @staticmethod
-    def toggle_completion(task_id):
+    def toggle_completion(task_id, tenant=None):
         """Toggle task completion status"""
         try:
-            collection = Task.get_collection()
             object_id = Task.validate_id(task_id)
-            
-            task = collection.find_one({'_id': object_id})
+            tenant = Task.resolve_tenant(tenant)
+            task = Task.backend().toggle(tenant, object_id, utcnow())
             
             if not task:
                 logger.warning(f"Task not found for toggle: {task_id}")
                 return None
             
-            new_completed = not task.get('completed', False)
-            new_status = 'completed' if new_completed else 'pending'
+            TaskDependencies.task_written(tenant, task)
+            logger.info(f"Task completion toggled: {task_id}")
+            return task
             
-            collection.update_one(
-                {'_id': object_id},
-                {'$set': {
-                    'completed': new_completed,
-                    'status': new_status,
-                    'updated_at': datetime.utcnow()
-                }}
-            )
+        except Exception as e:
+            logger.error(f"Error toggling task completion: {str(e)}")
+            raise
+    
+    @staticmethod
+    def get_tag_counts(limit=None, tenant=None):
+        """
+        Count live tasks per tag (tag-cloud view)
+        
+        Args:
+            limit: Maximum number of tags (None for all)
+            tenant: Tenant ID
             
-            logger.info(f"Task completion toggled: {task_id}")
+        Returns:
+            List of {'tag', 'count'} dictionaries, most used first
+        """
+        try:
+            counts = Task.backend().tag_counts(Task.resolve_tenant(tenant), limit)
             
-            return collection.find_one({'_id': object_id})
+            logger.info(f"Retrieved counts for {len(counts)} tags")
+            return [{'tag': tag, 'count': count} for tag, count in counts]
             
         except Exception as e:
-            logger.error(f"Error toggling task completion: {str(e)}")
+            logger.error(f"Error counting tags: {str(e)}")
             raise
     
     @staticmethod
-    def get_statistics():
-        """Get task statistics"""
+    def get_statistics(tenant=None):
+        """Get task statistics for a tenant"""
         try:
-            collection = Task.get_collection()
-            
-            pipeline = [
-                {
-                    '$facet': {
-                        'total': [{'$count': 'count'}],
-                        'completed': [
-                            {'$match': {'completed': True}},
-                            {'$count': 'count'}
-                        ],
-                        'priority_stats': [
-                            {
-                                '$group': {
-                                    '_id': '$priority',
-                                    'count': {'$sum': 1}
-                                }
-                            }
-                        ],
-                        'status_stats': [
-                            {
-                                '$group': {
-                                    '_id': '$status',
-                                    'count': {'$sum': 1}
-                                }
-                            }
-                        ]
-                    }
-                }
-            ]
-            
-            result = list(collection.aggregate(pipeline))[0]
-            
-            total_tasks = result['total'][0]['count'] if result['total'] else 0
-            completed_tasks = result['completed'][0]['count'] if result['completed'] else 0
+            tenant = Task.resolve_tenant(tenant)
+            counts = Task.backend().statistics(tenant)
+            
+            total_tasks = counts['total']
+            completed_tasks = counts['completed']
             pending_tasks = total_tasks - completed_tasks
             
             priority_counts = {'low': 0, 'medium': 0, 'high': 0}
-            for item in result['priority_stats']:
-                priority_counts[item['_id']] = item['count']
+            priority_counts.update(counts['priority'])
             
             status_counts = {'pending': 0, 'in_progress': 0, 'completed': 0}
-            for item in result['status_stats']:
-                status_counts[item['_id']] = item['count']
+            status_counts.update(counts['status'])
             
             logger.info("Task statistics retrieved")
             
@@ -277,7 +552,8 @@ class Task:
                 'high_priority_tasks': priority_counts['high'],
                 'medium_priority_tasks': priority_counts['medium'],
                 'low_priority_tasks': priority_counts['low'],
-                'status_breakdown': status_counts
+                'status_breakdown': status_counts,
+                'top_tags': Task.get_tag_counts(Config.STATS_TOP_TAGS, tenant)
             }
             
         except Exception as e:
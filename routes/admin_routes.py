@@ -0,0 +1,124 @@
+# routes/admin_routes.py - Administrative API routes
+from flask import Blueprint, request, current_app
+from models.job import Job
+from utils.auth import require_admin
+from utils.features import require_feature
+from utils.response import success_response, error_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/query-stats', methods=['GET'])
+@require_admin
+def get_query_stats():
+    """Get the most expensive query shapes"""
+    listener = current_app.extensions.get('query_stats')
+    if listener is None:
+        return error_response(
+            message='Query statistics are disabled',
+            status_code=404
+        )
+    
+    try:
+        limit = int(request.args.get('limit', 10))
+        sort_by = request.args.get('sort_by', 'total')
+        shapes = listener.top_shapes(limit=limit, sort_by=sort_by)
+        
+        return success_response(
+            data={
+                'shapes': shapes,
+                'slow_threshold_ms': listener.slow_threshold_ms,
+                'count': len(shapes)
+            }
+        )
+        
+    except ValueError as e:
+        return error_response(
+            message='Invalid query parameters',
+            status_code=400,
+            error_detail=str(e)
+        )
+
+@admin_bp.route('/query-stats', methods=['DELETE'])
+@require_admin
+def reset_query_stats():
+    """Reset aggregated query statistics"""
+    listener = current_app.extensions.get('query_stats')
+    if listener is None:
+        return error_response(
+            message='Query statistics are disabled',
+            status_code=404
+        )
+    
+    listener.reset()
+    logger.info("Query statistics reset")
+    
+    return success_response(message='Query statistics reset')
+
+@admin_bp.route('/jobs', methods=['POST'])
+@require_admin
+@require_feature('jobs')
+def enqueue_job():
+    """Queue a maintenance job (e.g. reconcile_indexes, archive_tasks)"""
+    from jobs.registry import JOB_HANDLERS
+    import jobs.handlers  # noqa: F401 - registers the built-in handlers
+    
+    data = request.get_json(silent=True) or {}
+    job_type = data.get('type')
+    if job_type not in JOB_HANDLERS:
+        return error_response(
+            message='Invalid job type',
+            status_code=400,
+            error_detail=f"type must be one of: {', '.join(sorted(JOB_HANDLERS))}"
+        )
+    
+    payload = data.get('payload') or {}
+    if not isinstance(payload, dict):
+        return error_response(
+            message='Invalid job payload',
+            status_code=400,
+            error_detail='payload must be an object'
+        )
+    
+    try:
+        job = Job.enqueue(job_type, payload)
+        return success_response(
+            data=Job.serialize(job),
+            message='Job queued',
+            status_code=202
+        )
+    except Exception as e:
+        logger.error(f"Error queueing job: {str(e)}")
+        return error_response(
+            message='Failed to queue job',
+            status_code=500,
+            error_detail=str(e)
+        )
+
+@admin_bp.route('/write-coalescing', methods=['GET'])
+@require_admin
+def get_write_coalescing_stats():
+    """Get write coalescing metrics"""
+    coalescer = current_app.extensions.get('write_coalescer')
+    if coalescer is None:
+        return error_response(
+            message='Write coalescing is disabled',
+            status_code=404
+        )
+    
+    return success_response(data=coalescer.stats())
+
+@admin_bp.route('/dependency-cache', methods=['GET'])
+@require_admin
+def get_dependency_cache_stats():
+    """Get dependency graph cache metrics"""
+    cache = current_app.extensions.get('dependency_cache')
+    if cache is None:
+        return error_response(
+            message='Dependency graph cache is disabled',
+            status_code=404
+        )
+    
+    return success_response(data=cache.stats())
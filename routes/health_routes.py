@@ -0,0 +1,32 @@
+# routes/health_routes.py - Liveness and readiness probe routes
+from flask import Blueprint
+from database import Database
+from utils.health_monitor import current_health
+from utils.response import success_response, error_response
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/livez', methods=['GET'])
+def liveness():
+    """Liveness probe: the process is serving requests (no I/O)"""
+    return success_response(data={'status': 'alive'})
+
+@health_bp.route('/readyz', methods=['GET'])
+def readiness():
+    """Readiness probe backed by the cached background health checks"""
+    health = current_health()
+    data = {
+        'status': 'ready' if health['ready'] else 'not_ready',
+        'checks': health['checks'],
+        'checked_at': health['checked_at'],
+        'indexes': Database.index_state
+    }
+    
+    if health['ready']:
+        return success_response(data=data)
+    
+    return error_response(
+        message=health['reason'] or 'Not ready',
+        status_code=503,
+        error_detail=data
+    )
@@ -0,0 +1,53 @@
+# routes/job_routes.py - Background job status routes
+from flask import Blueprint, g
+from models.job import Job
+from utils.auth import is_admin_request
+from utils.features import require_feature
+from utils.response import success_response, error_response
+from utils.tenancy import resolve_tenant
+import logging
+
+logger = logging.getLogger(__name__)
+
+job_bp = Blueprint('jobs', __name__)
+
+@job_bp.before_request
+def load_tenant():
+    """Resolve the tenant job lookups are scoped to"""
+    try:
+        g.tenant = resolve_tenant()
+    except ValueError as e:
+        return error_response(
+            message='Invalid tenant',
+            status_code=400,
+            error_detail=str(e)
+        )
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+@require_feature('jobs')
+def get_job(job_id):
+    """Get the status of a background job"""
+    try:
+        job = Job.find_by_id(job_id, tenant=g.tenant, any_tenant=is_admin_request())
+        
+        if not job:
+            return error_response(
+                message='Job not found',
+                status_code=404
+            )
+        
+        return success_response(data=Job.serialize(job))
+        
+    except ValueError as e:
+        return error_response(
+            message='Invalid job ID format',
+            status_code=400,
+            error_detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {str(e)}")
+        return error_response(
+            message='Failed to retrieve job',
+            status_code=500,
+            error_detail=str(e)
+        )
@@ -1,40 +1,107 @@
 # routes/task_routes.py - Task API routes
-from flask import Blueprint, request, jsonify
+import os
+from flask import Blueprint, request, jsonify, g, send_file, current_app
+from models.analytics import TaskAnalytics
+from models.export import TaskExport
+from models.job import Job
 from models.task import Task
-from utils.validators import validate_task_data, validate_priority, validate_status
+from utils.validators import (
+    validate_task_data, validate_priority, validate_status, validate_sort_field, validate_tag, normalize_tags,
+    TAG_ERROR, SORT_FIELDS
+)
 from utils.response import success_response, error_response
+from utils.features import require_feature
+from utils.tenancy import resolve_tenant
+from utils.health_monitor import current_health
+from utils.timestamps import parse_iso, format_iso
 import logging
 
 logger = logging.getLogger(__name__)
 
 task_bp = Blueprint('tasks', __name__)
 
+@task_bp.before_request
+def load_tenant():
+    """Resolve the tenant every task operation is scoped to"""
+    try:
+        g.tenant = resolve_tenant()
+    except ValueError as e:
+        return error_response(
+            message='Invalid tenant',
+            status_code=400,
+            error_detail=str(e)
+        )
+
 @task_bp.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    try:
-        from database import Database
-        Database.client.admin.command('ping')
-        
+    """Health check endpoint (served from the cached health monitor result)"""
+    from database import Database
+    
+    health = current_health()
+    storage = health['checks'][Task.backend().name]
+    if storage['ok']:
         return success_response(
             data={
                 'status': 'healthy',
                 'message': 'Task Management API is running',
-                'database': 'MongoDB connected'
+                'database': Task.backend().description,
+                'readiness': 'ready' if health['ready'] else 'not_ready',
+                'indexes': Database.index_state
             }
         )
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+    
+    logger.error(f"Health check failed: {storage['error']}")
+    return error_response(
+        message='Database connection failed',
+        status_code=500,
+        error_detail=storage['error']
+    )
+
+def lookup_response(task_ids, include_archived=False):
+    """Response for a batch lookup of tasks by ID (request order, missing IDs reported)"""
+    if not isinstance(task_ids, list) or not task_ids:
         return error_response(
-            message='Database connection failed',
-            status_code=500,
+            message='No task IDs provided',
+            status_code=400,
+            error_detail='ids must be a non-empty list of task IDs'
+        )
+    
+    max_ids = current_app.config['MAX_LOOKUP_IDS']
+    if len(task_ids) > max_ids:
+        return error_response(
+            message='Too many task IDs',
+            status_code=400,
+            error_detail=f'At most {max_ids} IDs can be looked up at once'
+        )
+    
+    try:
+        tasks, missing = Task.find_many(task_ids, tenant=g.tenant, include_archived=include_archived)
+    except ValueError as e:
+        return error_response(
+            message='Invalid task ID format',
+            status_code=400,
             error_detail=str(e)
         )
+    
+    return success_response(
+        data={
+            'tasks': Task.serialize_many(tasks),
+            'count': len(tasks),
+            'missing': missing
+        }
+    )
 
 @task_bp.route('/tasks', methods=['GET'])
 def get_tasks():
-    """Get all tasks with optional filtering and pagination"""
+    """Get all tasks with optional filtering and pagination, or specific tasks with ?ids=a,b,c"""
     try:
+        # Archived tasks are only searched when asked for
+        include_archived = request.args.get('include_archived', 'false').lower() == 'true'
+        
+        ids = request.args.get('ids')
+        if ids is not None:
+            return lookup_response([task_id for task_id in ids.split(',') if task_id], include_archived)
+        
         # Build query from parameters
         query = {}
         
@@ -65,6 +132,26 @@ def get_tasks():
                 )
             query['status'] = status
         
+        # Filter by tags: any of them (default) or all of them
+        tags = request.args.get('tags')
+        if tags is not None:
+            tags = [tag for tag in tags.split(',') if tag]
+            max_tags = current_app.config['TAG_FILTER_MAX']
+            if not tags or len(tags) > max_tags or not all(validate_tag(tag) for tag in tags):
+                return error_response(
+                    message='Invalid tags filter',
+                    status_code=400,
+                    error_detail=f'tags must list 1 to {max_tags} comma-separated tags. {TAG_ERROR}'
+                )
+            tags_match = request.args.get('tags_match', 'any')
+            if tags_match not in ('any', 'all'):
+                return error_response(
+                    message='Invalid tags_match value',
+                    status_code=400,
+                    error_detail='tags_match must be any or all'
+                )
+            query['tags'] = {'$all' if tags_match == 'all' else '$in': normalize_tags(tags)}
+        
         # Pagination
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 20))
@@ -72,6 +159,12 @@ def get_tasks():
         
         # Sorting
         sort_by = request.args.get('sort_by', 'created_at')
+        if not validate_sort_field(sort_by):
+            return error_response(
+                message='Invalid sort_by value',
+                status_code=400,
+                error_detail=f"sort_by must be one of: {', '.join(SORT_FIELDS)}"
+            )
         sort_order = -1 if request.args.get('sort_order', 'desc') == 'desc' else 1
         
         # Get tasks
@@ -80,10 +173,12 @@ def get_tasks():
             sort_by=sort_by,
             sort_order=sort_order,
             skip=skip,
-            limit=limit
+            limit=limit,
+            tenant=g.tenant,
+            include_archived=include_archived
         )
         
-        serialized_tasks = [Task.serialize(task) for task in tasks]
+        serialized_tasks = Task.serialize_many(tasks)
         
         return success_response(
             data={
@@ -106,7 +201,8 @@ def get_tasks():
 def get_task(task_id):
     """Get a specific task by ID"""
     try:
-        task = Task.find_by_id(task_id)
+        include_archived = request.args.get('include_archived', 'false').lower() == 'true'
+        task = Task.find_by_id(task_id, tenant=g.tenant, include_archived=include_archived)
         
         if not task:
             return error_response(
@@ -130,6 +226,139 @@ def get_task(task_id):
             error_detail=str(e)
         )
 
+@task_bp.route('/tasks/lookup', methods=['POST'])
+def lookup_tasks():
+    """Get several tasks by ID in one request (body: {"ids": [...]})"""
+    try:
+        data = request.get_json(silent=True) or {}
+        return lookup_response(data.get('ids'), bool(data.get('include_archived', False)))
+        
+    except Exception as e:
+        logger.error(f"Error looking up tasks: {str(e)}")
+        return error_response(
+            message='Failed to retrieve tasks',
+            status_code=500,
+            error_detail=str(e)
+        )
+
+@task_bp.route('/tasks/next', methods=['GET'])
+def get_next_tasks():
+    """Get the top incomplete tasks by priority, then due date (?limit=K)"""
+    try:
+        max_limit = current_app.config['MAX_PAGE_SIZE']
+        try:
+            limit = int(request.args.get('limit', current_app.config['NEXT_TASKS_LIMIT']))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= max_limit:
+            return error_response(
+                message='Invalid limit',
+                status_code=400,
+                error_detail=f'limit must be between 1 and {max_limit}'
+            )
+        
+        tasks = Task.serialize_many(Task.find_next(limit, tenant=g.tenant))
+        
+        return success_response(data={'tasks': tasks, 'count': len(tasks)})
+        
+    except Exception as e:
+        logger.error(f"Error getting next tasks: {str(e)}")
+        return error_response(
+            message='Failed to retrieve next tasks',
+            status_code=500,
+            error_detail=str(e)
+        )
+
+@task_bp.route('/tasks/unblocked', methods=['GET'])
+def get_unblocked_tasks():
+    """Get incomplete tasks with no incomplete dependency, by priority, then due date (?limit=K)"""
+    try:
+        max_limit = current_app.config['MAX_PAGE_SIZE']
+        try:
+            limit = int(request.args.get('limit', current_app.config['NEXT_TASKS_LIMIT']))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= max_limit:
+            return error_response(
+                message='Invalid limit',
+                status_code=400,
+                error_detail=f'limit must be between 1 and {max_limit}'
+            )
+        
+        tasks = Task.serialize_many(Task.find_unblocked(limit, tenant=g.tenant))
+        
+        return success_response(data={'tasks': tasks, 'count': len(tasks)})
+        
+    except Exception as e:
+        logger.error(f"Error getting unblocked tasks: {str(e)}")
+        return error_response(
+            message='Failed to retrieve unblocked tasks',
+            status_code=500,
+            error_detail=str(e)
+        )
+
+@task_bp.route('/tasks/<task_id>/dependencies', methods=['GET'])
+def get_task_dependencies(task_id):
+    """Get every task a task depends on, directly or transitively (?ids_only=true for IDs only)"""
+    try:
+        ids_only = request.args.get('ids_only', 'false').lower() == 'true'
+        task, dependencies = Task.find_dependencies(task_id, tenant=g.tenant, ids_only=ids_only)
+        
+        if not task:
+            return error_response(
+                message='Task not found',
+                status_code=404
+            )
+        
+        return success_response(data={
+            'id': str(task['_id']),
+            'depends_on': [str(dependency) for dependency in task.get('depends_on') or []],
+            'dependencies': dependencies if ids_only else Task.serialize_many(dependencies),
+            'count': len(dependencies)
+        })
+        
+    except ValueError as e:
+        return error_response(
+            message='Invalid task ID format',
+            status_code=400,
+            error_detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error getting dependencies of task {task_id}: {str(e)}")
+        return error_response(
+            message='Failed to retrieve dependencies',
+            status_code=500,
+            error_detail=str(e)
+        )
+
+@task_bp.route('/tasks/tags', methods=['GET'])
+def get_tag_counts():
+    """Get how many live tasks carry each tag, most used first (?limit=K)"""
+    try:
+        max_limit = current_app.config['MAX_PAGE_SIZE']
+        try:
+            limit = int(request.args.get('limit', max_limit))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= max_limit:
+            return error_response(
+                message='Invalid limit',
+                status_code=400,
+                error_detail=f'limit must be between 1 and {max_limit}'
+            )
+        
+        tags = Task.get_tag_counts(limit, tenant=g.tenant)
+        
+        return success_response(data={'tags': tags, 'count': len(tags)})
+        
+    except Exception as e:
+        logger.error(f"Error getting tag counts: {str(e)}")
+        return error_response(
+            message='Failed to retrieve tag counts',
+            status_code=500,
+            error_detail=str(e)
+        )
+
 @task_bp.route('/tasks', methods=['POST'])
 def create_task():
     """Create a new task"""
@@ -152,7 +381,7 @@ def create_task():
             )
         
         # Create task
-        task = Task.create(data)
+        task = Task.create(data, tenant=g.tenant)
         
         logger.info(f"Task created successfully: {task['_id']}")
         
@@ -198,7 +427,7 @@ def update_task(task_id):
             )
         
         # Update task
-        task = Task.update(task_id, data)
+        task = Task.update(task_id, data, tenant=g.tenant)
         
         if not task:
             return error_response(
@@ -227,11 +456,62 @@ def update_task(task_id):
             error_detail=str(e)
         )
 
+@task_bp.route('/tasks/<task_id>', methods=['PATCH'])
+def patch_task(task_id):
+    """
+    Partially update a task with a JSON Merge Patch
+    
+    Send `Prefer: return=minimal` to get back only the fields that changed.
+    """
+    try:
+        patch = request.get_json(silent=True)
+        if patch is None:
+            return error_response(
+                message='No data provided',
+                status_code=400,
+                error_detail='Send a JSON Merge Patch (application/merge-patch+json)'
+            )
+        
+        task, changed = Task.patch(task_id, patch, tenant=g.tenant)
+        
+        if not task:
+            return error_response(
+                message='Task not found',
+                status_code=404
+            )
+        
+        message = 'Task updated successfully' if changed else 'No changes'
+        
+        if 'return=minimal' in request.headers.get('Prefer', ''):
+            serialized = Task.serialize(task)
+            response, status_code = success_response(
+                data={'id': serialized['id'], 'changed': {field: serialized[field] for field in changed}},
+                message=message
+            )
+            response.headers['Preference-Applied'] = 'return=minimal'
+            return response, status_code
+        
+        return success_response(data=Task.serialize(task), message=message)
+        
+    except ValueError as e:
+        return error_response(
+            message='Validation error',
+            status_code=400,
+            error_detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error patching task {task_id}: {str(e)}")
+        return error_response(
+            message='Failed to update task',
+            status_code=500,
+            error_detail=str(e)
+        )
+
 @task_bp.route('/tasks/<task_id>', methods=['DELETE'])
 def delete_task(task_id):
     """Delete a task"""
     try:
-        deleted = Task.delete(task_id)
+        deleted = Task.delete(task_id, tenant=g.tenant)
         
         if not deleted:
             return error_response(
@@ -263,7 +543,7 @@ def delete_task(task_id):
 def toggle_task_completion(task_id):
     """Toggle task completion status"""
     try:
-        task = Task.toggle_completion(task_id)
+        task = Task.toggle_completion(task_id, tenant=g.tenant)
         
         if not task:
             return error_response(
@@ -296,7 +576,7 @@ def toggle_task_completion(task_id):
 def get_task_stats():
     """Get task statistics"""
     try:
-        stats = Task.get_statistics()
+        stats = Task.get_statistics(tenant=g.tenant)
         
         return success_response(data=stats)
         
@@ -306,4 +586,189 @@ def get_task_stats():
             message='Failed to retrieve statistics',
             status_code=500,
             error_detail=str(e)
-        )
\ No newline at end of file
+        )
+
+@task_bp.route('/tasks/exports', methods=['POST'])
+@require_feature('exports')
+def create_export():
+    """Queue an export of the tenant's tasks to a compressed file"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        export_format = data.get('format', 'ndjson')
+        if export_format not in TaskExport.FORMATS:
+            return error_response(
+                message='Invalid export format',
+                status_code=400,
+                error_detail=f"format must be one of: {', '.join(TaskExport.FORMATS)}"
+            )
+        
+        filters = data.get('filters') or {}
+        if not isinstance(filters, dict) or set(filters) - {'completed', 'priority', 'status'}:
+            return error_response(
+                message='Invalid export filters',
+                status_code=400,
+                error_detail='filters may only contain completed, priority and status'
+            )
+        if 'completed' in filters and not isinstance(filters['completed'], bool):
+            return error_response(
+                message='Invalid export filters',
+                status_code=400,
+                error_detail='completed must be a boolean'
+            )
+        if 'priority' in filters and not validate_priority(filters['priority']):
+            return error_response(
+                message='Invalid priority value',
+                status_code=400,
+                error_detail='Priority must be low, medium, or high'
+            )
+        if 'status' in filters and not validate_status(filters['status']):
+            return error_response(
+                message='Invalid status value',
+                status_code=400,
+                error_detail='Status must be pending, in_progress, or completed'
+            )
+        
+        job = Job.enqueue('export_tasks', {'format': export_format, 'filters': filters}, tenant=g.tenant)
+        job_id = str(job['_id'])
+        
+        return success_response(
+            data={
+                'job': Job.serialize(job),
+                'status_url': f'/api/jobs/{job_id}',
+                'download_url': f'/api/tasks/exports/{job_id}/download'
+            },
+            message='Export queued',
+            status_code=202
+        )
+        
+    except Exception as e:
+        logger.error(f"Error queueing export: {str(e)}")
+        return error_response(
+            message='Failed to queue export',
+            status_code=500,
+            error_detail=str(e)
+        )
+
+@task_bp.route('/tasks/exports/<job_id>/download', methods=['GET'])
+@require_feature('exports')
+def download_export(job_id):
+    """Download a finished export (supports Range requests for resuming)"""
+    try:
+        job = Job.find_by_id(job_id, tenant=g.tenant)
+        
+        if not job or job['type'] != 'export_tasks':
+            return error_response(
+                message='Export not found',
+                status_code=404
+            )
+        
+        if job['status'] != 'succeeded':
+            return error_response(
+                message='Export is not ready',
+                status_code=409,
+                error_detail=f"Export job is {job['status']}"
+            )
+        
+        path = os.path.abspath(TaskExport.file_path(job_id, job['payload']['format']))
+        if not os.path.exists(path):
+            return error_response(
+                message='Export file has expired',
+                status_code=410
+            )
+        
+        return send_file(
+            path,
+            mimetype='application/gzip',
+            as_attachment=True,
+            download_name=os.path.basename(path),
+            conditional=True
+        )
+        
+    except ValueError as e:
+        return error_response(
+            message='Invalid job ID format',
+            status_code=400,
+            error_detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error downloading export {job_id}: {str(e)}")
+        return error_response(
+            message='Failed to download export',
+            status_code=500,
+            error_detail=str(e)
+        )
+
+@task_bp.route('/tasks/analytics', methods=['GET'])
+@require_feature('analytics')
+def get_task_analytics():
+    """Get created/completed counts and median lead time per day or week"""
+    try:
+        unit = request.args.get('unit', 'day')
+        if unit not in TaskAnalytics.UNITS:
+            return error_response(
+                message='Invalid unit',
+                status_code=400,
+                error_detail='unit must be day or week'
+            )
+        
+        start, end = TaskAnalytics.default_range(unit)
+        try:
+            if request.args.get('start'):
+                start = parse_iso(request.args['start'])
+            if request.args.get('end'):
+                end = parse_iso(request.args['end'])
+        except ValueError as e:
+            return error_response(
+                message='Invalid date range',
+                status_code=400,
+                error_detail=str(e)
+            )
+        
+        max_buckets = current_app.config['ANALYTICS_MAX_BUCKETS']
+        if end <= start or (end - start) / TaskAnalytics.step(unit) > max_buckets:
+            return error_response(
+                message='Invalid date range',
+                status_code=400,
+                error_detail=f'end must be after start and span at most {max_buckets} buckets'
+            )
+        
+        refresh = request.args.get('refresh', 'false').lower() == 'true'
+        series, computed = TaskAnalytics.get_series(g.tenant, unit, start, end, refresh=refresh)
+        
+        created = sum(bucket['created'] for bucket in series)
+        completed = sum(bucket['completed'] for bucket in series)
+        
+        return success_response(
+            data={
+                'unit': unit,
+                'start': format_iso(start),
+                'end': format_iso(end),
+                'buckets': [
+                    {
+                        'bucket': format_iso(bucket['bucket']),
+                        'created': bucket['created'],
+                        'completed': bucket['completed'],
+                        'median_lead_time_hours': (
+                            round(bucket['median_lead_time_ms'] / 3600000.0, 2)
+                            if bucket['median_lead_time_ms'] is not None else None
+                        )
+                    }
+                    for bucket in series
+                ],
+                'totals': {
+                    'created': created,
+                    'completed': completed,
+                    'completion_rate': round(completed / created, 4) if created else None
+                },
+                'computed_buckets': computed
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting task analytics: {str(e)}")
+        return error_response(
+            message='Failed to retrieve analytics',
+            status_code=500,
+            error_detail=str(e)
+        )
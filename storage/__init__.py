@@ -0,0 +1,58 @@
+# storage/__init__.py - Task storage backend selection
+from storage.memory import MemoryTaskBackend
+from storage.mongo import MongoTaskBackend
+from storage.sqlite import SQLiteTaskBackend
+from database import Database
+import logging
+
+logger = logging.getLogger(__name__)
+
+# STORAGE_BACKEND value -> backend class
+BACKENDS = {
+    'mongo': MongoTaskBackend,
+    'memory': MemoryTaskBackend,
+    'sqlite': SQLiteTaskBackend
+}
+
+_backend = None
+
+
+def create_backend(name, config=None):
+    """
+    Instantiate a storage backend by name
+
+    Args:
+        name: Key in BACKENDS
+        config: Application configuration passed to the backend
+
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[name].from_config(config or {})
+
+
+def init_storage(app):
+    """
+    Create the task storage backend selected by STORAGE_BACKEND
+
+    Args:
+        app: Flask application instance
+    """
+    global _backend
+
+    _backend = create_backend(app.config.get('STORAGE_BACKEND', 'mongo'), app.config)
+    app.extensions['storage'] = _backend
+    logger.info(f"Task storage backend: {_backend.name}")
+
+
+def get_backend():
+    """Get the configured backend, creating it from Database.config where init_storage has not run (job processes)"""
+    global _backend
+
+    if _backend is None:
+        config = Database.config or {}
+        _backend = create_backend(config.get('STORAGE_BACKEND', 'mongo'), config)
+    return _backend
+
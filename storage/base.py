@@ -0,0 +1,257 @@
+# storage/base.py - Interface implemented by task storage backends
+
+
+class StorageBackend:
+    """
+    Persistence operations the Task model relies on
+
+    Every method receives an already-resolved tenant ID and returns plain
+    task documents (dictionaries with an ObjectId '_id'), so the model's
+    validation, logging and serialization stay backend-independent.
+    """
+
+    # Short name used in configuration (STORAGE_BACKEND) and health checks
+    name = None
+    description = None
+
+    # Features served straight from MongoDB outside this interface
+    # (analytics, archive, exports, jobs); see supports()
+    features = frozenset()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create the backend from application configuration"""
+        return cls()
+
+    def supports(self, feature):
+        """
+        Check whether a MongoDB-only feature is available on this backend
+
+        Args:
+            feature: Feature name, e.g. 'analytics' or 'exports'
+
+        Returns:
+            True if the feature can be used
+        """
+        return feature in self.features
+
+    def ping(self):
+        """
+        Check the backend is reachable
+
+        Returns:
+            True if the backend answered
+        """
+        raise NotImplementedError
+
+    def last_error(self):
+        """Error from the most recent failed ping, if any"""
+        return None
+
+    def insert(self, tenant, document):
+        """
+        Insert a task document
+
+        Returns:
+            Stored document including its _id
+        """
+        raise NotImplementedError
+
+    def insert_many(self, tenant, documents):
+        """
+        Insert task documents in bulk (seeding and benchmarks)
+
+        Returns:
+            Number of documents inserted
+        """
+        raise NotImplementedError
+
+    def find_by_id(self, tenant, object_id, include_archived=False):
+        """Get a live task by ObjectId, or None"""
+        raise NotImplementedError
+
+    def find_many(self, tenant, object_ids, include_archived=False):
+        """
+        Get live tasks by ObjectId in one query
+
+        Returns:
+            List of the tasks found, in no particular order
+        """
+        raise NotImplementedError
+
+    def find(self, tenant, filters=None, sort_by='created_at', sort_order=-1, skip=0, limit=20,
+             include_archived=False):
+        """
+        Get a page of live tasks
+
+        Args:
+            tenant: Tenant ID
+            filters: Equality filters on task fields; tags also takes
+                {'$in': tags} (any) or {'$all': tags} (every one)
+            sort_by: Field to sort on
+            sort_order: 1 for ascending, -1 for descending
+            skip: Number of matching tasks to skip
+            limit: Maximum number of tasks to return
+            include_archived: Also return archived tasks (if the backend archives)
+
+        Returns:
+            List of task documents
+        """
+        raise NotImplementedError
+
+    def next_tasks(self, tenant, limit):
+        """
+        Get a tenant's most pressing incomplete tasks
+
+        Tasks are ordered by priority_rank (highest first), then due_date
+        (earliest first; tasks without a due date lead within their
+        priority, as nulls sort first), with one scan of the
+        (completed, priority_rank, due_date) index.
+
+        Returns:
+            List of at most limit task documents
+        """
+        raise NotImplementedError
+
+    def dependency_edges(self, tenant):
+        """
+        Read the dependency graph of a tenant's live tasks in one scan
+
+        Returns:
+            List of partial task documents with _id, completed, priority_rank,
+            due_date and depends_on
+        """
+        raise NotImplementedError
+
+    def dependency_closure(self, tenant, object_ids, for_write=False):
+        """
+        Get the live tasks the given tasks depend on, directly or transitively
+
+        Dependencies on tasks that are not live are not followed, and cycles
+        (which writes reject) cannot loop.
+
+        Args:
+            tenant: Tenant ID
+            object_ids: ObjectIds to start from
+            for_write: The result guards a write (cycle checks), so it must
+                see the latest writes rather than a possibly lagging replica
+
+        Returns:
+            List of task documents, in no particular order
+        """
+        raise NotImplementedError
+
+    def unblocked_tasks(self, tenant, limit):
+        """
+        Get incomplete tasks none of whose live dependencies is incomplete
+
+        Tasks come in the next_tasks order (priority_rank, then due_date).
+
+        Returns:
+            List of at most limit task documents
+        """
+        raise NotImplementedError
+
+    def update(self, tenant, object_id, fields):
+        """
+        Set fields on a live task
+
+        Setting completed to True stamps completed_at with updated_at unless
+        the task already was completed; setting it to False clears it.
+
+        Args:
+            tenant: Tenant ID
+            object_id: Task ObjectId
+            fields: Field values to set (always includes updated_at)
+
+        Returns:
+            Updated document, or None if no live task matched
+        """
+        raise NotImplementedError
+
+    def patch(self, tenant, object_id, changes, now):
+        """
+        Apply field changes to a live task, writing only if something differs
+
+        Fields whose stored value already equals the requested one are not
+        changed; when none differ the task is not written at all (updated_at
+        is kept). completed_at follows completed as in update().
+
+        Args:
+            tenant: Tenant ID
+            object_id: Task ObjectId
+            changes: Field values to apply (without updated_at)
+            now: Timestamp for updated_at (and completed_at)
+
+        Returns:
+            Tuple of (task after the patch, dictionary of fields that changed),
+            or None if no live task matched
+        """
+        raise NotImplementedError
+
+    def toggle(self, tenant, object_id, now):
+        """
+        Flip a live task's completion (status and completed_at follow)
+
+        Returns:
+            Updated document, or None if no live task matched
+        """
+        raise NotImplementedError
+
+    def soft_delete(self, tenant, object_id, now):
+        """
+        Flag a live task as deleted
+
+        Returns:
+            True if a live task matched
+        """
+        raise NotImplementedError
+
+    def statistics(self, tenant):
+        """
+        Count a tenant's live tasks
+
+        Returns:
+            Dictionary with total, completed, priority (value -> count) and
+            status (value -> count)
+        """
+        raise NotImplementedError
+
+    def tag_counts(self, tenant, limit=None):
+        """
+        Count a tenant's live tasks per tag
+
+        Counts are maintained as tasks are written, so reading them does not
+        scan the tasks.
+
+        Args:
+            tenant: Tenant ID
+            limit: Maximum number of tags (None for all)
+
+        Returns:
+            List of (tag, count) tuples, most used first, ties by tag
+        """
+        raise NotImplementedError
+
+    def reconcile_tag_counts(self, tenant=None):
+        """
+        Recount tags from the tasks and repair drifted tag counters
+
+        Backends that update counters in the same transaction as the tasks
+        have nothing to repair.
+
+        Args:
+            tenant: Tenant ID, or None for every tenant
+
+        Returns:
+            Dictionary with the number of counters corrected and removed
+        """
+        return {'corrected': 0, 'removed': 0}
+
+    def count(self, tenant):
+        """Number of a tenant's live tasks"""
+        raise NotImplementedError
+
+    def clear(self, tenant):
+        """Remove every task stored alongside the tenant's tasks (tests and benchmarks)"""
+        raise NotImplementedError
@@ -0,0 +1,410 @@
+# storage/memory.py - In-memory task storage with sorted secondary indexes
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice
+from bson import ObjectId
+from storage.base import StorageBackend
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every encoded value (used as an exclusive upper bound)
+_HIGH = (2,)
+
+
+def sort_value(value):
+    """Encode a field value so None sorts first, as MongoDB sorts null"""
+    return (0,) if value is None else (1, value)
+
+
+def matches(task, filters):
+    """
+    Check a task against equality filters ($in, $all and $ne are also supported)
+
+    Array fields (tags) match like in MongoDB: a value matches when any
+    element equals it, $in when any element is listed and $all when every
+    listed value is an element.
+
+    Raises:
+        ValueError: If a filter uses any other operator
+    """
+    for field, condition in filters.items():
+        value = task.get(field)
+        values = value if isinstance(value, list) else [value]
+
+        if isinstance(condition, dict):
+            for operator, argument in condition.items():
+                if operator == '$in':
+                    if not any(item in argument for item in values):
+                        return False
+                elif operator == '$all':
+                    if not all(item in values for item in argument):
+                        return False
+                elif operator == '$ne':
+                    if argument in values:
+                        return False
+                else:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+        elif condition not in values:
+            return False
+
+    return True
+
+
+class SortedIndex:
+    """
+    Compound index kept as a sorted list of (key, _id) entries
+
+    Lookups and range bounds are binary searches; _id breaks ties so every
+    entry is unique and can be found again for removal.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.entries = []
+
+    def key(self, task):
+        return tuple(sort_value(task.get(field)) for field in self.fields)
+
+    def add(self, task):
+        insort(self.entries, (self.key(task), task['_id']))
+
+    def remove(self, task):
+        entry = (self.key(task), task['_id'])
+        position = bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+
+    def bounds(self, prefix):
+        """Positions [lo, hi) of the entries whose leading fields equal prefix"""
+        prefix = tuple(sort_value(value) for value in prefix)
+        lo = bisect_left(self.entries, (prefix,))
+        hi = bisect_left(self.entries, (prefix + (_HIGH,),))
+        return lo, hi
+
+    def page(self, prefix, sort_order, skip, limit):
+        """_ids of one page of the entries matching prefix, in index or reverse order"""
+        lo, hi = self.bounds(prefix)
+
+        if sort_order >= 0:
+            start = lo + skip
+            return [self.entries[i][1] for i in range(start, min(hi, start + limit))]
+
+        stop = hi - skip
+        return [self.entries[i][1] for i in range(stop - 1, max(lo, stop - limit) - 1, -1)]
+
+
+class _TenantStore:
+    """One tenant's live tasks with their indexes and counters"""
+
+    # Mirrors the live MongoDB indexes (Database.TASK_INDEXES) minus tenant_id
+    INDEXES = [
+        ('created_at',),
+        ('priority', 'created_at'),
+        ('status', 'created_at'),
+        ('completed', 'created_at'),
+        ('due_date',),
+        ('completed', 'priority_rank', 'due_date')
+    ]
+    # Position of the next-task index in INDEXES
+    NEXT_INDEX = 5
+
+    def __init__(self):
+        self.tasks = {}
+        self.deleted = {}
+        self.indexes = [SortedIndex(fields) for fields in self.INDEXES]
+        # Multikey tag index: tag -> _ids of the tasks carrying it
+        self.tagged = {}
+        self.completed = 0
+        self.priority = Counter()
+        self.status = Counter()
+        self.tags = Counter()
+
+    def add(self, task):
+        self.tasks[task['_id']] = task
+        for index in self.indexes:
+            index.add(task)
+        for tag in task.get('tags') or ():
+            self.tagged.setdefault(tag, set()).add(task['_id'])
+        self.completed += 1 if task.get('completed') else 0
+        self.priority[task.get('priority')] += 1
+        self.status[task.get('status')] += 1
+        self.tags.update(task.get('tags') or ())
+
+    def remove(self, task):
+        del self.tasks[task['_id']]
+        for index in self.indexes:
+            index.remove(task)
+        for tag in task.get('tags') or ():
+            ids = self.tagged[tag]
+            ids.discard(task['_id'])
+            if not ids:
+                del self.tagged[tag]
+        self.completed -= 1 if task.get('completed') else 0
+        self.priority[task.get('priority')] -= 1
+        self.status[task.get('status')] -= 1
+        self.tags.subtract(task.get('tags') or ())
+
+    def plan(self, filters, sort_by):
+        """
+        Pick an index answering filters and sort_by with one range scan
+
+        Returns:
+            Tuple of (index, prefix values), or (None, None) if no index fits
+        """
+        if any(isinstance(condition, dict) for condition in filters.values()):
+            return None, None
+
+        for index in self.indexes:
+            leading = index.fields[:len(filters)]
+            if set(leading) != set(filters):
+                continue
+            remaining = index.fields[len(filters):]
+            # Filtering on the sort field leaves the sort order irrelevant
+            if (remaining and remaining[0] == sort_by) or sort_by in filters:
+                return index, [filters[field] for field in leading]
+
+        return None, None
+
+    def tagged_ids(self, condition):
+        """_ids of the tasks a tags filter can match (any or all of the listed tags)"""
+        if isinstance(condition, dict) and '$all' in condition:
+            sets = sorted((self.tagged.get(tag, set()) for tag in condition['$all']), key=len)
+            return set.intersection(*sets) if sets else set(self.tasks)
+        if isinstance(condition, dict) and '$in' in condition:
+            return set().union(*(self.tagged.get(tag, set()) for tag in condition['$in']))
+        if isinstance(condition, dict):
+            return set(self.tasks)
+        return self.tagged.get(condition, set())
+
+    def candidates(self, filters):
+        """Smallest index range matching one equality filter (or the tag index), or every task"""
+        tagged = self.tagged_ids(filters['tags']) if 'tags' in filters else None
+
+        best = None
+        for index in self.indexes:
+            field = index.fields[0]
+            if field not in filters or isinstance(filters[field], dict):
+                continue
+            lo, hi = index.bounds([filters[field]])
+            if best is None or hi - lo < best[2] - best[1]:
+                best = (index, lo, hi)
+
+        if tagged is not None and (best is None or len(tagged) < best[2] - best[1]):
+            return [self.tasks[_id] for _id in tagged]
+        if best is None:
+            return list(self.tasks.values())
+        index, lo, hi = best
+        return [self.tasks[entry[1]] for entry in index.entries[lo:hi]]
+
+
+class MemoryTaskBackend(StorageBackend):
+    """
+    Tasks kept in process memory, for tests, local development and benchmarks
+
+    Each tenant's tasks carry sorted secondary indexes mirroring the MongoDB
+    ones, so filtered, sorted pages are two binary searches plus the page
+    itself and statistics are read from counters. Nothing is persisted and
+    nothing is shared between processes.
+    """
+
+    name = 'memory'
+    description = 'In-memory storage'
+
+    def __init__(self):
+        self._tenants = {}
+        self._lock = threading.RLock()
+
+    def _store(self, tenant):
+        store = self._tenants.get(tenant)
+        if store is None:
+            store = self._tenants[tenant] = _TenantStore()
+        return store
+
+    def ping(self):
+        return True
+
+    def insert(self, tenant, document):
+        task = dict(document)
+        task.setdefault('_id', ObjectId())
+        with self._lock:
+            self._store(tenant).add(task)
+        return dict(task)
+
+    def insert_many(self, tenant, documents):
+        with self._lock:
+            store = self._store(tenant)
+            for document in documents:
+                task = dict(document)
+                task.setdefault('_id', ObjectId())
+                task.setdefault('is_deleted', False)
+                store.add(task)
+        return len(documents)
+
+    def find_by_id(self, tenant, object_id, include_archived=False):
+        with self._lock:
+            task = self._store(tenant).tasks.get(object_id)
+            return dict(task) if task else None
+
+    def find_many(self, tenant, object_ids, include_archived=False):
+        with self._lock:
+            tasks = self._store(tenant).tasks
+            return [dict(tasks[object_id]) for object_id in object_ids if object_id in tasks]
+
+    def find(self, tenant, filters=None, sort_by='created_at', sort_order=-1, skip=0, limit=20,
+             include_archived=False):
+        filters = filters or {}
+
+        with self._lock:
+            store = self._store(tenant)
+            index, prefix = store.plan(filters, sort_by)
+            if index is not None:
+                return [dict(store.tasks[_id]) for _id in index.page(prefix, sort_order, skip, limit)]
+
+            # No index covers this query: filter the narrowest range, then sort
+            matched = [task for task in store.candidates(filters) if matches(task, filters)]
+            matched.sort(key=lambda task: (sort_value(task.get(sort_by)), task['_id']), reverse=sort_order < 0)
+            return [dict(task) for task in matched[skip:skip + limit]]
+
+    @staticmethod
+    def _next_ids(store):
+        """Walk the (completed, priority_rank, due_date) index one rank at a time, highest first"""
+        index = store.indexes[_TenantStore.NEXT_INDEX]
+        lo, hi = index.bounds([False])
+
+        while hi > lo:
+            # The last entry holds the highest rank left; its due dates ascend
+            encoded = index.entries[hi - 1][0][1]
+            rank = None if encoded == sort_value(None) else encoded[1]
+            rank_lo = index.bounds([False, rank])[0]
+            for position in range(rank_lo, hi):
+                yield index.entries[position][1]
+            hi = rank_lo
+
+    def next_tasks(self, tenant, limit):
+        with self._lock:
+            store = self._store(tenant)
+            ids = list(islice(self._next_ids(store), limit))
+            return [dict(store.tasks[_id]) for _id in ids]
+
+    def dependency_edges(self, tenant):
+        with self._lock:
+            return [dict(task) for task in self._store(tenant).tasks.values()]
+
+    def dependency_closure(self, tenant, object_ids, for_write=False):
+        with self._lock:
+            tasks = self._store(tenant).tasks
+            seen = set()
+            stack = [dependency for object_id in object_ids if object_id in tasks
+                     for dependency in tasks[object_id].get('depends_on') or ()]
+
+            while stack:
+                object_id = stack.pop()
+                if object_id in seen or object_id not in tasks:
+                    continue
+                seen.add(object_id)
+                stack.extend(tasks[object_id].get('depends_on') or ())
+
+            return [dict(tasks[object_id]) for object_id in seen]
+
+    def unblocked_tasks(self, tenant, limit):
+        with self._lock:
+            store = self._store(tenant)
+            tasks = store.tasks
+
+            def is_open(object_id):
+                task = tasks.get(object_id)
+                return task is not None and not task.get('completed')
+
+            unblocked = (
+                _id for _id in self._next_ids(store)
+                if not any(is_open(dependency) for dependency in tasks[_id].get('depends_on') or ())
+            )
+            return [dict(tasks[_id]) for _id in islice(unblocked, limit)]
+
+    def _replace(self, tenant, object_id, apply):
+        """Re-index a task around an in-place change"""
+        with self._lock:
+            store = self._store(tenant)
+            task = store.tasks.get(object_id)
+            if task is None:
+                return None
+            store.remove(task)
+            apply(task)
+            store.add(task)
+            return dict(task)
+
+    def update(self, tenant, object_id, fields):
+        def apply(task):
+            if fields.get('completed') is True:
+                if task.get('completed') is not True:
+                    task['completed_at'] = fields['updated_at']
+            elif 'completed' in fields:
+                task['completed_at'] = None
+            task.update(fields)
+
+        return self._replace(tenant, object_id, apply)
+
+    def patch(self, tenant, object_id, changes, now):
+        with self._lock:
+            task = self._store(tenant).tasks.get(object_id)
+            if task is None:
+                return None
+
+            changed = {field: value for field, value in changes.items() if task.get(field) != value}
+            if not changed:
+                return dict(task), {}
+
+            changed['updated_at'] = now
+            if 'completed' in changed:
+                changed['completed_at'] = now if changed['completed'] else None
+            return self._replace(tenant, object_id, lambda task: task.update(changed)), changed
+
+    def toggle(self, tenant, object_id, now):
+        def apply(task):
+            completed = not task.get('completed', False)
+            task.update({
+                'completed': completed,
+                'completed_at': now if completed else None,
+                'status': 'completed' if completed else 'pending',
+                'updated_at': now
+            })
+
+        return self._replace(tenant, object_id, apply)
+
+    def soft_delete(self, tenant, object_id, now):
+        with self._lock:
+            store = self._store(tenant)
+            task = store.tasks.get(object_id)
+            if task is None:
+                return False
+            store.remove(task)
+            task.update({'is_deleted': True, 'deleted_at': now, 'updated_at': now})
+            store.deleted[object_id] = task
+            return True
+
+    def statistics(self, tenant):
+        with self._lock:
+            store = self._store(tenant)
+            return {
+                'total': len(store.tasks),
+                'completed': store.completed,
+                'priority': {value: count for value, count in store.priority.items() if count},
+                'status': {value: count for value, count in store.status.items() if count}
+            }
+
+    def tag_counts(self, tenant, limit=None):
+        with self._lock:
+            counts = [(tag, count) for tag, count in self._store(tenant).tags.items() if count > 0]
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return counts[:limit] if limit else counts
+
+    def count(self, tenant):
+        with self._lock:
+            return len(self._store(tenant).tasks)
+
+    def clear(self, tenant):
+        """Remove every tenant's tasks (like emptying the shared collection)"""
+        with self._lock:
+            self._tenants.clear()
@@ -0,0 +1,569 @@
+# storage/mongo.py - MongoDB task storage backend
+from collections import Counter
+from pymongo import ASCENDING, DESCENDING, DeleteMany, ReturnDocument, UpdateOne
+from database import Database, get_db
+from migrations import get_migration
+from migrations.state import MigrationState
+from storage.base import StorageBackend
+from utils.sessions import current_session
+from utils.tenancy import tenant_collection_name
+from utils.write_coalescer import set_op, stage_op
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MongoTaskBackend(StorageBackend):
+    """Tasks stored in MongoDB, one shared collection or one per tenant"""
+
+    name = 'mongo'
+    description = 'MongoDB connected'
+    features = frozenset({'analytics', 'archive', 'exports', 'jobs'})
+
+    COLLECTION_NAME = 'tasks'
+
+    # Tenant collections already prepared (indexes, validator) in this process
+    _prepared_collections = set()
+
+    def __init__(self):
+        # Optional WriteCoalescer for updates and toggles (see utils/write_coalescer.py)
+        self.coalescer = None
+
+    @staticmethod
+    def collection_name(tenant):
+        """Name of the tasks collection holding a tenant's documents"""
+        config = Database.config or {}
+        return tenant_collection_name(
+            MongoTaskBackend.COLLECTION_NAME,
+            tenant,
+            config.get('TENANCY_MODE', 'shared'),
+            config.get('DEFAULT_TENANT', 'default')
+        )
+
+    @staticmethod
+    def archive_collection_name(tenant):
+        """Name of the archive collection paired with a tenant's tasks collection"""
+        suffix = (Database.config or {}).get('ARCHIVE_COLLECTION_SUFFIX', '_archive')
+        return MongoTaskBackend.collection_name(tenant) + suffix
+
+    @staticmethod
+    def get_collection(tenant, operation=None):
+        """
+        Get the tasks collection holding a tenant's documents
+
+        Args:
+            tenant: Tenant ID
+            operation: Optional operation type selecting a read preference
+        """
+        name = MongoTaskBackend.collection_name(tenant)
+
+        if name != MongoTaskBackend.COLLECTION_NAME and name not in MongoTaskBackend._prepared_collections:
+            Database.prepare_task_collection(name)
+            MongoTaskBackend._prepared_collections.add(name)
+
+        return Database.get_collection(name, operation)
+
+    @staticmethod
+    def get_archive_collection(tenant, operation=None):
+        """Get the archive collection for a tenant's tasks"""
+        name = MongoTaskBackend.archive_collection_name(tenant)
+
+        if name not in MongoTaskBackend._prepared_collections:
+            Database.prepare_archive_collection(name)
+            MongoTaskBackend._prepared_collections.add(name)
+
+        return Database.get_collection(name, operation)
+
+    @staticmethod
+    def get_tag_counts_collection():
+        """Get the per-tenant tag counters, creating their indexes on first use"""
+        name = Database.config['TAG_COUNTS_COLLECTION']
+        collection = Database.get_collection(name)
+
+        if name not in MongoTaskBackend._prepared_collections:
+            try:
+                collection.create_index([('tenant_id', ASCENDING), ('tag', ASCENDING)], unique=True)
+                collection.create_index([('tenant_id', ASCENDING), ('count', DESCENDING)])
+            except Exception as e:
+                logger.warning(f"Failed to create tag count indexes: {str(e)}")
+            MongoTaskBackend._prepared_collections.add(name)
+
+        return collection
+
+    @staticmethod
+    def count_tags(changes):
+        """
+        Adjust tag counters after live tasks gained or lost tags
+
+        Args:
+            changes: Iterable of (tenant, tags, delta) tuples; deltas for the
+                same tag are summed and one upsert is sent per tag
+        """
+        deltas = Counter()
+        for tenant, tags, delta in changes:
+            for tag in tags or ():
+                deltas[(tenant, tag)] += delta
+
+        operations = [
+            UpdateOne({'tenant_id': tenant, 'tag': tag}, {'$inc': {'count': delta}}, upsert=True)
+            for (tenant, tag), delta in deltas.items() if delta
+        ]
+        if operations:
+            MongoTaskBackend.get_tag_counts_collection().bulk_write(
+                operations, ordered=False, session=current_session()
+            )
+
+    @staticmethod
+    def task_collection_names():
+        """Names of every live tasks collection (shared and per-tenant)"""
+        base = Database.config['COLLECTION_NAME']
+        suffix = Database.config['ARCHIVE_COLLECTION_SUFFIX']
+
+        return sorted(
+            name for name in get_db().list_collection_names()
+            if (name == base or name.startswith(f'{base}_')) and not name.endswith(suffix)
+        )
+
+    @staticmethod
+    def tenant_query(tenant, query=None):
+        """
+        Scope a query to a tenant's live (not soft-deleted) tasks
+
+        Until migrations 0001 and 0002 are done on the tenant's collection,
+        tasks written before tenancy (which belong to the default tenant) and
+        before soft-delete are matched too. Those queries cannot use the
+        partial live indexes, so run `flask migrate` after upgrading.
+        """
+        scoped = {'tenant_id': tenant, 'is_deleted': False}
+
+        done = MigrationState.done(MongoTaskBackend.collection_name(tenant))
+        if get_migration(1).id not in done and tenant == Database.config['DEFAULT_TENANT']:
+            scoped['tenant_id'] = {'$in': [tenant, None]}
+        if get_migration(2).id not in done:
+            scoped['is_deleted'] = {'$ne': True}
+
+        if query:
+            scoped.update(query)
+        return scoped
+
+    @staticmethod
+    def migrated(tenant, version):
+        """Whether a migration is done on the collection holding a tenant's tasks"""
+        return MigrationState.is_done(get_migration(version), MongoTaskBackend.collection_name(tenant))
+
+    @staticmethod
+    def _fill_priority_rank():
+        """Stage ranking tasks written before priority_rank (until migration 0004 is done)"""
+        priority = {'$ifNull': ['$priority', 'medium']}
+        return {'$addFields': {'priority_rank': {'$ifNull': ['$priority_rank', {'$switch': {
+            'branches': [
+                {'case': {'$eq': [priority, name]}, 'then': rank}
+                for name, rank in Database.config['PRIORITY_RANKS'].items()
+            ],
+            'default': None
+        }}]}}}
+
+    def ping(self):
+        return Database.ping()
+
+    def last_error(self):
+        return Database.last_error
+
+    def insert(self, tenant, document):
+        collection = MongoTaskBackend.get_collection(tenant)
+        # Read (and cache) the migration state while a new collection is still empty
+        MigrationState.done(collection.name)
+        result = collection.insert_one(document, session=current_session())
+        MongoTaskBackend.count_tags([(tenant, document.get('tags'), 1)])
+        return collection.find_one({'_id': result.inserted_id}, session=current_session())
+
+    def insert_many(self, tenant, documents):
+        if not documents:
+            return 0
+        collection = MongoTaskBackend.get_collection(tenant)
+        MigrationState.done(collection.name)
+        result = collection.insert_many(documents, ordered=False)
+        MongoTaskBackend.count_tags(
+            (tenant, document.get('tags'), 1) for document in documents if not document.get('is_deleted')
+        )
+        return len(result.inserted_ids)
+
+    def find_by_id(self, tenant, object_id, include_archived=False):
+        query = MongoTaskBackend.tenant_query(tenant, {'_id': object_id})
+
+        task = MongoTaskBackend.get_collection(tenant).find_one(query, session=current_session())
+        if not task and include_archived:
+            task = MongoTaskBackend.get_archive_collection(tenant).find_one(query, session=current_session())
+        return task
+
+    def find_many(self, tenant, object_ids, include_archived=False):
+        query = MongoTaskBackend.tenant_query(tenant, {'_id': {'$in': list(object_ids)}})
+        tasks = list(MongoTaskBackend.get_collection(tenant).find(query, session=current_session()))
+
+        missing = set(object_ids) - {task['_id'] for task in tasks}
+        if missing and include_archived:
+            query = MongoTaskBackend.tenant_query(tenant, {'_id': {'$in': list(missing)}})
+            tasks.extend(MongoTaskBackend.get_archive_collection(tenant).find(query, session=current_session()))
+        return tasks
+
+    def find(self, tenant, filters=None, sort_by='created_at', sort_order=-1, skip=0, limit=20,
+             include_archived=False):
+        """
+        Get a page of live tasks
+
+        With include_archived, archived tasks are merged in server-side
+        with $unionWith before sorting and paging. Sorting by priority_rank
+        ranks older tasks on the fly until migration 0004 is done.
+        """
+        collection = MongoTaskBackend.get_collection(tenant, operation='list')
+        query = MongoTaskBackend.tenant_query(tenant, filters)
+        fill_rank = sort_by == 'priority_rank' and not MongoTaskBackend.migrated(tenant, 4)
+
+        if include_archived or fill_rank:
+            pipeline = [{'$match': query}]
+            if include_archived:
+                MongoTaskBackend.get_archive_collection(tenant)
+                pipeline.append({'$unionWith': {
+                    'coll': MongoTaskBackend.archive_collection_name(tenant),
+                    'pipeline': [{'$match': query}]
+                }})
+            if fill_rank:
+                pipeline.append(MongoTaskBackend._fill_priority_rank())
+            pipeline += [{'$sort': {sort_by: sort_order}}, {'$skip': skip}, {'$limit': limit}]
+            cursor = collection.aggregate(pipeline, session=current_session())
+        else:
+            cursor = collection.find(query, session=current_session()).sort(sort_by, sort_order).skip(skip).limit(limit)
+        return list(cursor)
+
+    def next_tasks(self, tenant, limit):
+        collection = MongoTaskBackend.get_collection(tenant, operation='list')
+        query = MongoTaskBackend.tenant_query(tenant, {'completed': False})
+
+        if not MongoTaskBackend.migrated(tenant, 4):
+            # Older tasks have no priority_rank yet: rank them from priority and sort in memory
+            pipeline = [
+                {'$match': query},
+                MongoTaskBackend._fill_priority_rank(),
+                {'$sort': {'priority_rank': -1, 'due_date': 1}},
+                {'$limit': limit}
+            ]
+            return list(collection.aggregate(pipeline, session=current_session()))
+
+        # Walks the (tenant_id, completed, priority_rank, due_date) index in order
+        cursor = collection.find(query, session=current_session()).sort(
+            [('priority_rank', -1), ('due_date', 1)]
+        ).limit(limit)
+        return list(cursor)
+
+    def dependency_edges(self, tenant):
+        collection = MongoTaskBackend.get_collection(tenant, operation='list')
+        query = MongoTaskBackend.tenant_query(tenant)
+        projection = {'completed': 1, 'priority_rank': 1, 'due_date': 1, 'depends_on': 1}
+        if not MongoTaskBackend.migrated(tenant, 4):
+            pipeline = [{'$match': query}, MongoTaskBackend._fill_priority_rank(), {'$project': projection}]
+            return list(collection.aggregate(pipeline, session=current_session()))
+        return list(collection.find(query, projection, session=current_session()))
+
+    @staticmethod
+    def _graph_lookup(tenant, as_field, restrict=None, max_depth=None):
+        """$graphLookup stage following depends_on to live tasks of the tenant"""
+        stage = {
+            'from': MongoTaskBackend.collection_name(tenant),
+            'startWith': {'$ifNull': ['$depends_on', []]},
+            'connectFromField': 'depends_on',
+            'connectToField': '_id',
+            'as': as_field,
+            'restrictSearchWithMatch': MongoTaskBackend.tenant_query(tenant, restrict)
+        }
+        if max_depth is not None:
+            stage['maxDepth'] = max_depth
+        return {'$graphLookup': stage}
+
+    def dependency_closure(self, tenant, object_ids, for_write=False):
+        """
+        Follow depends_on server-side with one $graphLookup (each hop is an _id index lookup)
+
+        Cycle checks (for_write) read the primary; a secondary might not have
+        the edge written a moment ago yet.
+        """
+        collection = MongoTaskBackend.get_collection(tenant, operation=None if for_write else 'list')
+        pipeline = [
+            {'$match': MongoTaskBackend.tenant_query(tenant, {'_id': {'$in': list(object_ids)}})},
+            MongoTaskBackend._graph_lookup(tenant, 'closure'),
+            {'$unwind': '$closure'},
+            {'$replaceRoot': {'newRoot': '$closure'}}
+        ]
+        tasks = {}
+        for task in collection.aggregate(pipeline, session=current_session()):
+            tasks[task['_id']] = task
+        return list(tasks.values())
+
+    def unblocked_tasks(self, tenant, limit):
+        """
+        Walk incomplete tasks in next-task order, looking up each one's open dependencies
+
+        A $graphLookup limited to one hop and to incomplete tasks finds the
+        blockers; the walk stops once limit unblocked tasks are found.
+        """
+        collection = MongoTaskBackend.get_collection(tenant, operation='list')
+        pipeline = [{'$match': MongoTaskBackend.tenant_query(tenant, {'completed': False})}]
+        if not MongoTaskBackend.migrated(tenant, 4):
+            pipeline.append(MongoTaskBackend._fill_priority_rank())
+        pipeline += [
+            {'$sort': {'priority_rank': -1, 'due_date': 1}},
+            MongoTaskBackend._graph_lookup(tenant, 'open_dependencies', {'completed': False}, max_depth=0),
+            {'$match': {'open_dependencies': {'$size': 0}}},
+            {'$limit': limit},
+            {'$project': {'open_dependencies': 0}}
+        ]
+        return list(collection.aggregate(pipeline, session=current_session()))
+
+    @staticmethod
+    def _update_op(fields):
+        """Express an update as a coalescable operation"""
+        if fields.get('completed') is not True:
+            if 'completed' in fields:
+                fields['completed_at'] = None
+            return set_op(fields)
+
+        # Keep the first completion time when the task is already completed
+        stage = {field: {'$literal': value} for field, value in fields.items()}
+        stage['completed_at'] = {
+            '$cond': [{'$eq': ['$completed', True]}, '$completed_at', fields['updated_at']]
+        }
+        return stage_op({'$set': stage})
+
+    @staticmethod
+    def _toggle_stage(now):
+        """Update pipeline stage flipping completion"""
+        was_completed = {'$eq': ['$completed', True]}
+        return {'$set': {
+            'completed': {'$cond': [was_completed, False, True]},
+            'completed_at': {'$cond': [was_completed, None, now]},
+            'status': {'$cond': [was_completed, 'pending', 'completed']},
+            'updated_at': now
+        }}
+
+    def update(self, tenant, object_id, fields):
+        collection = MongoTaskBackend.get_collection(tenant)
+        query = MongoTaskBackend.tenant_query(tenant, {'_id': object_id})
+        fields = dict(fields)
+
+        # Tag changes need the previous tags for the counters, so they are not coalesced
+        if self.coalescer is not None and 'tags' not in fields:
+            return self.coalescer.submit(collection, query, MongoTaskBackend._update_op(fields))
+
+        # completed_at records when a task was first marked completed
+        if fields.get('completed') is True:
+            collection.update_one(
+                {**query, 'completed': {'$ne': True}},
+                {'$set': {'completed_at': fields['updated_at']}},
+                session=current_session()
+            )
+        elif 'completed' in fields:
+            fields['completed_at'] = None
+
+        if 'tags' in fields:
+            before = collection.find_one_and_update(
+                query, {'$set': fields}, projection={'tags': 1},
+                return_document=ReturnDocument.BEFORE, session=current_session()
+            )
+            if before is None:
+                return None
+            MongoTaskBackend.count_tags([(tenant, before.get('tags'), -1), (tenant, fields['tags'], 1)])
+        else:
+            result = collection.update_one(query, {'$set': fields}, session=current_session())
+            if result.matched_count == 0:
+                return None
+
+        return collection.find_one(query, session=current_session())
+
+    def patch(self, tenant, object_id, changes, now):
+        """
+        Apply field changes with a conditional update
+
+        The filter only matches when at least one field differs, so no-op
+        patches never write (no oplog entry or change event). One
+        find_one_and_update returns the previous document, from which the
+        changed fields are derived.
+        """
+        collection = MongoTaskBackend.get_collection(tenant)
+        query = MongoTaskBackend.tenant_query(tenant, {'_id': object_id})
+
+        before = None
+        if changes:
+            stage = {field: {'$literal': value} for field, value in changes.items()}
+            stage['updated_at'] = now
+            if changes.get('completed') is True:
+                stage['completed_at'] = {'$cond': [{'$eq': ['$completed', True]}, '$completed_at', now]}
+            elif 'completed' in changes:
+                stage['completed_at'] = None
+
+            before = collection.find_one_and_update(
+                {**query, '$or': [{field: {'$ne': value}} for field, value in changes.items()]},
+                [{'$set': stage}],
+                return_document=ReturnDocument.BEFORE,
+                session=current_session()
+            )
+
+        if before is None:
+            task = collection.find_one(query, session=current_session())
+            return (task, {}) if task else None
+
+        changed = {field: value for field, value in changes.items() if before.get(field) != value}
+        if 'tags' in changed:
+            MongoTaskBackend.count_tags([(tenant, before.get('tags'), -1), (tenant, changed['tags'], 1)])
+        changed['updated_at'] = now
+        if 'completed' in changed:
+            changed['completed_at'] = now if changed['completed'] else None
+        return {**before, **changed}, changed
+
+    def toggle(self, tenant, object_id, now):
+        collection = MongoTaskBackend.get_collection(tenant)
+        query = MongoTaskBackend.tenant_query(tenant, {'_id': object_id})
+
+        if self.coalescer is not None:
+            return self.coalescer.submit(collection, query, stage_op(MongoTaskBackend._toggle_stage(now)))
+
+        task = collection.find_one(query, session=current_session())
+        if not task:
+            return None
+
+        new_completed = not task.get('completed', False)
+        collection.update_one(
+            query,
+            {'$set': {
+                'completed': new_completed,
+                'completed_at': now if new_completed else None,
+                'status': 'completed' if new_completed else 'pending',
+                'updated_at': now
+            }},
+            session=current_session()
+        )
+
+        return collection.find_one(query, session=current_session())
+
+    def soft_delete(self, tenant, object_id, now):
+        before = MongoTaskBackend.get_collection(tenant).find_one_and_update(
+            MongoTaskBackend.tenant_query(tenant, {'_id': object_id}),
+            {'$set': {'is_deleted': True, 'deleted_at': now, 'updated_at': now}},
+            projection={'tags': 1},
+            return_document=ReturnDocument.BEFORE,
+            session=current_session()
+        )
+        if before is None:
+            return False
+        MongoTaskBackend.count_tags([(tenant, before.get('tags'), -1)])
+        return True
+
+    def statistics(self, tenant):
+        collection = MongoTaskBackend.get_collection(tenant, operation='stats')
+
+        pipeline = [
+            {'$match': MongoTaskBackend.tenant_query(tenant)},
+            {
+                '$facet': {
+                    'total': [{'$count': 'count'}],
+                    'completed': [
+                        {'$match': {'completed': True}},
+                        {'$count': 'count'}
+                    ],
+                    'priority_stats': [
+                        {
+                            '$group': {
+                                '_id': '$priority',
+                                'count': {'$sum': 1}
+                            }
+                        }
+                    ],
+                    'status_stats': [
+                        {
+                            '$group': {
+                                '_id': '$status',
+                                'count': {'$sum': 1}
+                            }
+                        }
+                    ]
+                }
+            }
+        ]
+
+        result = list(collection.aggregate(pipeline, session=current_session()))[0]
+
+        return {
+            'total': result['total'][0]['count'] if result['total'] else 0,
+            'completed': result['completed'][0]['count'] if result['completed'] else 0,
+            'priority': {item['_id']: item['count'] for item in result['priority_stats']},
+            'status': {item['_id']: item['count'] for item in result['status_stats']}
+        }
+
+    def tag_counts(self, tenant, limit=None):
+        """Read the tenant's tag counters (kept up to date by every write)"""
+        cursor = MongoTaskBackend.get_tag_counts_collection().find(
+            {'tenant_id': tenant, 'count': {'$gt': 0}}, {'_id': 0, 'tag': 1, 'count': 1},
+            session=current_session()
+        ).sort([('count', -1), ('tag', 1)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return [(counter['tag'], counter['count']) for counter in cursor]
+
+    def reconcile_tag_counts(self, tenant=None):
+        """
+        Recount tags from the live tasks and replace drifted counters
+
+        count_tags runs after the task write rather than in a transaction
+        with it, so a failure in between leaves a counter off. Counters are
+        recounted with $unwind/$group per tasks collection; only those that
+        differ are rewritten, and counters of tags no live task carries are
+        removed. Writes landing during the recount can still be off by their
+        own delta until the next run.
+        """
+        default_tenant = Database.config['DEFAULT_TENANT']
+        if tenant is None:
+            names = MongoTaskBackend.task_collection_names()
+            query = {'is_deleted': {'$ne': True}}
+        else:
+            names = [MongoTaskBackend.collection_name(tenant)]
+            query = MongoTaskBackend.tenant_query(tenant)
+
+        actual = {}
+        for name in names:
+            pipeline = [
+                {'$match': dict(query, **{'tags.0': {'$exists': True}})},
+                {'$unwind': '$tags'},
+                {'$group': {
+                    # Tasks from before tenancy belong to the default tenant
+                    '_id': {'tenant_id': {'$ifNull': ['$tenant_id', default_tenant]}, 'tag': '$tags'},
+                    'count': {'$sum': 1}
+                }}
+            ]
+            for group in Database.get_collection(name).aggregate(pipeline, allowDiskUse=True):
+                key = (group['_id']['tenant_id'], group['_id']['tag'])
+                actual[key] = actual.get(key, 0) + group['count']
+
+        counters = MongoTaskBackend.get_tag_counts_collection()
+        stored = {
+            (counter['tenant_id'], counter['tag']): counter
+            for counter in counters.find({} if tenant is None else {'tenant_id': tenant})
+        }
+
+        corrected = [
+            UpdateOne({'tenant_id': key[0], 'tag': key[1]}, {'$set': {'count': count}}, upsert=True)
+            for key, count in actual.items()
+            if key not in stored or stored[key].get('count') != count
+        ]
+        stale = [counter['_id'] for key, counter in stored.items() if key not in actual]
+        operations = corrected + ([DeleteMany({'_id': {'$in': stale}})] if stale else [])
+        if operations:
+            counters.bulk_write(operations, ordered=False)
+
+        logger.info(f"Reconciled tag counts: {len(corrected)} corrected, {len(stale)} removed")
+        return {'corrected': len(corrected), 'removed': len(stale)}
+
+    def count(self, tenant):
+        return MongoTaskBackend.get_collection(tenant).count_documents(MongoTaskBackend.tenant_query(tenant))
+
+    def clear(self, tenant):
+        collection = MongoTaskBackend.get_collection(tenant)
+        tenants = collection.distinct('tenant_id') + [tenant]
+        collection.delete_many({})
+        MongoTaskBackend.get_tag_counts_collection().delete_many({'tenant_id': {'$in': tenants}})
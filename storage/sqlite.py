@@ -0,0 +1,507 @@
+# storage/sqlite.py - Embedded SQLite task storage for single-node deployments
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from bson import ObjectId
+from config import Config
+from storage.base import StorageBackend
+from utils.timestamps import UTC, to_utc
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Task fields stored as columns, in SELECT order after the id
+COLUMNS = (
+    'tenant_id', 'title', 'description', 'completed', 'completed_at', 'priority', 'priority_rank',
+    'status', 'due_date', 'tags', 'depends_on', 'is_deleted', 'deleted_at', 'created_at', 'updated_at'
+)
+DATETIME_COLUMNS = frozenset({'completed_at', 'due_date', 'deleted_at', 'created_at', 'updated_at'})
+BOOLEAN_COLUMNS = frozenset({'completed', 'is_deleted'})
+JSON_COLUMNS = frozenset({'tags', 'depends_on'})
+# JSON lists of task IDs, stored as hex strings
+OBJECT_ID_LIST_COLUMNS = frozenset({'depends_on'})
+# Values for fields missing from inserted documents
+DEFAULTS = {
+    'description': '', 'completed': False, 'priority': 'medium', 'status': 'pending', 'tags': [], 'depends_on': [],
+    'is_deleted': False
+}
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS tasks (
+        id TEXT PRIMARY KEY,
+        tenant_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL DEFAULT '',
+        completed INTEGER NOT NULL DEFAULT 0,
+        completed_at TEXT,
+        priority TEXT NOT NULL DEFAULT 'medium',
+        priority_rank INTEGER,
+        status TEXT NOT NULL DEFAULT 'pending',
+        due_date TEXT,
+        tags TEXT NOT NULL DEFAULT '[]',
+        depends_on TEXT NOT NULL DEFAULT '[]',
+        is_deleted INTEGER NOT NULL DEFAULT 0,
+        deleted_at TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )''',
+    # Same shapes as the live MongoDB indexes (Database.TASK_INDEXES)
+    'CREATE INDEX IF NOT EXISTS tasks_tenant_created ON tasks (tenant_id, created_at) WHERE is_deleted = 0',
+    'CREATE INDEX IF NOT EXISTS tasks_tenant_priority ON tasks (tenant_id, priority, created_at) WHERE is_deleted = 0',
+    'CREATE INDEX IF NOT EXISTS tasks_tenant_status ON tasks (tenant_id, status, created_at) WHERE is_deleted = 0',
+    'CREATE INDEX IF NOT EXISTS tasks_tenant_completed ON tasks (tenant_id, completed, created_at) WHERE is_deleted = 0',
+    'CREATE INDEX IF NOT EXISTS tasks_tenant_due ON tasks (tenant_id, due_date) WHERE is_deleted = 0',
+    'CREATE INDEX IF NOT EXISTS tasks_tenant_completed_at ON tasks (tenant_id, completed_at) WHERE is_deleted = 0',
+    'CREATE INDEX IF NOT EXISTS tasks_tenant_next ON tasks (tenant_id, completed, priority_rank DESC, due_date) '
+    'WHERE is_deleted = 0',
+    # Covers the statistics GROUP BY, which then never reads table rows
+    'CREATE INDEX IF NOT EXISTS tasks_tenant_stats ON tasks (tenant_id, priority, status, completed) WHERE is_deleted = 0',
+    # One row per tag of each live task (the multikey tag index), kept in
+    # sync by triggers; tag filters and tag counts read only this table
+    '''CREATE TABLE IF NOT EXISTS task_tags (
+        task_id TEXT NOT NULL,
+        tenant_id TEXT NOT NULL,
+        tag TEXT NOT NULL,
+        PRIMARY KEY (task_id, tag)
+    ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS task_tags_tenant_tag ON task_tags (tenant_id, tag)',
+    '''CREATE TRIGGER IF NOT EXISTS tasks_tags_insert AFTER INSERT ON tasks WHEN NEW.is_deleted = 0 BEGIN
+        INSERT OR IGNORE INTO task_tags SELECT NEW.id, NEW.tenant_id, value FROM json_each(NEW.tags);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS tasks_tags_update AFTER UPDATE OF tags, is_deleted ON tasks BEGIN
+        DELETE FROM task_tags WHERE task_id = OLD.id;
+        INSERT OR IGNORE INTO task_tags SELECT NEW.id, NEW.tenant_id, value FROM json_each(NEW.tags)
+            WHERE NEW.is_deleted = 0;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS tasks_tags_delete AFTER DELETE ON tasks BEGIN
+        DELETE FROM task_tags WHERE task_id = OLD.id;
+    END'''
+]
+
+# Columns added after the table was first created: (name, declaration,
+# backfill expression or None when the column default suffices). Older
+# database files get them with ALTER TABLE and one UPDATE before the indexes
+# are built.
+ADDED_COLUMNS = [
+    ('priority_rank', 'INTEGER',
+     f"CASE priority {' '.join(f'WHEN {value!r} THEN {rank}' for value, rank in Config.PRIORITY_RANKS.items())} END"),
+    ('tags', "TEXT NOT NULL DEFAULT '[]'", None),
+    ('depends_on', "TEXT NOT NULL DEFAULT '[]'", None)
+]
+
+SELECT = f"SELECT id, {', '.join(COLUMNS)} FROM tasks"
+INSERT = f"INSERT INTO tasks (id, {', '.join(COLUMNS)}) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})"
+LIVE = 'tenant_id = ? AND is_deleted = 0'
+# For lookups by id: the unary + keeps the planner on the primary key rather
+# than scanning the tenant through one of the (tenant_id, ...) indexes
+LIVE_BY_ID = '+tenant_id = ? AND is_deleted = 0'
+
+
+def encode(column, value):
+    """Python value to its column representation"""
+    if value is None:
+        return None
+    if column in DATETIME_COLUMNS:
+        # Fixed-width UTC text sorts chronologically
+        return to_utc(value).strftime('%Y-%m-%dT%H:%M:%S.%f')
+    if column in BOOLEAN_COLUMNS:
+        return 1 if value else 0
+    if column in JSON_COLUMNS:
+        return json.dumps(value, default=str)
+    return value
+
+
+def decode_row(row):
+    """Row from SELECT to a task document"""
+    task = {'_id': ObjectId(row[0])}
+    for column, value in zip(COLUMNS, row[1:]):
+        if value is not None and column in DATETIME_COLUMNS:
+            value = datetime.fromisoformat(value).replace(tzinfo=UTC)
+        elif column in BOOLEAN_COLUMNS:
+            value = bool(value)
+        elif value is not None and column in JSON_COLUMNS:
+            value = json.loads(value)
+            if column in OBJECT_ID_LIST_COLUMNS:
+                value = [ObjectId(item) for item in value]
+        task[column] = value
+    return task
+
+
+class SQLiteTaskBackend(StorageBackend):
+    """
+    Tasks stored in a local SQLite database in WAL mode
+
+    Each thread gets its own connection (sqlite3 connections must not be
+    shared across threads; forked workers open new ones), and statements
+    are fixed strings with placeholders so every connection's statement
+    cache reuses the prepared statements.
+    """
+
+    name = 'sqlite'
+    description = 'SQLite connected'
+
+    def __init__(self, path='tasks.db', busy_timeout_ms=5000, cached_statements=256):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._schema_pid = None
+        self._schema_lock = threading.Lock()
+        self._error = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            path=config['SQLITE_PATH'],
+            busy_timeout_ms=config['SQLITE_BUSY_TIMEOUT_MS'],
+            cached_statements=config['SQLITE_CACHED_STATEMENTS']
+        )
+
+    def connection(self):
+        """Get this thread's connection, opening it on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Autocommit; multi-statement writes open their own transaction
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            isolation_level=None,
+            cached_statements=self.cached_statements
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        self._ensure_schema(connection)
+
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _ensure_schema(self, connection):
+        if self._schema_pid == os.getpid():
+            return
+        with self._schema_lock:
+            if self._schema_pid == os.getpid():
+                return
+            connection.execute(SCHEMA[0])
+            existing = {row[1] for row in connection.execute('PRAGMA table_info(tasks)')}
+            for column, declaration, backfill in ADDED_COLUMNS:
+                if column not in existing:
+                    connection.execute(f"ALTER TABLE tasks ADD COLUMN {column} {declaration}")
+                    if backfill is not None:
+                        connection.execute(f"UPDATE tasks SET {column} = {backfill}")
+            for statement in SCHEMA[1:]:
+                connection.execute(statement)
+            self._schema_pid = os.getpid()
+            logger.info(f"SQLite task schema ready: {self.path}")
+
+    def ping(self):
+        try:
+            self.connection().execute('SELECT 1').fetchone()
+            self._error = None
+            return True
+        except Exception as e:
+            self._error = str(e)
+            return False
+
+    def last_error(self):
+        return self._error
+
+    @staticmethod
+    def _row(task_id, document):
+        return (task_id,) + tuple(encode(column, document.get(column, DEFAULTS.get(column))) for column in COLUMNS)
+
+    def _get(self, tenant, task_id):
+        row = self.connection().execute(f"{SELECT} WHERE id = ? AND {LIVE}", (task_id, tenant)).fetchone()
+        return decode_row(row) if row else None
+
+    def insert(self, tenant, document):
+        task_id = str(document.get('_id') or ObjectId())
+        self.connection().execute(INSERT, self._row(task_id, {**document, 'tenant_id': tenant}))
+        return self._get(tenant, task_id)
+
+    def insert_many(self, tenant, documents):
+        connection = self.connection()
+        rows = [
+            self._row(str(document.get('_id') or ObjectId()), {**document, 'tenant_id': tenant})
+            for document in documents
+        ]
+        connection.execute('BEGIN')
+        try:
+            connection.executemany(INSERT, rows)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return len(rows)
+
+    def find_by_id(self, tenant, object_id, include_archived=False):
+        return self._get(tenant, str(object_id))
+
+    def find_many(self, tenant, object_ids, include_archived=False):
+        task_ids = [str(object_id) for object_id in object_ids]
+        if not task_ids:
+            return []
+        rows = self.connection().execute(
+            f"{SELECT} WHERE id IN ({', '.join('?' * len(task_ids))}) AND {LIVE_BY_ID}",
+            task_ids + [tenant]
+        ).fetchall()
+        return [decode_row(row) for row in rows]
+
+    @staticmethod
+    def _tags_where(tenant, condition):
+        """
+        Translate a tags filter to a task_tags subquery
+
+        A tag, {'$in': tags} (any of them) or {'$all': tags} (every one).
+
+        Returns:
+            Tuple of (condition, parameter list)
+        """
+        if not isinstance(condition, dict):
+            condition = {'$in': [condition]}
+        if set(condition) - {'$in', '$all'} or len(condition) != 1:
+            raise ValueError(f"Unsupported tags filter: {condition}")
+
+        operator, tags = next(iter(condition.items()))
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return ('0' if operator == '$in' else '1'), []
+
+        subquery = f"SELECT task_id FROM task_tags WHERE tenant_id = ? AND tag IN ({', '.join('?' * len(tags))})"
+        if operator == '$all':
+            subquery += f" GROUP BY task_id HAVING COUNT(*) = {len(tags)}"
+        return f"id IN ({subquery})", [tenant] + tags
+
+    @staticmethod
+    def _where(filters, tenant):
+        """
+        Translate equality filters ($in and $ne too, $all on tags) to SQL
+
+        Returns:
+            Tuple of (condition list, parameter list)
+
+        Raises:
+            ValueError: For unknown fields or operators
+        """
+        conditions = []
+        parameters = []
+
+        for field, condition in (filters or {}).items():
+            if field not in COLUMNS:
+                raise ValueError(f"Unsupported filter field: {field}")
+
+            if field == 'tags':
+                sql, values = SQLiteTaskBackend._tags_where(tenant, condition)
+                conditions.append(sql)
+                parameters.extend(values)
+                continue
+
+            if not isinstance(condition, dict):
+                condition = {'$eq': condition}
+
+            for operator, argument in condition.items():
+                if operator == '$eq':
+                    if argument is None:
+                        conditions.append(f"{field} IS NULL")
+                    else:
+                        conditions.append(f"{field} = ?")
+                        parameters.append(encode(field, argument))
+                elif operator == '$ne':
+                    conditions.append(f"{field} IS NOT ?")
+                    parameters.append(encode(field, argument))
+                elif operator == '$in':
+                    conditions.append(f"{field} IN ({', '.join('?' * len(argument))})" if argument else '0')
+                    parameters.extend(encode(field, value) for value in argument)
+                else:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+
+        return conditions, parameters
+
+    def find(self, tenant, filters=None, sort_by='created_at', sort_order=-1, skip=0, limit=20,
+             include_archived=False):
+        if sort_by not in COLUMNS:
+            raise ValueError(f"Unsupported sort field: {sort_by}")
+
+        conditions, parameters = self._where(filters, tenant)
+        where = ' AND '.join([LIVE] + conditions)
+        # NULLs sort first ascending and last descending, as in MongoDB
+        sql = f"{SELECT} WHERE {where} ORDER BY {sort_by} {'ASC' if sort_order >= 0 else 'DESC'} LIMIT ? OFFSET ?"
+
+        rows = self.connection().execute(sql, [tenant] + parameters + [limit, skip]).fetchall()
+        return [decode_row(row) for row in rows]
+
+    def next_tasks(self, tenant, limit):
+        # NULL ranks sort last descending and NULL due dates first ascending, as in MongoDB
+        rows = self.connection().execute(
+            f"{SELECT} WHERE {LIVE} AND completed = 0 ORDER BY priority_rank DESC, due_date ASC LIMIT ?",
+            (tenant, limit)
+        ).fetchall()
+        return [decode_row(row) for row in rows]
+
+    def dependency_edges(self, tenant):
+        rows = self.connection().execute(
+            f"SELECT id, completed, priority_rank, due_date, depends_on FROM tasks WHERE {LIVE}", (tenant,)
+        ).fetchall()
+        return [
+            {
+                '_id': ObjectId(task_id),
+                'completed': bool(completed),
+                'priority_rank': priority_rank,
+                'due_date': datetime.fromisoformat(due_date).replace(tzinfo=UTC) if due_date else None,
+                'depends_on': [ObjectId(item) for item in json.loads(depends_on)]
+            }
+            for task_id, completed, priority_rank, due_date, depends_on in rows
+        ]
+
+    def dependency_closure(self, tenant, object_ids, for_write=False):
+        """Follow depends_on with a recursive CTE (UNION drops revisited tasks)"""
+        task_ids = [str(object_id) for object_id in object_ids]
+        if not task_ids:
+            return []
+        rows = self.connection().execute(
+            f'''WITH RECURSIVE reach(id) AS (
+                SELECT dependency.value FROM tasks, json_each(tasks.depends_on) AS dependency
+                WHERE tasks.id IN ({', '.join('?' * len(task_ids))}) AND {LIVE_BY_ID}
+                UNION
+                SELECT dependency.value FROM reach
+                JOIN tasks ON tasks.id = reach.id AND {LIVE_BY_ID}, json_each(tasks.depends_on) AS dependency
+            )
+            {SELECT} WHERE id IN (SELECT id FROM reach) AND {LIVE_BY_ID}''',
+            task_ids + [tenant, tenant, tenant]
+        ).fetchall()
+        return [decode_row(row) for row in rows]
+
+    def unblocked_tasks(self, tenant, limit):
+        # Walks tasks_tenant_next; each dependency is a primary key lookup
+        rows = self.connection().execute(
+            f'''{SELECT} WHERE {LIVE} AND completed = 0 AND NOT EXISTS (
+                SELECT 1 FROM json_each(tasks.depends_on) AS dependency
+                JOIN tasks AS blocker ON blocker.id = dependency.value
+                WHERE +blocker.tenant_id = tasks.tenant_id AND blocker.is_deleted = 0 AND blocker.completed = 0
+            )
+            ORDER BY priority_rank DESC, due_date ASC LIMIT ?''',
+            (tenant, limit)
+        ).fetchall()
+        return [decode_row(row) for row in rows]
+
+    def update(self, tenant, object_id, fields):
+        fields = dict(fields)
+        assignments = []
+        parameters = []
+
+        # completed_at records when a task was first marked completed
+        if fields.get('completed') is True:
+            assignments.append('completed_at = CASE WHEN completed = 1 THEN completed_at ELSE ? END')
+            parameters.append(encode('completed_at', fields['updated_at']))
+        elif 'completed' in fields:
+            fields['completed_at'] = None
+
+        for field, value in fields.items():
+            if field not in COLUMNS:
+                raise ValueError(f"Unsupported field: {field}")
+            assignments.append(f"{field} = ?")
+            parameters.append(encode(field, value))
+
+        task_id = str(object_id)
+        cursor = self.connection().execute(
+            f"UPDATE tasks SET {', '.join(assignments)} WHERE id = ? AND {LIVE}",
+            parameters + [task_id, tenant]
+        )
+        if cursor.rowcount == 0:
+            return None
+        return self._get(tenant, task_id)
+
+    def patch(self, tenant, object_id, changes, now):
+        """Read, compare and write only the changed columns in one write transaction"""
+        connection = self.connection()
+        task_id = str(object_id)
+
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            task = self._get(tenant, task_id)
+            changed = {}
+            if task is not None:
+                changed = {field: value for field, value in changes.items() if task.get(field) != value}
+
+            if changed:
+                changed['updated_at'] = now
+                if 'completed' in changed:
+                    changed['completed_at'] = now if changed['completed'] else None
+                for field in changed:
+                    if field not in COLUMNS:
+                        raise ValueError(f"Unsupported field: {field}")
+                connection.execute(
+                    f"UPDATE tasks SET {', '.join(f'{field} = ?' for field in changed)} WHERE id = ?",
+                    [encode(field, value) for field, value in changed.items()] + [task_id]
+                )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+        if task is None:
+            return None
+        return {**task, **changed}, changed
+
+    def toggle(self, tenant, object_id, now):
+        task_id = str(object_id)
+        now = encode('updated_at', now)
+        # Right-hand sides see the row before the update
+        cursor = self.connection().execute(
+            f'''UPDATE tasks SET
+                completed = 1 - completed,
+                completed_at = CASE WHEN completed = 1 THEN NULL ELSE ? END,
+                status = CASE WHEN completed = 1 THEN 'pending' ELSE 'completed' END,
+                updated_at = ?
+            WHERE id = ? AND {LIVE}''',
+            (now, now, task_id, tenant)
+        )
+        if cursor.rowcount == 0:
+            return None
+        return self._get(tenant, task_id)
+
+    def soft_delete(self, tenant, object_id, now):
+        now = encode('deleted_at', now)
+        cursor = self.connection().execute(
+            f"UPDATE tasks SET is_deleted = 1, deleted_at = ?, updated_at = ? WHERE id = ? AND {LIVE}",
+            (now, now, str(object_id), tenant)
+        )
+        return cursor.rowcount > 0
+
+    def statistics(self, tenant):
+        rows = self.connection().execute(
+            f"SELECT priority, status, completed, COUNT(*) FROM tasks WHERE {LIVE} "
+            "GROUP BY priority, status, completed",
+            (tenant,)
+        ).fetchall()
+
+        counts = {'total': 0, 'completed': 0, 'priority': {}, 'status': {}}
+        for priority, status, completed, count in rows:
+            counts['total'] += count
+            counts['completed'] += count if completed else 0
+            counts['priority'][priority] = counts['priority'].get(priority, 0) + count
+            counts['status'][status] = counts['status'].get(status, 0) + count
+        return counts
+
+    def tag_counts(self, tenant, limit=None):
+        # Index-only scan of task_tags_tenant_tag
+        rows = self.connection().execute(
+            "SELECT tag, COUNT(*) AS count FROM task_tags WHERE tenant_id = ? "
+            "GROUP BY tag ORDER BY count DESC, tag LIMIT ?",
+            (tenant, limit or -1)
+        ).fetchall()
+        return [(tag, count) for tag, count in rows]
+
+    def count(self, tenant):
+        return self.connection().execute(f"SELECT COUNT(*) FROM tasks WHERE {LIVE}", (tenant,)).fetchone()[0]
+
+    def clear(self, tenant):
+        """Remove every tenant's tasks (like emptying the shared collection)"""
+        self.connection().execute('DELETE FROM tasks')
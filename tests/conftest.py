@@ -5,6 +5,19 @@ from config import TestingConfig
 from database import Database
 from models.task import Task
 
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'mongo: test needs the MongoDB storage backend')
+
+def pytest_collection_modifyitems(config, items):
+    """Skip MongoDB-only tests when the suite runs on another storage backend"""
+    if TestingConfig.STORAGE_BACKEND == 'mongo':
+        return
+    
+    skip = pytest.mark.skip(reason=f'needs MongoDB (STORAGE_BACKEND={TestingConfig.STORAGE_BACKEND})')
+    for item in items:
+        if 'mongo' in item.keywords:
+            item.add_marker(skip)
+
 @pytest.fixture(scope='session')
 def app():
     """Create application for testing"""
@@ -31,16 +44,16 @@ def runner(app):
 def clean_database(app):
     """Clean database before each test"""
     with app.app_context():
-        # Clear all tasks before each test
-        collection = Task.get_collection()
-        collection.delete_many({})
+        # Clear all tasks (and cached dependency graphs) before each test
+        Task.backend().clear(Task.resolve_tenant())
+        if 'dependency_cache' in app.extensions:
+            app.extensions['dependency_cache'].clear()
     
     yield
     
     # Clean up after test
     with app.app_context():
-        collection = Task.get_collection()
-        collection.delete_many({})
+        Task.backend().clear(Task.resolve_tenant())
 
 @pytest.fixture
 def sample_task_data():
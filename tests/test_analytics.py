@@ -0,0 +1,103 @@
+# tests/test_analytics.py - Tests for completion timestamps and analytics rollups
+import pytest
+from datetime import datetime, timedelta
+from models.analytics import TaskAnalytics
+from utils.timestamps import UTC, utcnow
+
+@pytest.fixture
+def clean_rollups(app):
+    """Empty the rollup collection around each test"""
+    TaskAnalytics.get_rollup_collection().delete_many({})
+    yield
+    TaskAnalytics.get_rollup_collection().delete_many({})
+
+class TestCompletedAt:
+    """Test completion timestamps"""
+    
+    def test_toggle_sets_and_clears_completed_at(self, client, create_task):
+        """Test toggling records and clears the completion time"""
+        task_id = create_task()['data']['id']
+        assert create_task()['data']['completed_at'] is None
+        
+        data = client.patch(f'/api/tasks/{task_id}/toggle').get_json()['data']
+        assert data['completed_at'] is not None
+        
+        data = client.patch(f'/api/tasks/{task_id}/toggle').get_json()['data']
+        assert data['completed_at'] is None
+    
+    def test_update_keeps_first_completion_time(self, client, create_task):
+        """Test re-marking a completed task keeps its completion time"""
+        task_id = create_task()['data']['id']
+        first = client.put(f'/api/tasks/{task_id}', json={'completed': True}).get_json()['data']['completed_at']
+        again = client.put(f'/api/tasks/{task_id}', json={'completed': True}).get_json()['data']['completed_at']
+        
+        assert first is not None
+        assert again == first
+
+class TestBuckets:
+    """Test bucket alignment"""
+    
+    def test_week_starts_on_monday(self):
+        """Test weeks are truncated to Monday 00:00 UTC"""
+        value = datetime(2024, 5, 16, 13, 45, tzinfo=UTC)  # Thursday
+        assert TaskAnalytics.truncate(value, 'week') == datetime(2024, 5, 13, tzinfo=UTC)
+        assert TaskAnalytics.truncate(value, 'day') == datetime(2024, 5, 16, tzinfo=UTC)
+    
+    def test_bucket_starts(self):
+        """Test bucket starts cover the requested range"""
+        start = datetime(2024, 5, 1, 12, tzinfo=UTC)
+        end = datetime(2024, 5, 4, tzinfo=UTC)
+        assert TaskAnalytics.bucket_starts(start, end, 'day') == [
+            datetime(2024, 5, day, tzinfo=UTC) for day in (1, 2, 3)
+        ]
+
+@pytest.mark.mongo
+@pytest.mark.usefixtures('clean_rollups')
+class TestRollups:
+    """Test incremental rollups"""
+    
+    def test_only_open_and_missing_buckets_are_computed(self, monkeypatch):
+        """Test ended buckets are read back from the rollup collection"""
+        calls = []
+        
+        def fake_aggregate(tenant, unit, start, end):
+            calls.append((start, end))
+            return {start: {'created': 3, 'completed': 1, 'median_lead_time_ms': 1000}}
+        
+        monkeypatch.setattr(TaskAnalytics, 'aggregate_buckets', staticmethod(fake_aggregate))
+        today = TaskAnalytics.truncate(utcnow(), 'day')
+        start, end = today - timedelta(days=3), today + timedelta(days=1)
+        
+        series, computed = TaskAnalytics.get_series(unit='day', start=start, end=end)
+        assert computed == 4
+        assert series[0]['created'] == 3
+        
+        series, computed = TaskAnalytics.get_series(unit='day', start=start, end=end)
+        assert computed == 1
+        assert calls[-1] == (today, today + timedelta(days=1))
+        assert series[0]['created'] == 3
+
+@pytest.mark.mongo
+@pytest.mark.usefixtures('clean_rollups')
+class TestAnalyticsEndpoint:
+    """Test the analytics endpoint"""
+    
+    def test_daily_analytics(self, client, create_task):
+        """Test created and completed counts per day"""
+        task_id = create_task()['data']['id']
+        create_task()
+        client.patch(f'/api/tasks/{task_id}/toggle')
+        
+        response = client.get('/api/tasks/analytics?unit=day')
+        assert response.status_code == 200
+        
+        data = response.get_json()['data']
+        assert len(data['buckets']) == 30
+        assert data['buckets'][-1]['created'] == 2
+        assert data['buckets'][-1]['completed'] == 1
+        assert data['totals']['completion_rate'] == 0.5
+    
+    def test_invalid_unit(self, client):
+        """Test unsupported units are rejected"""
+        assert client.get('/api/tasks/analytics?unit=hour').status_code == 400
+        assert client.get('/api/tasks/analytics?start=2024-02-01&end=2024-01-01').status_code == 400
@@ -0,0 +1,162 @@
+# tests/test_archive.py - Tests for soft-delete and task archival
+import pytest
+from datetime import timedelta
+from bson import ObjectId
+from database import Database
+from models.archive import TaskArchive
+from models.task import Task
+from utils.timestamps import utcnow
+
+pytestmark = pytest.mark.mongo
+
+@pytest.fixture(autouse=True)
+def clean_archive(app):
+    """Empty the archive collection around each test"""
+    Task.get_archive_collection().delete_many({})
+    yield
+    Task.get_archive_collection().delete_many({})
+
+def age_task(task_id, days, **fields):
+    """Backdate a task's timestamps (and its completion, if completed)"""
+    past = utcnow() - timedelta(days=days)
+    Task.get_collection().update_one(
+        {'_id': ObjectId(task_id)},
+        {'$set': {'updated_at': past, **fields}}
+    )
+    Task.get_collection().update_one(
+        {'_id': ObjectId(task_id), 'completed': True},
+        {'$set': {'completed_at': past}}
+    )
+
+class TestSoftDelete:
+    """Test soft-delete behavior"""
+    
+    def test_delete_keeps_document_flagged(self, client, create_task):
+        """Test deleted tasks are flagged rather than removed"""
+        task_id = create_task()['data']['id']
+        assert client.delete(f'/api/tasks/{task_id}').status_code == 200
+        
+        document = Task.get_collection().find_one({'_id': ObjectId(task_id)})
+        assert document['is_deleted'] is True
+        assert document['deleted_at'] is not None
+    
+    def test_deleted_task_is_hidden(self, client, create_task):
+        """Test deleted tasks disappear from reads, updates and statistics"""
+        task_id = create_task()['data']['id']
+        client.delete(f'/api/tasks/{task_id}')
+        
+        assert client.get(f'/api/tasks/{task_id}').status_code == 404
+        assert client.put(f'/api/tasks/{task_id}', json={'title': 'x'}).status_code == 404
+        assert client.delete(f'/api/tasks/{task_id}').status_code == 404
+        assert client.get('/api/tasks').get_json()['data']['count'] == 0
+        assert client.get('/api/tasks/stats').get_json()['data']['total_tasks'] == 0
+
+class TestArchive:
+    """Test moving old tasks to the archive collection"""
+    
+    def test_archives_old_completed_and_deleted_tasks(self, client, create_task):
+        """Test only tasks past the cutoff are moved"""
+        old_completed = create_task({'title': 'Old done', 'completed': True, 'tags': ['ops']})['data']['id']
+        old_deleted = create_task({'title': 'Old deleted', 'tags': ['ops']})['data']['id']
+        recent_completed = create_task({'title': 'Recent done', 'completed': True, 'tags': ['ops']})['data']['id']
+        open_task = create_task({'title': 'Open'})['data']['id']
+        
+        client.delete(f'/api/tasks/{old_deleted}')
+        age_task(old_completed, 60)
+        age_task(old_deleted, 60, deleted_at=utcnow() - timedelta(days=60))
+        age_task(open_task, 60)
+        
+        totals = TaskArchive.run(older_than_days=30, batch_size=1, pause_ms=0)
+        assert totals[Task.COLLECTION_NAME] == 2
+        
+        live_ids = {str(doc['_id']) for doc in Task.get_collection().find()}
+        archived_ids = {str(doc['_id']) for doc in Task.get_archive_collection().find()}
+        assert live_ids == {recent_completed, open_task}
+        assert archived_ids == {old_completed, old_deleted}
+        # Tag counts only cover live tasks
+        assert Task.get_tag_counts() == [{'tag': 'ops', 'count': 1}]
+    
+    def test_completed_tasks_age_from_completion(self, client, create_task):
+        """Test editing an old completed task does not keep it live"""
+        edited = create_task({'title': 'Old done', 'completed': True})['data']['id']
+        age_task(edited, 60)
+        client.patch(f'/api/tasks/{edited}', json={'description': 'Edited today'})
+        
+        reopened = create_task({'title': 'Reopened', 'completed': True})['data']['id']
+        age_task(reopened, 60)
+        client.patch(f'/api/tasks/{reopened}/toggle')
+        client.patch(f'/api/tasks/{reopened}/toggle')
+        
+        TaskArchive.run(older_than_days=30, pause_ms=0)
+        archived_ids = {str(doc['_id']) for doc in Task.get_archive_collection().find()}
+        assert archived_ids == {edited}
+    
+    def test_changed_tasks_do_not_end_the_run(self, client, create_task, monkeypatch):
+        """Test a batch whose tasks changed after being fetched does not stop archival early"""
+        task_ids = [create_task({'title': f'Done {i}', 'completed': True})['data']['id'] for i in range(3)]
+        for task_id in task_ids:
+            age_task(task_id, 60)
+        
+        # Reopen the first fetched task while the batch is being copied
+        archive_type = type(Task.get_archive_collection())
+        insert_many = archive_type.insert_many
+        reopened = []
+        
+        def reopen_first(self, documents, *args, **kwargs):
+            if not reopened:
+                reopened.append(documents[0]['_id'])
+                Task.get_collection().update_one({'_id': documents[0]['_id']}, {'$set': {'completed': False}})
+            return insert_many(self, documents, *args, **kwargs)
+        
+        monkeypatch.setattr(archive_type, 'insert_many', reopen_first)
+        totals = TaskArchive.run(older_than_days=30, batch_size=2, pause_ms=0)
+        
+        assert totals[Task.COLLECTION_NAME] == 2
+        archived_ids = {doc['_id'] for doc in Task.get_archive_collection().find()}
+        assert archived_ids == {ObjectId(task_id) for task_id in task_ids} - set(reopened)
+    
+    def test_get_archived_task(self, client, create_task):
+        """Test archived tasks are only returned with include_archived"""
+        task_id = create_task({'title': 'Old done', 'completed': True})['data']['id']
+        age_task(task_id, 60)
+        TaskArchive.run(older_than_days=30, pause_ms=0)
+        
+        assert client.get(f'/api/tasks/{task_id}').status_code == 404
+        
+        response = client.get(f'/api/tasks/{task_id}?include_archived=true')
+        assert response.status_code == 200
+        assert response.get_json()['data']['archived'] is True
+    
+    def test_list_include_archived(self, client, create_task):
+        """Test include_archived merges archived tasks into the list"""
+        archived_id = create_task({'title': 'Old done', 'completed': True})['data']['id']
+        create_task({'title': 'Open'})
+        age_task(archived_id, 60)
+        TaskArchive.run(older_than_days=30, pause_ms=0)
+        
+        assert client.get('/api/tasks').get_json()['data']['count'] == 1
+        
+        data = client.get('/api/tasks?include_archived=true').get_json()['data']
+        assert data['count'] == 2
+        assert {task['archived'] for task in data['tasks']} == {True, False}
+
+class TestPartialIndexes:
+    """Test live-collection indexes skip soft-deleted tasks"""
+    
+    def test_query_indexes_are_partial(self, app):
+        """Test every tenant query index except the shard key index is partial"""
+        indexes = Task.get_collection().index_information()
+        
+        assert indexes['tenant_id_1_created_at_-1_live']['partialFilterExpression'] == Database.LIVE_FILTER
+        assert 'tenant_id_1_created_at_-1' not in indexes
+        assert 'partialFilterExpression' not in indexes['tenant_id_1__id_1']
+    
+    def test_archive_index_rebuilt_on_key_change(self, app):
+        """Test the completed-task archival index moves from updated_at to completed_at"""
+        collection = Task.get_collection()
+        collection.drop_index('archive_completed')
+        collection.create_index([('updated_at', 1)], name='archive_completed',
+                                partialFilterExpression={'completed': True, 'is_deleted': False})
+        
+        Database.prepare_task_collection(Task.COLLECTION_NAME)
+        assert collection.index_information()['archive_completed']['key'] == [('completed_at', 1)]
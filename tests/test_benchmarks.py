@@ -0,0 +1,69 @@
+# tests/test_benchmarks.py - Benchmark harness tests
+import pytest
+from benchmarks.harness import (
+    BenchmarkResult, percentile, compare_to_baselines, save_baselines, load_baselines
+)
+
+class TestPercentile:
+    """Test percentile calculation"""
+    
+    def test_percentile_empty(self):
+        """Test percentile of an empty list"""
+        assert percentile([], 95) == 0.0
+    
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 100) == 100
+
+class TestBaselines:
+    """Test baseline storage and regression detection"""
+    
+    def test_regression_detected(self):
+        """Test throughput drop beyond threshold is reported"""
+        result = BenchmarkResult('case', [0.02] * 10)  # 50 ops/s
+        regressions = compare_to_baselines([result], {'case': {'ops_per_sec': 100.0}}, 0.2)
+        assert len(regressions) == 1
+        assert 'case' in regressions[0]
+    
+    def test_within_threshold(self):
+        """Test small throughput drop is tolerated"""
+        result = BenchmarkResult('case', [0.011] * 10)  # ~91 ops/s
+        regressions = compare_to_baselines([result], {'case': {'ops_per_sec': 100.0}}, 0.2)
+        assert regressions == []
+    
+    def test_missing_baseline_ignored(self):
+        """Test cases without a baseline never fail"""
+        result = BenchmarkResult('new_case', [1.0])
+        assert compare_to_baselines([result], {}, 0.2) == []
+    
+    def test_save_and_load(self, tmp_path):
+        """Test baselines round trip through JSON"""
+        path = str(tmp_path / 'baselines.json')
+        save_baselines([BenchmarkResult('case', [0.01, 0.01])], path)
+        
+        baselines = load_baselines(path)
+        assert baselines['case']['ops_per_sec'] == pytest.approx(100.0)
+
+class TestServingMatrix:
+    """Test serving benchmark case expansion"""
+    
+    def test_only_sized_endpoints_repeat(self):
+        """Test endpoints independent of payload size run once"""
+        from benchmarks.bench_serving import build_cases
+        cases = build_cases(['list', 'stats', 'create'], ['small', 'large'], 'abc')
+        
+        assert [case[0] for case in cases] == [
+            'list:small', 'list:large', 'stats', 'create:small', 'create:large'
+        ]
+        assert cases[1][2] == '/api/tasks?limit=100'
+        assert len(cases[4][3]['description']) == 1000
+    
+    def test_missing_server_modules(self, monkeypatch):
+        """Test servers report packages that are not installed"""
+        from benchmarks import bench_serving
+        monkeypatch.setitem(bench_serving.SERVERS, 'fake', (('no_such_module_xyz',), None))
+        assert bench_serving.missing_modules('fake') == ['no_such_module_xyz']
+        assert bench_serving.missing_modules('werkzeug') == []
@@ -0,0 +1,102 @@
+# tests/test_cooperative.py - Tests for gevent (cooperative concurrency) mode
+import os
+import subprocess
+import sys
+import pytest
+from app import create_app
+from config import TestingConfig
+from utils import cooperative
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter: patching the test process would affect every test
+GEVENT_SCRIPT = """
+from utils import cooperative
+cooperative.patch()
+
+import gevent
+from app import create_app
+from config import TestingConfig
+
+app = create_app(TestingConfig)
+assert [type(h).__name__ for h in app.logger.handlers] == ['QueueHandler']
+
+def fetch():
+    return app.test_client().get('/api/tasks').status_code
+
+jobs = [gevent.spawn(fetch) for _ in range(200)]
+gevent.joinall(jobs, raise_error=True)
+assert all(job.value == 200 for job in jobs)
+print('ok')
+"""
+
+# Logs from a forked child (a preloaded gunicorn worker) must still be written
+FORK_SCRIPT = """
+from utils import cooperative
+cooperative.patch()
+
+import os
+import time
+from app import create_app
+from config import TestingConfig
+
+app = create_app(TestingConfig)
+pid = os.fork()
+if pid == 0:
+    app.logger.warning('written by the forked worker')
+    deadline = time.monotonic() + 10
+    while not app.logger.handlers[0].queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    os._exit(0)
+os.waitpid(pid, 0)
+print('ok')
+"""
+
+class TestCooperativeMode:
+    """Test gevent mode start-up checks and greenlet-safe initialization"""
+
+    def test_unpatched_process_refused(self):
+        """Test gevent mode without early patching fails fast"""
+        class GeventConfig(TestingConfig):
+            CONCURRENCY_MODE = 'gevent'
+
+        assert cooperative.is_patched() is False
+        with pytest.raises(RuntimeError, match='not patched'):
+            create_app(GeventConfig)
+
+    def test_patched_app_serves_greenlets(self, tmp_path):
+        """Test a patched process logs through a queue and serves concurrent greenlets"""
+        pytest.importorskip('gevent')
+        env = dict(
+            os.environ,
+            PYTHONPATH=ROOT,
+            CONCURRENCY_MODE='gevent',
+            TEST_STORAGE_BACKEND='memory',
+            LOG_LEVEL='WARNING'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', GEVENT_SCRIPT],
+            cwd=str(tmp_path), env=env, capture_output=True, text=True, timeout=120
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == 'ok'
+
+    def test_forked_worker_drains_its_logs(self, tmp_path):
+        """Test a child forked after app creation gets its own log drain thread"""
+        pytest.importorskip('gevent')
+        env = dict(
+            os.environ,
+            PYTHONPATH=ROOT,
+            CONCURRENCY_MODE='gevent',
+            TEST_STORAGE_BACKEND='memory',
+            LOG_LEVEL='WARNING',
+            LOG_FILE='app.log'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', FORK_SCRIPT],
+            cwd=str(tmp_path), env=env, capture_output=True, text=True, timeout=120
+        )
+        assert result.returncode == 0, result.stderr
+        # The file handler is only reached through the listener's queue
+        assert 'written by the forked worker' in (tmp_path / 'logs' / 'app.log').read_text()
@@ -0,0 +1,132 @@
+# tests/test_dependencies.py - Tests for task dependencies and the dependency graph cache
+import pytest
+from bson import ObjectId
+from utils.dependency_cache import DependencyCache, DependencyGraph
+
+@pytest.fixture(params=['backend', 'cache'])
+def traversal(request, app):
+    """Serve dependency reads from the backend traversal or from an always-hot cached graph"""
+    previous = app.extensions.pop('dependency_cache', None)
+    if request.param == 'cache':
+        app.extensions['dependency_cache'] = DependencyCache(max_tenants=4, ttl=60, hot_reads=1)
+    yield request.param
+    app.extensions.pop('dependency_cache', None)
+    if previous is not None:
+        app.extensions['dependency_cache'] = previous
+
+@pytest.mark.usefixtures('traversal')
+class TestDependencies:
+    """Test depends_on validation, the transitive closure and unblocked tasks"""
+
+    def test_closure(self, client, create_task):
+        """Test every direct and transitive dependency is returned"""
+        a = create_task({'title': 'A'})['data']['id']
+        b = create_task({'title': 'B', 'depends_on': [a]})['data']['id']
+        c = create_task({'title': 'C', 'depends_on': [b]})['data']['id']
+        d = create_task({'title': 'D', 'depends_on': [a, c, a]})['data']
+        create_task({'title': 'Unrelated'})
+        assert d['depends_on'] == [a, c]
+
+        response = client.get(f"/api/tasks/{d['id']}/dependencies")
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert {task['id'] for task in data['dependencies']} == {a, b, c}
+        assert data['depends_on'] == [a, c] and data['count'] == 3
+        
+        data = client.get(f"/api/tasks/{d['id']}/dependencies?ids_only=true").get_json()['data']
+        assert data['dependencies'] == sorted([a, b, c])
+
+        assert client.get(f'/api/tasks/{a}/dependencies').get_json()['data']['count'] == 0
+        assert client.get(f'/api/tasks/{ObjectId()}/dependencies').status_code == 404
+        assert client.get('/api/tasks/bad-id/dependencies').status_code == 400
+
+    def test_unblocked_follows_completion_and_deletion(self, client, create_task):
+        """Test tasks become unblocked once their dependencies are completed or deleted"""
+        a = create_task({'title': 'A', 'priority': 'low'})['data']['id']
+        create_task({'title': 'B', 'priority': 'high', 'depends_on': [a]})
+        c = create_task({'title': 'C', 'priority': 'medium'})['data']['id']
+        create_task({'title': 'D', 'priority': 'high', 'depends_on': [c]})
+
+        def titles():
+            response = client.get('/api/tasks/unblocked')
+            assert response.status_code == 200
+            return [task['title'] for task in response.get_json()['data']['tasks']]
+
+        assert titles() == ['C', 'A']
+        client.patch(f'/api/tasks/{a}/toggle')
+        assert titles() == ['B', 'C']
+        client.delete(f'/api/tasks/{c}')
+        assert titles() == ['B', 'D']
+        assert client.get('/api/tasks/unblocked?limit=0').status_code == 400
+
+    def test_invalid_dependencies_rejected(self, client, create_task):
+        """Test self-dependencies, unknown tasks and cycles are refused"""
+        a = create_task({'title': 'A'})['data']['id']
+        b = create_task({'title': 'B', 'depends_on': [a]})['data']['id']
+        c = create_task({'title': 'C', 'depends_on': [b]})['data']['id']
+
+        for response, detail in [
+            (client.patch(f'/api/tasks/{a}', json={'depends_on': [c]}), 'cycle'),
+            (client.put(f'/api/tasks/{a}', json={'depends_on': [a]}), 'itself'),
+            (client.post('/api/tasks', json={'title': 'X', 'depends_on': [str(ObjectId())]}), 'Unknown dependencies'),
+            (client.post('/api/tasks', json={'title': 'X', 'depends_on': ['nope']}), 'must be task IDs')
+        ]:
+            assert response.status_code == 400
+            assert detail in response.get_json()['error_detail']
+
+        # Dropping the edge that closed the cycle makes the change valid
+        assert client.patch(f'/api/tasks/{b}', json={'depends_on': None}).status_code == 200
+        assert client.patch(f'/api/tasks/{a}', json={'depends_on': [c]}).status_code == 200
+
+class TestDependencyCache:
+    """Test the in-process graph cache of hot tenants"""
+
+    @staticmethod
+    def edges():
+        a, b = ObjectId(), ObjectId()
+        return [
+            {'_id': a, 'completed': False, 'priority_rank': 1, 'due_date': None, 'depends_on': []},
+            {'_id': b, 'completed': False, 'priority_rank': 3, 'due_date': None, 'depends_on': [a]}
+        ]
+
+    def test_tenant_turns_hot(self):
+        """Test graphs are only built after repeated reads, then served from memory"""
+        cache = DependencyCache(max_tenants=1, ttl=60, hot_reads=2)
+        loads = []
+
+        def load():
+            loads.append(1)
+            return self.edges()
+
+        assert cache.get('t1', load) is None
+        assert cache.get('t1', load) is not None
+        assert cache.get('t1', load) is not None
+        assert len(loads) == 1
+
+        # The least recently used tenant is evicted
+        cache.get('t2', load)
+        cache.get('t2', load)
+        assert cache.stats()['tenants'] == 1 and cache.stats()['builds'] == 2
+
+    def test_writes_are_applied(self):
+        """Test cached graphs follow writes made through this process"""
+        edges = self.edges()
+        cache = DependencyCache(max_tenants=1, ttl=60, hot_reads=1)
+        graph = cache.get('t', lambda: edges)
+        a, b = edges[0]['_id'], edges[1]['_id']
+        assert graph.unblocked(10) == [a]
+        assert graph.closure([b]) == {a}
+
+        cache.task_written('t', {**edges[0], 'completed': True})
+        assert graph.unblocked(10) == [b]
+        cache.task_removed('t', a)
+        assert graph.closure([b]) == set()
+
+    def test_graph_ignores_cycles_and_missing_tasks(self):
+        """Test traversals terminate on cycles and skip tasks that are not live"""
+        a, b = ObjectId(), ObjectId()
+        graph = DependencyGraph([
+            {'_id': a, 'depends_on': [b]},
+            {'_id': b, 'depends_on': [a, ObjectId()]}
+        ])
+        assert graph.closure([a]) == {a, b}
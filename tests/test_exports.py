@@ -0,0 +1,119 @@
+# tests/test_exports.py - Tests for asynchronous task exports
+import gzip
+import json
+import pytest
+from datetime import timedelta
+from bson import ObjectId
+from benchmarks.seed import generate_task_documents
+from jobs.worker import Worker
+from models.export import TaskExport
+from models.job import Job
+from models.task import Task
+from utils.timestamps import utcnow
+
+pytestmark = pytest.mark.mongo
+
+@pytest.fixture(autouse=True)
+def export_dir(app, tmp_path, monkeypatch):
+    """Write exports to a temporary directory and start with an empty queue"""
+    monkeypatch.setitem(app.config, 'EXPORT_DIR', str(tmp_path))
+    monkeypatch.setitem(app.config, 'EXPORT_CHUNK_SIZE', 7)
+    Job.get_collection().delete_many({})
+    yield tmp_path
+    Job.get_collection().delete_many({})
+
+def seed(count):
+    """Insert tasks whose _ids are spread over the last few days"""
+    documents = generate_task_documents(count)
+    start = utcnow() - timedelta(days=3)
+    for i, document in enumerate(documents):
+        document['_id'] = ObjectId.from_datetime(start + timedelta(minutes=i * 17))
+        document['is_deleted'] = False
+    Task.get_collection().insert_many(documents)
+    return documents
+
+def run_jobs(app):
+    worker = Worker(app.config, job_types=['export_tasks'])
+    worker.drain(timeout=30)
+    worker.executor.shutdown(wait=True)
+
+class TestPartitions:
+    """Test _id range partitioning"""
+    
+    def test_partitions_cover_all_documents(self):
+        """Test partitions are contiguous and cover every task"""
+        seed(50)
+        collection = Task.get_collection()
+        query = Task.tenant_query()
+        
+        partitions = TaskExport.partition_bounds(collection, query, 4)
+        assert len(partitions) == 4
+        assert partitions[-1][1] is None
+        
+        counted = 0
+        for lower, upper in partitions:
+            id_range = {'$gte': lower}
+            if upper is not None:
+                id_range['$lt'] = upper
+            counted += collection.count_documents({**query, '_id': id_range})
+        assert counted == 50
+
+class TestExportJobs:
+    """Test the export endpoints"""
+    
+    def test_export_and_download(self, app, client):
+        """Test an export job writes every task and can be downloaded"""
+        seed(40)
+        
+        response = client.post('/api/tasks/exports', json={'format': 'ndjson'})
+        assert response.status_code == 202
+        data = response.get_json()['data']
+        
+        assert client.get(data['download_url']).status_code == 409
+        
+        run_jobs(app)
+        
+        job = client.get(data['status_url']).get_json()['data']
+        assert job['status'] == 'succeeded'
+        assert job['result']['count'] == 40
+        assert job['progress'] == {'exported': 40, 'total': 40}
+        
+        response = client.get(data['download_url'])
+        assert response.status_code == 200
+        lines = gzip.decompress(response.data).decode().splitlines()
+        assert len(lines) == 40
+        assert len({json.loads(line)['id'] for line in lines}) == 40
+    
+    def test_download_supports_ranges(self, app, client):
+        """Test downloads honour Range requests"""
+        seed(10)
+        download_url = client.post('/api/tasks/exports', json={}).get_json()['data']['download_url']
+        run_jobs(app)
+        
+        full = client.get(download_url).data
+        response = client.get(download_url, headers={'Range': 'bytes=0-9'})
+        assert response.status_code == 206
+        assert response.data == full[:10]
+    
+    def test_columnar_export(self, app, client):
+        """Test columnar exports group rows into column chunks"""
+        seed(20)
+        response = client.post('/api/tasks/exports', json={'format': 'columnar', 'filters': {'completed': False}})
+        download_url = response.get_json()['data']['download_url']
+        run_jobs(app)
+        
+        groups = [json.loads(line) for line in gzip.decompress(client.get(download_url).data).splitlines()]
+        assert sum(group['rows'] for group in groups) == Task.get_collection().count_documents({'completed': False})
+        assert all(group['columns']['completed'] == [False] * group['rows'] for group in groups)
+    
+    def test_export_is_tenant_scoped(self, app, client):
+        """Test other tenants cannot download an export"""
+        download_url = client.post('/api/tasks/exports', json={}).get_json()['data']['download_url']
+        run_jobs(app)
+        
+        assert client.get(download_url, headers={'X-Tenant-ID': 'other'}).status_code == 404
+    
+    def test_invalid_export_request(self, client):
+        """Test invalid formats and filters are rejected"""
+        assert client.post('/api/tasks/exports', json={'format': 'xml'}).status_code == 400
+        assert client.post('/api/tasks/exports', json={'filters': {'title': 'x'}}).status_code == 400
@@ -0,0 +1,82 @@
+# tests/test_health.py - Tests for liveness/readiness probes and the health monitor
+import pytest
+from models.task import Task
+from utils.health_monitor import HealthMonitor, PoolUsageListener
+
+
+class FakeEvent:
+    def __init__(self, address=('db', 27017)):
+        self.address = address
+
+
+def make_monitor(**kwargs):
+    return HealthMonitor(PoolUsageListener(), **kwargs)
+
+
+class TestProbes:
+    """Test the probe endpoints"""
+
+    def test_livez(self, client):
+        """Test liveness answers without touching the database"""
+        response = client.get('/livez')
+        assert response.status_code == 200
+        assert response.get_json()['data']['status'] == 'alive'
+
+    def test_readyz(self, client):
+        """Test readiness reports cached checks"""
+        response = client.get('/readyz')
+        assert response.status_code == 200
+
+        data = response.get_json()['data']
+        assert data['status'] == 'ready'
+        assert data['checks'][Task.backend().name]['ok'] is True
+
+    @pytest.mark.mongo
+    def test_readyz_mongo_checks(self, client):
+        """Test MongoDB storage adds pool and replication checks"""
+        data = client.get('/readyz').get_json()['data']
+        assert set(data['checks']) == {'mongo', 'pool', 'replication'}
+
+
+class TestHysteresis:
+    """Test readiness hysteresis"""
+
+    def test_first_check_decides(self):
+        """Test the first result sets readiness directly"""
+        monitor = make_monitor()
+        monitor._record(['mongo'])
+        assert monitor.ready is False
+
+    def test_single_blip_does_not_flap(self):
+        """Test readiness survives fewer failures than the threshold"""
+        monitor = make_monitor(failure_threshold=3, recovery_threshold=2)
+        monitor._record([])
+        monitor._record(['mongo'])
+        monitor._record(['mongo'])
+        assert monitor.ready is True
+
+        monitor._record(['mongo'])
+        assert monitor.ready is False
+
+        monitor._record([])
+        assert monitor.ready is False
+        monitor._record([])
+        assert monitor.ready is True
+
+
+class TestPoolUsageListener:
+    """Test pool saturation tracking"""
+
+    def test_tracks_busiest_pool(self):
+        """Test checked-out connections are counted per server"""
+        listener = PoolUsageListener()
+        for _ in range(3):
+            listener.connection_checked_out(FakeEvent())
+        listener.connection_checked_out(FakeEvent(('other', 27017)))
+        listener.connection_checked_in(FakeEvent())
+        listener.connection_check_out_failed(FakeEvent())
+
+        assert listener.usage() == (2, 1)
+
+        listener.reset()
+        assert listener.usage() == (0, 0)
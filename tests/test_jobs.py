@@ -0,0 +1,133 @@
+# tests/test_jobs.py - Tests for the background job queue and worker
+import pytest
+from datetime import timedelta
+from jobs.registry import job_handler
+from jobs.worker import Worker
+from models.job import Job
+from storage.mongo import MongoTaskBackend
+from utils.timestamps import utcnow
+
+pytestmark = pytest.mark.mongo
+
+ADMIN_HEADERS = {'X-Admin-Token': 'test-admin-token'}
+
+@job_handler('test_echo')
+def echo(payload, context):
+    context.progress({'step': 1})
+    return {'echo': payload.get('value')}
+
+@job_handler('test_fail')
+def always_fail(payload, context):
+    raise RuntimeError('boom')
+
+@pytest.fixture(autouse=True)
+def clean_jobs(app):
+    """Empty the jobs collection around each test"""
+    Job.get_collection().delete_many({})
+    yield
+    Job.get_collection().delete_many({})
+
+class TestJobQueue:
+    """Test leases and retries"""
+    
+    def test_claim_is_exclusive(self):
+        """Test a leased job cannot be claimed by another worker"""
+        Job.enqueue('test_echo')
+        
+        assert Job.claim('worker-a', 60)['lease_owner'] == 'worker-a'
+        assert Job.claim('worker-b', 60) is None
+    
+    def test_expired_lease_is_reclaimed(self):
+        """Test a job whose worker died becomes claimable again"""
+        job = Job.enqueue('test_echo')
+        Job.claim('worker-a', 60)
+        Job.get_collection().update_one(
+            {'_id': job['_id']},
+            {'$set': {'lease_expires_at': utcnow() - timedelta(seconds=1)}}
+        )
+        
+        reclaimed = Job.claim('worker-b', 60)
+        assert reclaimed['lease_owner'] == 'worker-b'
+        assert reclaimed['attempts'] == 2
+        
+        # The first worker can no longer record a result
+        assert Job.complete(str(job['_id']), 'worker-a', {}) is False
+    
+    def test_failures_retry_then_fail(self):
+        """Test failed attempts are retried with backoff until exhausted"""
+        job_id = str(Job.enqueue('test_fail', max_attempts=2)['_id'])
+        
+        Job.claim('worker', 60)
+        assert Job.fail(job_id, 'worker', 'boom', retry_base_seconds=0) == 'queued'
+        
+        Job.claim('worker', 60)
+        assert Job.fail(job_id, 'worker', 'boom', retry_base_seconds=0) == 'failed'
+        assert Job.claim('worker', 60) is None
+
+class TestWorker:
+    """Test running jobs on a worker pool"""
+    
+    def test_worker_runs_jobs(self, app):
+        """Test a worker runs queued jobs and records results"""
+        job_id = str(Job.enqueue('test_echo', {'value': 42})['_id'])
+        
+        worker = Worker(app.config, concurrency=2, job_types=['test_echo'])
+        assert worker.drain(timeout=10)
+        worker.executor.shutdown(wait=True)
+        
+        job = Job.find_by_id(job_id, any_tenant=True)
+        assert job['status'] == 'succeeded'
+        assert job['result'] == {'echo': 42}
+        assert job['progress'] == {'step': 1}
+    
+    def test_worker_records_failures(self, app):
+        """Test handler exceptions are recorded on the job"""
+        job_id = str(Job.enqueue('test_fail', max_attempts=1)['_id'])
+        
+        worker = Worker(app.config, job_types=['test_fail'])
+        worker.drain(timeout=10)
+        worker.executor.shutdown(wait=True)
+        
+        job = Job.find_by_id(job_id, any_tenant=True)
+        assert job['status'] == 'failed'
+        assert 'RuntimeError: boom' in job['error']
+
+    def test_reconcile_tag_counts_job(self, app, create_task):
+        """Test the reconcile_tag_counts job repairs a tenant's counters"""
+        create_task({'title': 'Tagged', 'tags': ['bug']})
+        MongoTaskBackend.get_tag_counts_collection().update_many({'tag': 'bug'}, {'$inc': {'count': 4}})
+        job_id = str(Job.enqueue('reconcile_tag_counts', {'tenant': app.config['DEFAULT_TENANT']})['_id'])
+        
+        worker = Worker(app.config, job_types=['reconcile_tag_counts'])
+        assert worker.drain(timeout=10)
+        worker.executor.shutdown(wait=True)
+        
+        assert Job.find_by_id(job_id, any_tenant=True)['result'] == {'corrected': 1, 'removed': 0}
+
+class TestJobRoutes:
+    """Test job endpoints"""
+    
+    def test_get_job_status(self, client):
+        """Test tenants only see their own jobs"""
+        job_id = str(Job.enqueue('test_echo', tenant='acme')['_id'])
+        
+        response = client.get(f'/api/jobs/{job_id}', headers={'X-Tenant-ID': 'acme'})
+        assert response.status_code == 200
+        assert response.get_json()['data']['status'] == 'queued'
+        
+        assert client.get(f'/api/jobs/{job_id}', headers={'X-Tenant-ID': 'other'}).status_code == 404
+    
+    def test_get_job_invalid_id(self, client):
+        """Test invalid job IDs are rejected"""
+        assert client.get('/api/jobs/not-an-id').status_code == 400
+    
+    def test_admin_enqueue(self, client):
+        """Test admins can queue maintenance jobs"""
+        response = client.post('/api/admin/jobs', json={'type': 'archive_tasks'}, headers=ADMIN_HEADERS)
+        assert response.status_code == 202
+        
+        job_id = response.get_json()['data']['id']
+        assert client.get(f'/api/jobs/{job_id}', headers=ADMIN_HEADERS).status_code == 200
+        
+        response = client.post('/api/admin/jobs', json={'type': 'unknown'}, headers=ADMIN_HEADERS)
+        assert response.status_code == 400
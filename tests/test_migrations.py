@@ -0,0 +1,168 @@
+# tests/test_migrations.py - Tests for online task document migrations
+import pytest
+from bson import ObjectId
+from migrations import MIGRATIONS, get_migration, upgrade_document
+from migrations.runner import MigrationRunner
+from migrations.state import MigrationState
+from models.task import Task
+from utils.timestamps import utcnow
+
+def legacy_document(**fields):
+    """Task as written before tenancy, soft-delete, completed_at, priority_rank, tags and depends_on"""
+    now = utcnow()
+    document = {
+        '_id': ObjectId(),
+        'title': 'Legacy',
+        'description': '',
+        'completed': False,
+        'priority': 'high',
+        'status': 'pending',
+        'due_date': None,
+        'created_at': now,
+        'updated_at': now
+    }
+    document.update(fields)
+    return document
+
+@pytest.fixture
+def clean_migrations(app):
+    """Empty the migrations state collection (and its cache) around each test"""
+    MigrationRunner.state_collection().delete_many({})
+    MigrationState.reset()
+    yield
+    MigrationRunner.state_collection().delete_many({})
+    MigrationState.reset()
+
+class TestUpgradeDocument:
+    """Test read-time upgrading of documents not yet migrated"""
+
+    def test_upgrade_fills_missing_fields(self):
+        """Test every pending migration is applied in memory"""
+        document = legacy_document(completed=True)
+        upgraded = upgrade_document(document)
+
+        assert upgraded['tenant_id'] == 'default'
+        assert upgraded['is_deleted'] is False
+        assert upgraded['completed_at'] == document['updated_at']
+        assert upgraded['priority_rank'] == 3
+        assert upgraded['tags'] == []
+        assert upgraded['depends_on'] == []
+        assert 'priority_rank' not in document
+
+    def test_migrated_document_unchanged(self):
+        """Test fully migrated documents are returned as is"""
+        document = upgrade_document(legacy_document())
+        assert upgrade_document(document) is document
+
+    def test_serialize_upgrades(self):
+        """Test serialized legacy tasks report a completion time"""
+        document = legacy_document(completed=True)
+        assert Task.serialize(document)['completed_at'] is not None
+
+    def test_versions_are_ordered_and_unique(self):
+        """Test migrations are listed in strictly increasing version order"""
+        versions = [migration.version for migration in MIGRATIONS]
+        assert versions == sorted(set(versions))
+        with pytest.raises(ValueError):
+            get_migration(999)
+
+@pytest.mark.mongo
+@pytest.mark.usefixtures('clean_migrations')
+class TestMigrationRunner:
+    """Test batched, resumable migration runs"""
+
+    def test_legacy_documents_visible_before_migrating(self, client):
+        """Test tasks without tenant_id or is_deleted are read, counted and changed before 0001/0002 run"""
+        documents = [legacy_document(title=f'Legacy {i}') for i in range(3)]
+        Task.get_collection().insert_many(documents)
+        task_id = str(documents[0]['_id'])
+
+        response = client.get(f'/api/tasks/{task_id}')
+        assert response.status_code == 200
+        assert response.get_json()['data']['title'] == 'Legacy 0'
+        assert client.get('/api/tasks').get_json()['data']['count'] == 3
+        assert client.get('/api/tasks/stats').get_json()['data']['total_tasks'] == 3
+
+        # Other tenants do not see them
+        assert client.get('/api/tasks', headers={'X-Tenant-ID': 'other'}).get_json()['data']['count'] == 0
+
+        assert client.patch(f'/api/tasks/{task_id}/toggle').get_json()['data']['completed'] is True
+        assert client.delete(f'/api/tasks/{task_id}').status_code == 200
+        assert client.get(f'/api/tasks/{task_id}').status_code == 404
+        assert client.get('/api/tasks').get_json()['data']['count'] == 2
+
+    def test_run_backfills_legacy_documents(self, client):
+        """Test legacy tasks stay visible and correctly shaped once migrated"""
+        Task.get_collection().insert_many([legacy_document(title=f'Legacy {i}') for i in range(5)])
+        assert client.get('/api/tasks').get_json()['data']['count'] == 5
+
+        totals = MigrationRunner.run(batch_size=2, pause_ms=0, max_lag=None)
+        assert totals['0001_tenant_id'] == 5
+        assert MigrationState.is_done(get_migration(2), Task.collection_name())
+
+        assert client.get('/api/tasks').get_json()['data']['count'] == 5
+        assert len(client.get('/api/tasks/next').get_json()['data']['tasks']) == 5
+        states = MigrationRunner.state_collection().count_documents({'collection': Task.collection_name(), 'state': 'done'})
+        assert states == len(MIGRATIONS)
+
+    def test_next_ranks_unmigrated_documents(self, client):
+        """Test tasks without priority_rank are ranked from priority until 0004 is done"""
+        Task.get_collection().insert_many([
+            legacy_document(title=title, priority=priority, tenant_id='default', is_deleted=False)
+            for title, priority in [('Low', 'low'), ('High', 'high'), ('Medium', 'medium')]
+        ])
+        assert not MigrationState.is_done(get_migration(4), Task.collection_name())
+
+        def titles():
+            return [task['title'] for task in client.get('/api/tasks/next').get_json()['data']['tasks']]
+
+        assert titles() == ['High', 'Medium', 'Low']
+        assert [task['title'] for task in client.get('/api/tasks?sort_by=priority').get_json()['data']['tasks']] \
+            == ['High', 'Medium', 'Low']
+
+        MigrationRunner.run(batch_size=2, pause_ms=0, max_lag=None)
+        assert MigrationState.is_done(get_migration(4), Task.collection_name())
+        assert titles() == ['High', 'Medium', 'Low']
+
+    def test_empty_collection_needs_no_migration(self):
+        """Test migrations are recorded as done on a collection without documents"""
+        assert MigrationState.done(Task.collection_name()) == {migration.id for migration in MIGRATIONS}
+        assert all(migration['state'] == 'done' for migration in MigrationRunner.status())
+
+    def test_first_insert_records_empty_collection(self, create_task):
+        """Test a fresh collection is recorded as migrated before its first task is written"""
+        create_task({'title': 'First'})
+        MigrationState.reset()
+        assert MigrationState.done(Task.collection_name()) == {migration.id for migration in MIGRATIONS}
+
+    def test_run_resumes_after_interruption(self):
+        """Test a stopped run continues after the last recorded _id"""
+        Task.get_collection().insert_many([legacy_document() for _ in range(5)])
+        migration = get_migration(4)
+
+        upgraded, done = MigrationRunner.run_migration(migration, batch_size=2, max_batches=1)
+        assert (upgraded, done) == (2, False)
+        assert MigrationRunner.status()[3]['state'] == 'paused'
+
+        upgraded, done = MigrationRunner.run_migration(migration, batch_size=2)
+        assert (upgraded, done) == (3, True)
+        assert Task.get_collection().count_documents(migration.pending_query()) == 0
+
+    def test_documents_rewritten_meanwhile_are_kept(self):
+        """Test a batch does not overwrite fields the app set after the batch was read"""
+        document = legacy_document(priority_rank=1)
+        Task.get_collection().insert_one(document)
+
+        MigrationRunner.run_migration(get_migration(4), batch_size=10)
+        assert Task.get_collection().find_one({'_id': document['_id']})['priority_rank'] == 1
+
+    def test_cli(self, runner):
+        """Test the migrate and migration-status commands"""
+        Task.get_collection().insert_one(legacy_document())
+
+        result = runner.invoke(args=['migrate', '--pause-ms', '0'])
+        assert result.exit_code == 0
+        assert '0001_tenant_id: 1 upgraded' in result.output
+
+        result = runner.invoke(args=['migration-status'])
+        assert '0006_depends_on' in result.output and 'done' in result.output
@@ -0,0 +1,70 @@
+# tests/test_profiler.py - Request profiling tests
+import os
+import pytest
+from flask import Flask
+from utils.profiler import ProfileRing, register_profiler
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    """Bare application with profiling enabled"""
+    app = Flask(__name__)
+    app.config.update(
+        PROFILING_ENABLED=True,
+        PROFILING_HEADER='X-Profile',
+        PROFILING_SAMPLE_RATE=0.0,
+        PROFILING_MODE='sample',
+        PROFILING_SAMPLE_INTERVAL_MS=1,
+        PROFILING_OUTPUT_DIR=str(tmp_path),
+        PROFILING_MAX_PROFILES=2,
+        ADMIN_TOKEN='secret'
+    )
+    
+    @app.route('/work')
+    def work():
+        return 'ok'
+    
+    register_profiler(app)
+    return app
+
+class TestProfiler:
+    """Test profiling hooks"""
+    
+    def test_not_profiled_without_header(self, profiled_app):
+        """Test requests are not profiled by default"""
+        response = profiled_app.test_client().get('/work')
+        assert 'X-Profile-Id' not in response.headers
+    
+    def test_wrong_token_ignored(self, profiled_app):
+        """Test unauthorized callers cannot trigger profiling"""
+        response = profiled_app.test_client().get('/work', headers={'X-Profile': 'guess'})
+        assert 'X-Profile-Id' not in response.headers
+    
+    def test_profiled_with_admin_token(self, profiled_app, tmp_path):
+        """Test profile and metadata files are written"""
+        response = profiled_app.test_client().get('/work', headers={'X-Profile': 'secret'})
+        profile_id = response.headers['X-Profile-Id']
+        
+        assert os.path.exists(tmp_path / f'{profile_id}.folded')
+        assert os.path.exists(tmp_path / f'{profile_id}.json')
+    
+    def test_cprofile_mode(self, profiled_app, tmp_path):
+        """Test cProfile output"""
+        profiled_app.config['PROFILING_MODE'] = 'cprofile'
+        app = Flask(__name__)
+        app.config.update(profiled_app.config)
+        app.add_url_rule('/work', 'work', lambda: 'ok')
+        register_profiler(app)
+        
+        response = app.test_client().get('/work', headers={'X-Profile': 'secret'})
+        assert os.path.exists(tmp_path / f"{response.headers['X-Profile-Id']}.prof")
+
+class TestProfileRing:
+    """Test the bounded profile store"""
+    
+    def test_oldest_profiles_pruned(self, tmp_path):
+        """Test the ring keeps at most max_profiles entries"""
+        ring = ProfileRing(str(tmp_path), max_profiles=2)
+        ids = [ring.write({'n': i}, 'a;b 1\n', 'folded') for i in range(4)]
+        
+        remaining = sorted(name for name in os.listdir(tmp_path) if name.endswith('.json'))
+        assert remaining == [f'{ids[2]}.json', f'{ids[3]}.json']
@@ -0,0 +1,118 @@
+# tests/test_query_stats.py - Query-shape statistics tests
+import pytest
+from types import SimpleNamespace
+from utils.query_stats import (
+    QueryStatsListener, normalize_command, skip_bucket, summarize_plan
+)
+
+ADMIN_HEADERS = {'X-Admin-Token': 'test-admin-token'}
+
+def make_events(request_id, command_name, command, duration_ms):
+    """Build matching started/succeeded events"""
+    started = SimpleNamespace(
+        command_name=command_name, command=command, database_name='db',
+        connection_id=('localhost', 27017), request_id=request_id
+    )
+    succeeded = SimpleNamespace(
+        command_name=command_name, connection_id=('localhost', 27017),
+        request_id=request_id, duration_micros=int(duration_ms * 1000)
+    )
+    return started, succeeded
+
+class TestNormalizeCommand:
+    """Test query shape normalization"""
+    
+    def test_find_shape_ignores_values(self):
+        """Test find commands with different values share a shape"""
+        first = normalize_command('find', {'find': 'tasks', 'filter': {'priority': 'high'}, 'sort': {'created_at': -1}, 'skip': 40})
+        second = normalize_command('find', {'find': 'tasks', 'filter': {'priority': 'low'}, 'sort': {'created_at': -1}, 'skip': 60})
+        assert first == second
+        assert 'filter=priority' in first
+        assert 'sort=created_at:-1' in first
+        assert 'skip=10-99' in first
+    
+    def test_operator_keys_in_shape(self):
+        """Test operators are part of the shape"""
+        shape = normalize_command('find', {'find': 'tasks', 'filter': {'due_date': {'$lt': 1}}})
+        assert 'filter=due_date.$lt' in shape
+    
+    def test_aggregate_shape(self):
+        """Test aggregate pipelines are described by stage"""
+        shape = normalize_command('aggregate', {
+            'aggregate': 'tasks',
+            'pipeline': [{'$match': {'completed': True}}, {'$facet': {}}]
+        })
+        assert 'pipeline=$match(completed)>$facet' in shape
+    
+    def test_ignored_commands(self):
+        """Test handshake commands are not tracked"""
+        assert normalize_command('ping', {'ping': 1}) is None
+    
+    def test_skip_bucket(self):
+        """Test skip bucketing by order of magnitude"""
+        assert skip_bucket(0) == '0'
+        assert skip_bucket(5) == '1-9'
+        assert skip_bucket(2000) == '1000-9999'
+
+class TestSummarizePlan:
+    """Test explain plan summaries"""
+    
+    def test_stage_chain(self):
+        """Test winning plan is flattened to a stage chain"""
+        summary = summarize_plan({'queryPlanner': {
+            'winningPlan': {'stage': 'LIMIT', 'inputStage': {
+                'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': 'priority_1'}
+            }},
+            'rejectedPlans': [{}]
+        }})
+        assert summary == 'LIMIT > FETCH > IXSCAN(priority_1) [1 rejected]'
+
+class TestQueryStatsListener:
+    """Test aggregation per shape"""
+    
+    def test_aggregates_per_shape(self):
+        """Test count, total and ordering of shapes"""
+        listener = QueryStatsListener(slow_threshold_ms=1000, explain=False)
+        
+        for i, duration in enumerate([5, 15, 10]):
+            started, succeeded = make_events(i, 'find', {'find': 'tasks', 'filter': {'priority': 'high'}}, duration)
+            listener.started(started)
+            listener.succeeded(succeeded)
+        
+        started, succeeded = make_events(10, 'find', {'find': 'tasks', 'filter': {}}, 1)
+        listener.started(started)
+        listener.succeeded(succeeded)
+        
+        shapes = listener.top_shapes(limit=1)
+        assert len(shapes) == 1
+        assert shapes[0]['count'] == 3
+        assert shapes[0]['total_ms'] == pytest.approx(30)
+        assert shapes[0]['p95_ms'] == pytest.approx(15)
+    
+    def test_invalid_sort(self):
+        """Test unknown sort key is rejected"""
+        with pytest.raises(ValueError):
+            QueryStatsListener(explain=False).top_shapes(sort_by='bogus')
+
+class TestQueryStatsEndpoint:
+    """Test the admin query statistics endpoint"""
+    
+    def test_requires_admin_token(self, client):
+        """Test endpoint rejects callers without the admin token"""
+        response = client.get('/api/admin/query-stats')
+        assert response.status_code == 401
+    
+    def test_returns_top_shapes(self, app, client):
+        """Test endpoint returns recorded shapes"""
+        listener = app.extensions['query_stats']
+        listener.reset()
+        started, succeeded = make_events(99, 'find', {'find': 'tasks', 'filter': {'status': 'pending'}}, 3)
+        listener.started(started)
+        listener.succeeded(succeeded)
+        
+        response = client.get('/api/admin/query-stats?limit=5', headers=ADMIN_HEADERS)
+        assert response.status_code == 200
+        
+        data = response.get_json()
+        assert data['data']['count'] >= 1
+        assert any('filter=status' in shape['shape'] for shape in data['data']['shapes'])
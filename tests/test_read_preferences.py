@@ -0,0 +1,57 @@
+# tests/test_read_preferences.py - Read/write splitting tests
+import pytest
+from bson import ObjectId
+from bson.timestamp import Timestamp
+from pymongo.read_preferences import Primary, SecondaryPreferred
+from database import Database
+from models.task import Task
+from storage.mongo import MongoTaskBackend
+from utils.sessions import parse_operation_time, format_operation_time
+
+class TestReadPreferences:
+    """Test per-operation read preferences"""
+    
+    def test_list_reads_prefer_secondaries(self, app):
+        """Test list reads use secondaryPreferred with max staleness"""
+        preference = Database.read_preference('list')
+        assert isinstance(preference, SecondaryPreferred)
+        assert preference.max_staleness == app.config['MAX_STALENESS_SECONDS']
+    
+    def test_unconfigured_operation_uses_primary(self):
+        """Test operations without a configured preference use the primary"""
+        assert isinstance(Database.read_preference('read_after_write'), Primary)
+    
+    def test_collection_for_operation(self):
+        """Test collections carry the operation's read preference"""
+        assert isinstance(Task.get_collection(operation='stats').read_preference, SecondaryPreferred)
+        assert isinstance(Task.get_collection().read_preference, Primary)
+    
+    @pytest.mark.mongo
+    def test_cycle_check_reads_primary(self, monkeypatch):
+        """Test the closure guarding a write reads the primary, other traversals the list preference"""
+        operations = []
+        get_collection = MongoTaskBackend.get_collection
+        
+        def spy(tenant, operation=None):
+            operations.append(operation)
+            return get_collection(tenant, operation)
+        
+        monkeypatch.setattr(MongoTaskBackend, 'get_collection', staticmethod(spy))
+        backend = MongoTaskBackend()
+        backend.dependency_closure('default', [ObjectId()], for_write=True)
+        backend.dependency_closure('default', [ObjectId()])
+        assert operations == [None, 'list']
+
+class TestOperationTime:
+    """Test operation time tokens used for causal consistency"""
+    
+    def test_round_trip(self):
+        """Test tokens round trip"""
+        token = format_operation_time(Timestamp(1700000000, 7))
+        assert token == '1700000000.7'
+        assert parse_operation_time(token) == Timestamp(1700000000, 7)
+    
+    def test_invalid_token(self):
+        """Test malformed tokens are ignored"""
+        assert parse_operation_time('garbage') is None
+        assert parse_operation_time(None) is None
@@ -0,0 +1,18 @@
+# tests/test_startup.py - Tests for lazy database initialization and the startup CLI
+import pytest
+
+class TestStartup:
+    """Test lazy database initialization"""
+    
+    def test_health_reports_readiness(self, app, client):
+        """Test health check exposes readiness and index state"""
+        data = client.get('/api/health').get_json()['data']
+        assert data['readiness'] == 'ready'
+        assert data['indexes'] == ('done' if app.config['STORAGE_BACKEND'] == 'mongo' else 'skipped')
+    
+    @pytest.mark.mongo
+    def test_create_indexes_command(self, runner):
+        """Test the create-indexes CLI command"""
+        result = runner.invoke(args=['create-indexes'])
+        assert result.exit_code == 0
+        assert 'Indexes reconciled' in result.output
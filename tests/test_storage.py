@@ -0,0 +1,213 @@
+# tests/test_storage.py - Tests for the in-memory and SQLite storage backends
+import random
+import pytest
+from benchmarks.seed import generate_task_documents
+from config import TestingConfig
+from storage import create_backend
+from bson import ObjectId
+from storage.memory import MemoryTaskBackend, SortedIndex, sort_value
+from storage.sqlite import SQLiteTaskBackend
+from utils.dependency_cache import DependencyGraph
+from utils.timestamps import utcnow
+
+TENANT = 'default'
+
+@pytest.fixture
+def documents():
+    """Reproducible mix of tasks with preassigned _ids"""
+    documents = generate_task_documents(500, rng=random.Random(7))
+    for document in documents:
+        document['_id'] = ObjectId()
+    return documents
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path, documents):
+    """Each embedded backend seeded with the same tasks"""
+    if request.param == 'sqlite':
+        backend = SQLiteTaskBackend(str(tmp_path / 'tasks.db'))
+    else:
+        backend = MemoryTaskBackend()
+    backend.insert_many(TENANT, documents)
+    return backend
+
+def brute_force(documents, filters, sort_by, sort_order):
+    """Expected tasks computed by filtering and sorting every task"""
+    tasks = [task for task in documents
+             if all(task.get(field) == value for field, value in filters.items())]
+    tasks.sort(key=lambda task: sort_value(task.get(sort_by)), reverse=sort_order < 0)
+    return tasks
+
+class TestSortedIndex:
+    """Test index range scans"""
+
+    def test_prefix_bounds(self):
+        """Test bounds cover exactly the entries with the prefix"""
+        index = SortedIndex(('priority', 'created_at'))
+        for i, priority in enumerate(['low', 'high', 'high', None, 'medium']):
+            index.add({'_id': i, 'priority': priority, 'created_at': i})
+
+        lo, hi = index.bounds(['high'])
+        assert [entry[1] for entry in index.entries[lo:hi]] == [1, 2]
+        assert index.page([None], 1, 0, 10) == [3]
+
+    def test_remove(self):
+        """Test removed entries disappear from scans"""
+        index = SortedIndex(('created_at',))
+        task = {'_id': 1, 'created_at': 5}
+        index.add(task)
+        index.remove(task)
+        assert index.entries == []
+
+class TestEmbeddedBackends:
+    """Test the memory and SQLite backends match MongoDB query semantics"""
+
+    @pytest.mark.parametrize('filters,sort_by,sort_order', [
+        ({}, 'created_at', -1),
+        ({}, 'due_date', 1),
+        ({}, 'priority', 1),
+        ({'priority': 'high'}, 'created_at', -1),
+        ({'completed': False}, 'created_at', 1),
+        ({'status': 'in_progress'}, 'status', -1),
+        ({'priority': 'low'}, 'due_date', 1),
+        ({'priority': 'low', 'status': 'pending'}, 'title', -1)
+    ])
+    def test_pages_match_brute_force(self, backend, documents, filters, sort_by, sort_order):
+        """Test filtered, sorted pages match a full sort"""
+        expected = brute_force(documents, filters, sort_by, sort_order)
+        values = [sort_value(task.get(sort_by)) for task in expected]
+
+        seen = []
+        for skip in range(0, len(expected) + 20, 20):
+            page = backend.find(TENANT, filters, sort_by, sort_order, skip=skip, limit=20)
+            # Ties may come back in any order, as in MongoDB
+            assert [sort_value(task.get(sort_by)) for task in page] == values[skip:skip + 20]
+            seen.extend(task['_id'] for task in page)
+
+        assert sorted(seen) == sorted(task['_id'] for task in expected)
+
+    def test_statistics_follow_writes(self, backend):
+        """Test counters stay in step with updates, toggles and deletes"""
+        task = backend.find(TENANT, {'completed': False}, limit=1)[0]
+        before = backend.statistics(TENANT)
+
+        backend.update(TENANT, task['_id'], {'priority': 'high', 'updated_at': utcnow()})
+        toggled = backend.toggle(TENANT, task['_id'], utcnow())
+        assert toggled['completed'] is True and toggled['status'] == 'completed'
+
+        assert backend.soft_delete(TENANT, task['_id'], utcnow()) is True
+        assert backend.find_by_id(TENANT, task['_id']) is None
+
+        after = backend.statistics(TENANT)
+        assert after['total'] == before['total'] - 1
+        assert after['completed'] == before['completed']
+        assert sum(after['priority'].values()) == after['total']
+
+    def test_completion_keeps_first_timestamp(self, backend):
+        """Test re-marking a completed task keeps completed_at"""
+        now = utcnow()
+        task = backend.insert(TENANT, {'title': 'A', 'completed': False, 'created_at': now, 'updated_at': now})
+
+        first = backend.update(TENANT, task['_id'], {'completed': True, 'updated_at': utcnow()})
+        again = backend.update(TENANT, task['_id'], {'completed': True, 'updated_at': utcnow()})
+        assert again['completed_at'] == first['completed_at']
+
+    def test_next_tasks_match_brute_force(self, backend, documents):
+        """Test the next-task view orders incomplete tasks by rank, then due date"""
+        expected = [task for task in documents if not task['completed']]
+        expected.sort(key=lambda task: sort_value(task.get('due_date')))
+        expected.sort(key=lambda task: task['priority_rank'], reverse=True)
+        
+        tasks = backend.next_tasks(TENANT, 50)
+        assert [(task['priority_rank'], task['due_date']) for task in tasks] == \
+            [(task['priority_rank'], task['due_date']) for task in expected[:50]]
+    
+    @pytest.mark.parametrize('operator', ['$in', '$all'])
+    def test_tag_filters_match_brute_force(self, backend, documents, operator):
+        """Test tag filters match any ($in) or every ($all) listed tag"""
+        tags = ['bug', 'feature']
+        check = any if operator == '$in' else all
+        expected = {
+            task['_id'] for task in documents
+            if not task['completed'] and check(tag in task['tags'] for tag in tags)
+        }
+        
+        tasks = backend.find(TENANT, {'tags': {operator: tags}, 'completed': False}, limit=len(documents))
+        assert expected and {task['_id'] for task in tasks} == expected
+    
+    def test_tag_counts_follow_writes(self, backend, documents):
+        """Test tag counts stay in step with inserts, tag changes and deletes"""
+        counts = dict(backend.tag_counts(TENANT))
+        assert sum(counts.values()) == sum(len(task['tags']) for task in documents)
+        
+        now = utcnow()
+        task = backend.insert(TENANT, {'title': 'A', 'tags': ['bug', 'new'], 'created_at': now, 'updated_at': now})
+        backend.patch(TENANT, task['_id'], {'tags': ['new', 'other']}, utcnow())
+        other = backend.find(TENANT, {'tags': 'bug'}, limit=1)[0]
+        backend.soft_delete(TENANT, other['_id'], utcnow())
+        
+        after = dict(backend.tag_counts(TENANT))
+        assert after['bug'] == counts['bug'] - 1
+        assert after['new'] == 1 and after['other'] == 1
+        assert backend.tag_counts(TENANT, limit=1)[0][1] == max(after.values())
+    
+    def test_dependency_traversals_match_graph(self, backend):
+        """Test closure and unblocked queries agree with the in-memory graph"""
+        rng = random.Random(3)
+        tasks = generate_task_documents(300, rng=rng, tenant='graph')
+        for i, task in enumerate(tasks):
+            task['_id'] = ObjectId()
+            task['depends_on'] = [tasks[j]['_id'] for j in rng.sample(range(i), min(i, rng.randint(0, 3)))]
+        backend.insert_many('graph', tasks)
+        graph = DependencyGraph(backend.dependency_edges('graph'))
+        
+        start = tasks[-1]['_id']
+        assert {task['_id'] for task in backend.dependency_closure('graph', [start])} == graph.closure([start])
+        
+        unblocked = backend.unblocked_tasks('graph', len(tasks))
+        expected = graph.unblocked(len(tasks))
+        assert {task['_id'] for task in unblocked} == set(expected)
+        assert [(task['priority_rank'], task['due_date']) for task in unblocked] == \
+            [graph.nodes[_id][1:3] for _id in expected]
+    
+    def test_tenants_are_isolated(self, backend):
+        """Test other tenants see none of the seeded tasks"""
+        assert backend.find('other', {}) == []
+        assert backend.statistics('other')['total'] == 0
+
+    def test_unknown_backend(self):
+        """Test unknown backend names are rejected"""
+        with pytest.raises(ValueError):
+            create_backend('cassandra')
+
+
+@pytest.mark.skipif(TestingConfig.STORAGE_BACKEND == 'mongo', reason='features are available on MongoDB')
+class TestMongoOnlyFeatures:
+    """Test MongoDB-only features are refused cleanly on the embedded backends"""
+    
+    ADMIN = {'X-Admin-Token': TestingConfig.ADMIN_TOKEN}
+    
+    def test_routes_answer_not_implemented(self, client):
+        """Test analytics, exports and jobs answer 501 instead of reaching for MongoDB"""
+        responses = [
+            client.get('/api/tasks/analytics'),
+            client.post('/api/tasks/exports', json={'format': 'ndjson'}),
+            client.get(f'/api/tasks/exports/{ObjectId()}/download'),
+            client.get(f'/api/jobs/{ObjectId()}'),
+            client.post('/api/admin/jobs', json={'type': 'archive_tasks'}, headers=self.ADMIN)
+        ]
+        
+        for response in responses:
+            assert response.status_code == 501
+            assert 'STORAGE_BACKEND=mongo' in response.get_json()['error_detail']
+    
+    def test_commands_refuse(self, runner):
+        """Test archive-tasks and run-worker refuse like migrate does"""
+        for args in (['archive-tasks'], ['run-worker', '--drain'], ['migrate']):
+            result = runner.invoke(args=args)
+            assert result.exit_code != 0
+            assert 'mongo storage backend' in result.output
+    
+    def test_backend_declares_no_mongo_features(self, app):
+        """Test the embedded backends support none of the MongoDB-only features"""
+        backend = app.extensions['storage']
+        assert not any(backend.supports(feature) for feature in ('analytics', 'archive', 'exports', 'jobs'))
@@ -1,6 +1,8 @@
 # tests/test_tasks.py - Task endpoint tests
 import pytest
 import json
+from models.task import Task
+from storage.mongo import MongoTaskBackend
 
 class TestHealthCheck:
     """Test health check endpoint"""
@@ -168,6 +170,165 @@ class TestGetTaskById:
         assert data['success'] == False
         assert 'not found' in data['error'].lower()
 
+class TestBatchLookup:
+    """Test getting several tasks by ID"""
+    
+    def test_lookup_preserves_order_and_reports_missing(self, client, create_task):
+        """Test tasks come back in request order with missing IDs listed"""
+        first = create_task({'title': 'First'})['data']['id']
+        second = create_task({'title': 'Second'})['data']['id']
+        fake_id = '507f1f77bcf86cd799439011'
+        
+        response = client.get(f'/api/tasks?ids={second},{fake_id},{first}')
+        assert response.status_code == 200
+        
+        data = response.get_json()['data']
+        assert [task['id'] for task in data['tasks']] == [second, first]
+        assert data['missing'] == [fake_id]
+    
+    def test_lookup_post(self, client, create_task):
+        """Test the POST lookup variant"""
+        task_id = create_task()['data']['id']
+        
+        response = client.post('/api/tasks/lookup', json={'ids': [task_id, task_id]})
+        assert response.status_code == 200
+        assert response.get_json()['data']['count'] == 1
+    
+    def test_lookup_invalid_ids(self, client):
+        """Test every invalid ID is reported in one error"""
+        response = client.post('/api/tasks/lookup', json={'ids': ['bad-1', '507f1f77bcf86cd799439011', 'bad-2']})
+        assert response.status_code == 400
+        assert 'bad-1, bad-2' in response.get_json()['error_detail']
+    
+    def test_lookup_limits(self, client, app):
+        """Test empty and oversized lookups are rejected"""
+        assert client.post('/api/tasks/lookup', json={'ids': []}).status_code == 400
+        
+        ids = ['507f1f77bcf86cd799439011'] * (app.config['MAX_LOOKUP_IDS'] + 1)
+        assert client.post('/api/tasks/lookup', json={'ids': ids}).status_code == 400
+
+class TestNextTasks:
+    """Test the next-task view"""
+    
+    def test_next_orders_by_priority_then_due_date(self, client, create_task):
+        """Test incomplete tasks come back by priority, then earliest due date"""
+        create_task({'title': 'Low', 'priority': 'low', 'due_date': '2030-01-01'})
+        create_task({'title': 'High late', 'priority': 'high', 'due_date': '2030-03-01'})
+        create_task({'title': 'High soon', 'priority': 'high', 'due_date': '2030-02-01'})
+        create_task({'title': 'Medium', 'priority': 'medium', 'due_date': '2030-01-01'})
+        create_task({'title': 'Done', 'priority': 'high', 'completed': True})
+        
+        response = client.get('/api/tasks/next?limit=3')
+        assert response.status_code == 200
+        
+        titles = [task['title'] for task in response.get_json()['data']['tasks']]
+        assert titles == ['High soon', 'High late', 'Medium']
+    
+    def test_priority_change_moves_task(self, client, create_task):
+        """Test updates and patches keep the rank in step with the priority"""
+        first = create_task({'title': 'First', 'priority': 'low'})['data']['id']
+        second = create_task({'title': 'Second', 'priority': 'low'})['data']['id']
+        
+        client.put(f'/api/tasks/{first}', json={'priority': 'high'})
+        response = client.patch(f'/api/tasks/{second}', json={'priority': 'medium'},
+                                headers={'Prefer': 'return=minimal'})
+        assert set(response.get_json()['data']['changed']) == {'priority', 'updated_at'}
+        
+        tasks = client.get('/api/tasks/next').get_json()['data']['tasks']
+        assert [task['id'] for task in tasks] == [first, second]
+    
+    def test_sort_by_priority_uses_rank(self, client, create_task):
+        """Test sort_by=priority sorts by importance, not alphabetically"""
+        for priority in ['medium', 'high', 'low']:
+            create_task({'title': priority, 'priority': priority})
+        
+        response = client.get('/api/tasks?sort_by=priority&sort_order=desc')
+        assert [task['priority'] for task in response.get_json()['data']['tasks']] == ['high', 'medium', 'low']
+    
+    def test_invalid_sort_field(self, client, create_task):
+        """Test unknown sort fields are rejected on every storage backend"""
+        create_task({'title': 'Sorted'})
+        
+        for sort_by in ['bogus', 'tenant_id', 'title; DROP TABLE tasks']:
+            response = client.get(f'/api/tasks?sort_by={sort_by}')
+            assert response.status_code == 400
+            assert 'sort_by must be one of' in response.get_json()['error_detail']
+        
+        assert client.get('/api/tasks?sort_by=title&sort_order=asc').status_code == 200
+    
+    def test_next_invalid_limit(self, client):
+        """Test limits outside 1..MAX_PAGE_SIZE are rejected"""
+        assert client.get('/api/tasks/next?limit=0').status_code == 400
+        assert client.get('/api/tasks/next?limit=abc').status_code == 400
+
+class TestTags:
+    """Test task tags, tag filters and tag counts"""
+    
+    def test_tags_are_normalized(self, client, create_task):
+        """Test tags are stored lowercased without duplicates"""
+        task = create_task({'title': 'Tagged', 'tags': ['Bug', 'ops', 'bug']})
+        assert task['data']['tags'] == ['bug', 'ops']
+        assert create_task({'title': 'Untagged'})['data']['tags'] == []
+    
+    def test_filter_any_or_all(self, client, create_task):
+        """Test ?tags= matches any listed tag, or all of them with tags_match=all"""
+        create_task({'title': 'Both', 'tags': ['bug', 'ops']})
+        create_task({'title': 'Bug', 'tags': ['bug']})
+        create_task({'title': 'Other', 'tags': ['docs']})
+        
+        def titles(query):
+            response = client.get(f'/api/tasks?{query}')
+            assert response.status_code == 200
+            return sorted(task['title'] for task in response.get_json()['data']['tasks'])
+        
+        assert titles('tags=bug,ops') == ['Both', 'Bug']
+        assert titles('tags=BUG,ops&tags_match=all') == ['Both']
+        assert titles('tags=docs&priority=medium') == ['Other']
+    
+    def test_invalid_filter(self, client):
+        """Test malformed tag filters are rejected"""
+        assert client.get('/api/tasks?tags=').status_code == 400
+        assert client.get('/api/tasks?tags=no%20spaces').status_code == 400
+        assert client.get('/api/tasks?tags=bug&tags_match=some').status_code == 400
+    
+    def test_counts_follow_changes(self, client, create_task):
+        """Test tag counts and stats track creates, patches and deletes"""
+        first = create_task({'title': 'First', 'tags': ['bug', 'ops']})['data']['id']
+        second = create_task({'title': 'Second', 'tags': ['bug']})['data']['id']
+        create_task({'title': 'Third', 'tags': ['bug']})
+        
+        client.patch(f'/api/tasks/{second}', json={'tags': None})
+        client.put(f'/api/tasks/{first}', json={'tags': ['ops', 'docs']})
+        client.delete(f'/api/tasks/{first}')
+        
+        response = client.get('/api/tasks/tags')
+        assert response.status_code == 200
+        assert response.get_json()['data']['tags'] == [{'tag': 'bug', 'count': 1}]
+        assert client.get('/api/tasks/stats').get_json()['data']['top_tags'] == [{'tag': 'bug', 'count': 1}]
+        assert client.get('/api/tasks/tags?limit=0').status_code == 400
+    
+    @pytest.mark.mongo
+    def test_reconcile_drifted_counts(self, client, create_task, runner):
+        """Test reconcile-tag-counts recounts tags and drops counters of unused tags"""
+        create_task({'title': 'First', 'tags': ['bug', 'ops']})
+        create_task({'title': 'Second', 'tags': ['bug']})
+        
+        # Simulate counter updates lost after their task writes
+        counters = MongoTaskBackend.get_tag_counts_collection()
+        tenant = Task.resolve_tenant()
+        counters.update_one({'tenant_id': tenant, 'tag': 'bug'}, {'$set': {'count': 7}})
+        counters.delete_one({'tenant_id': tenant, 'tag': 'ops'})
+        counters.insert_one({'tenant_id': tenant, 'tag': 'ghost', 'count': 3})
+        
+        result = runner.invoke(args=['reconcile-tag-counts'])
+        assert result.exit_code == 0, result.output
+        assert '2 tag counters corrected, 1 removed' in result.output
+        assert client.get('/api/tasks/tags').get_json()['data']['tags'] == \
+            [{'tag': 'bug', 'count': 2}, {'tag': 'ops', 'count': 1}]
+        
+        result = runner.invoke(args=['reconcile-tag-counts', '--tenant', tenant])
+        assert '0 tag counters corrected, 0 removed' in result.output
+
 class TestUpdateTask:
     """Test updating tasks"""
     
@@ -223,6 +384,63 @@ class TestUpdateTask:
         })
         assert response.status_code == 400
 
+class TestPatchTask:
+    """Test JSON Merge Patch updates"""
+    
+    def test_patch_changes_only_given_fields(self, client, create_task):
+        """Test members replace fields and null resets optional ones"""
+        task = create_task()['data']
+        
+        response = client.patch(
+            f"/api/tasks/{task['id']}",
+            json={'title': 'Patched', 'due_date': None},
+            headers={'Content-Type': 'application/merge-patch+json'}
+        )
+        assert response.status_code == 200
+        
+        data = response.get_json()['data']
+        assert data['title'] == 'Patched'
+        assert data['due_date'] is None
+        assert data['description'] == task['description']
+    
+    def test_noop_patch_does_not_write(self, client, create_task):
+        """Test a patch repeating current values keeps updated_at"""
+        task = create_task()['data']
+        
+        response = client.patch(f"/api/tasks/{task['id']}", json={'title': task['title'], 'priority': task['priority']})
+        assert response.status_code == 200
+        assert response.get_json()['message'] == 'No changes'
+        assert response.get_json()['data']['updated_at'] == task['updated_at']
+    
+    def test_minimal_response(self, client, create_task):
+        """Test Prefer: return=minimal returns only changed fields"""
+        task = create_task()['data']
+        
+        response = client.patch(
+            f"/api/tasks/{task['id']}",
+            json={'title': task['title'], 'completed': True},
+            headers={'Prefer': 'return=minimal'}
+        )
+        assert response.headers['Preference-Applied'] == 'return=minimal'
+        
+        changed = response.get_json()['data']['changed']
+        assert set(changed) == {'completed', 'completed_at', 'updated_at'}
+        assert changed['completed'] is True
+    
+    def test_invalid_patches(self, client, create_task):
+        """Test invalid values, removals of required fields and unknown fields"""
+        task_id = create_task()['data']['id']
+        
+        assert client.patch(f'/api/tasks/{task_id}', json={'priority': 'urgent'}).status_code == 400
+        assert client.patch(f'/api/tasks/{task_id}', json={'title': None}).status_code == 400
+        assert client.patch(f'/api/tasks/{task_id}', json={'created_at': 'x'}).status_code == 400
+        assert client.patch(f'/api/tasks/{task_id}', json=['title']).status_code == 400
+    
+    def test_patch_nonexistent_task(self, client):
+        """Test patching a missing task"""
+        response = client.patch('/api/tasks/507f1f77bcf86cd799439011', json={'title': 'x'})
+        assert response.status_code == 404
+
 class TestDeleteTask:
     """Test deleting tasks"""
     
@@ -325,4 +543,4 @@ class TestTaskStatistics:
         assert data['data']['pending_tasks'] == 4
         assert data['data']['high_priority_tasks'] == 2
         assert data['data']['medium_priority_tasks'] == 2
-        assert data['data']['low_priority_tasks'] == 1
\ No newline at end of file
+        assert data['data']['low_priority_tasks'] == 1
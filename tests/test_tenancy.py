@@ -0,0 +1,68 @@
+# tests/test_tenancy.py - Multi-tenant isolation tests
+import pytest
+from utils.tenancy import tenant_collection_name, validate_tenant_id
+
+ACME = {'X-Tenant-ID': 'acme'}
+GLOBEX = {'X-Tenant-ID': 'globex'}
+
+class TestTenantIsolation:
+    """Test tasks are scoped to the requesting tenant"""
+    
+    def test_list_scoped_to_tenant(self, client):
+        """Test tenants only see their own tasks"""
+        client.post('/api/tasks', json={'title': 'Acme task'}, headers=ACME)
+        client.post('/api/tasks', json={'title': 'Globex task'}, headers=GLOBEX)
+        
+        data = client.get('/api/tasks', headers=ACME).get_json()
+        assert [task['title'] for task in data['data']['tasks']] == ['Acme task']
+    
+    def test_get_other_tenant_task(self, client):
+        """Test a task ID from another tenant is not found"""
+        task = client.post('/api/tasks', json={'title': 'Acme task'}, headers=ACME).get_json()
+        
+        response = client.get(f"/api/tasks/{task['data']['id']}", headers=GLOBEX)
+        assert response.status_code == 404
+    
+    def test_update_other_tenant_task(self, client):
+        """Test tenants cannot modify each other's tasks"""
+        task = client.post('/api/tasks', json={'title': 'Acme task'}, headers=ACME).get_json()
+        
+        response = client.put(f"/api/tasks/{task['data']['id']}", json={'title': 'Hijacked'}, headers=GLOBEX)
+        assert response.status_code == 404
+    
+    def test_statistics_scoped_to_tenant(self, client):
+        """Test statistics only count the tenant's tasks"""
+        client.post('/api/tasks', json={'title': 'Acme 1'}, headers=ACME)
+        client.post('/api/tasks', json={'title': 'Acme 2'}, headers=ACME)
+        client.post('/api/tasks', json={'title': 'Globex 1'}, headers=GLOBEX)
+        
+        data = client.get('/api/tasks/stats', headers=ACME).get_json()
+        assert data['data']['total_tasks'] == 2
+    
+    def test_invalid_tenant_header(self, client):
+        """Test malformed tenant IDs are rejected"""
+        response = client.get('/api/tasks', headers={'X-Tenant-ID': 'bad tenant!'})
+        assert response.status_code == 400
+
+class TestTenantRouting:
+    """Test tenant collection routing"""
+    
+    def test_shared_mode(self):
+        """Test shared mode always uses the base collection"""
+        assert tenant_collection_name('tasks', 'acme', 'shared', 'default') == 'tasks'
+    
+    def test_collection_mode(self):
+        """Test collection mode routes tenants to their own collection"""
+        assert tenant_collection_name('tasks', 'acme', 'collection', 'default') == 'tasks_acme'
+        assert tenant_collection_name('tasks', 'default', 'collection', 'default') == 'tasks'
+    
+    def test_validate_tenant_id(self):
+        """Test tenant ID validation"""
+        assert validate_tenant_id('acme-01') == 'acme-01'
+        with pytest.raises(ValueError):
+            validate_tenant_id('../admin')
+        # Tenant collections would collide with archive collections
+        for tenant_id in ['archive', 'acme_archive']:
+            with pytest.raises(ValueError):
+                validate_tenant_id(tenant_id)
+        assert validate_tenant_id('archives') == 'archives'
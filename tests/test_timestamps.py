@@ -0,0 +1,39 @@
+# tests/test_timestamps.py - Timestamp codec tests
+import pytest
+from datetime import datetime, timedelta, timezone
+from utils.timestamps import (
+    utcnow, to_utc, parse_iso, format_iso
+)
+
+class TestParse:
+    """Test ISO-8601 parsing"""
+    
+    def test_naive_treated_as_utc(self):
+        """Test naive timestamps are interpreted as UTC"""
+        parsed = parse_iso('2024-12-31T23:59:59')
+        assert parsed == datetime(2024, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+    
+    def test_offset_converted_to_utc(self):
+        """Test offsets are normalized to UTC"""
+        parsed = parse_iso('2024-12-31T23:59:59+05:30')
+        assert parsed.utcoffset() == timedelta(0)
+        assert parsed.hour == 18
+    
+    def test_invalid_raises(self):
+        """Test invalid values raise ValueError"""
+        with pytest.raises(ValueError):
+            parse_iso('31/12/2024')
+        with pytest.raises(ValueError):
+            parse_iso(20241231)
+
+class TestFormat:
+    """Test ISO-8601 formatting"""
+    
+    def test_format_naive_and_aware_match(self):
+        """Test naive and aware UTC values format identically"""
+        naive = datetime(2024, 1, 1, 12, 0)
+        assert format_iso(naive) == format_iso(to_utc(naive)) == '2024-01-01T12:00:00+00:00'
+    
+    def test_utcnow_is_aware(self):
+        """Test utcnow returns an aware datetime"""
+        assert utcnow().tzinfo is not None
@@ -1,6 +1,9 @@
 # tests/test_validators.py - Validator tests
 import pytest
-from utils.validators import validate_task_data, validate_priority, validate_status
+from utils.validators import (
+    validate_task_data, validate_priority, validate_status,
+    parse_due_date, task_json_schema, normalize_tags
+)
 
 class TestValidatePriority:
     """Test priority validation"""
@@ -17,6 +20,7 @@ class TestValidatePriority:
         assert validate_priority('LOW') == False
         assert validate_priority('') == False
         assert validate_priority(None) == False
+        assert validate_priority(['high']) == False
 
 class TestValidateStatus:
     """Test status validation"""
@@ -146,4 +150,65 @@ class TestValidateTaskData:
         }
         is_valid, error = validate_task_data(data, is_update=False)
         assert is_valid == False
-        assert 'Description must be a string' in error
\ No newline at end of file
+        assert 'Description must be a string' in error
+    
+    def test_invalid_due_date(self):
+        """Test invalid due date format"""
+        data = {
+            'title': 'Test',
+            'due_date': 'not-a-date'
+        }
+        is_valid, error = validate_task_data(data, is_update=False)
+        assert is_valid == False
+        assert 'Invalid due_date format' in error
+    
+    def test_null_due_date(self):
+        """Test due date can be cleared"""
+        is_valid, error = validate_task_data({'due_date': None}, is_update=True)
+        assert is_valid == True
+        assert error is None
+    
+    def test_tags(self):
+        """Test tags must be a bounded list of tag identifiers"""
+        assert validate_task_data({'tags': ['bug', 'Area:API', 'v1.2']}, is_update=True) == (True, None)
+        
+        for tags, message in [
+            ('bug', 'must be a list'),
+            (['bug', 3], 'must be a list'),
+            (['two words'], 'Tags must be 1-32 characters'),
+            (['a,b'], 'Tags must be 1-32 characters'),
+            (['x' * 33], 'Tags must be 1-32 characters'),
+            ([f'tag{i}' for i in range(21)], 'at most 20')
+        ]:
+            is_valid, error = validate_task_data({'tags': tags}, is_update=True)
+            assert is_valid == False
+            assert message in error
+    
+    def test_normalize_tags(self):
+        """Test tags are lowercased and deduplicated in order"""
+        assert normalize_tags(['Bug', 'ops', 'bug']) == ['bug', 'ops']
+
+class TestParseDueDate:
+    """Test due date parsing"""
+    
+    def test_parse_zulu_suffix(self):
+        """Test trailing Z is accepted as UTC"""
+        assert parse_due_date('2024-12-31T23:59:59Z').utcoffset().total_seconds() == 0
+    
+    def test_parse_invalid(self):
+        """Test invalid strings raise ValueError"""
+        with pytest.raises(ValueError):
+            parse_due_date('tomorrow')
+
+class TestTaskJsonSchema:
+    """Test the MongoDB $jsonSchema validator"""
+    
+    def test_schema_matches_rules(self):
+        """Test schema mirrors the Python validation rules"""
+        schema = task_json_schema()
+        assert schema['required'] == ['title']
+        assert schema['properties']['title']['maxLength'] == 200
+        assert schema['properties']['priority']['enum'] == ['low', 'medium', 'high']
+        assert schema['properties']['due_date']['bsonType'] == ['date', 'null']
+        assert schema['properties']['tags']['bsonType'] == 'array'
+        assert schema['properties']['tags']['maxItems'] == 20
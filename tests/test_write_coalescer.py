@@ -0,0 +1,138 @@
+# tests/test_write_coalescer.py - Tests for coalescing bursts of task writes
+import threading
+import time
+import pytest
+from bson import ObjectId
+from migrations.state import MigrationState
+from models.task import Task
+from utils.timestamps import utcnow
+from utils.write_coalescer import WriteCoalescer, compile_pipeline, replay_ops, set_op, stage_op
+
+@pytest.fixture
+def coalescer():
+    """Enable write coalescing with a window wide enough to batch test threads"""
+    backend = Task.backend()
+    backend.coalescer = WriteCoalescer(window_ms=100)
+    yield backend.coalescer
+    backend.coalescer = None
+
+def run_concurrently(calls, stagger=0.005):
+    """Start each call in its own thread, slightly staggered, and collect results"""
+    results = [None] * len(calls)
+    
+    def run(index, call):
+        results[index] = call()
+    
+    threads = []
+    for index, call in enumerate(calls):
+        thread = threading.Thread(target=run, args=(index, call))
+        thread.start()
+        threads.append(thread)
+        time.sleep(stagger)
+    for thread in threads:
+        thread.join()
+    return results
+
+class TestCompilePipeline:
+    """Test merging queued operations"""
+    
+    def test_adjacent_sets_merge_with_last_writer_winning(self):
+        """Test literal sets collapse into one stage"""
+        pipeline = compile_pipeline([set_op({'title': 'a', 'priority': 'low'}), set_op({'title': 'b'})])
+        assert pipeline == [{'$set': {'title': {'$literal': 'b'}, 'priority': {'$literal': 'low'}}}]
+    
+    def test_stages_keep_their_order(self):
+        """Test expression stages split literal sets"""
+        toggle = {'$set': {'completed': {'$not': ['$completed']}}}
+        pipeline = compile_pipeline([set_op({'title': 'a'}), stage_op(toggle), set_op({'title': 'b'})])
+        assert pipeline[1] == toggle
+        assert len(pipeline) == 3
+    
+    def test_replay_matches_server_semantics(self):
+        """Test replayed operations give the state after each one"""
+        toggle = {'$set': {
+            'completed': {'$cond': [{'$eq': ['$completed', True]}, False, True]},
+            'completed_at': {'$cond': [{'$eq': ['$completed', True]}, None, 'now']}
+        }}
+        states = list(replay_ops({'completed': False, 'title': 'a'}, [
+            stage_op(toggle), set_op({'title': 'b'}), stage_op(toggle)
+        ]))
+        assert [(s['completed'], s['completed_at'], s['title']) for s in states] == [
+            (True, 'now', 'a'), (True, 'now', 'b'), (False, None, 'b')
+        ]
+    
+    def test_unsupported_operator_rejected(self, app):
+        """Test stages that could not be replayed are refused before any write"""
+        with pytest.raises(ValueError):
+            WriteCoalescer().submit(Task.get_collection(), {'_id': 1}, stage_op({'$set': {'n': {'$add': ['$n', 1]}}}))
+
+@pytest.mark.mongo
+class TestCoalescing:
+    """Test coalesced task writes"""
+    
+    def test_updates_are_coalesced(self, app, coalescer, create_task):
+        """Test a burst of updates becomes one write and every caller sees its own"""
+        task_id = create_task()['data']['id']
+        
+        results = run_concurrently([
+            lambda title=title: Task.update(task_id, {'title': title})
+            for title in ('first', 'second', 'third')
+        ])
+        
+        assert [task['title'] for task in results] == ['first', 'second', 'third']
+        assert Task.find_by_id(task_id)['title'] == 'third'
+        
+        stats = coalescer.stats()
+        assert stats['operations'] == 3
+        assert stats['writes'] == 1
+        assert stats['coalescing_ratio'] == 3
+    
+    def test_toggles_are_applied_in_order(self, app, coalescer, create_task):
+        """Test coalesced toggles flip completion once per call and report their own result"""
+        task_id = create_task()['data']['id']
+        
+        results = run_concurrently([lambda: Task.toggle_completion(task_id)] * 3)
+        
+        task = Task.find_by_id(task_id)
+        assert task['completed'] is True
+        assert task['status'] == 'completed'
+        assert task['completed_at'] is not None
+        assert [result['completed'] for result in results] == [True, False, True]
+        assert [result['status'] for result in results] == ['completed', 'pending', 'completed']
+    
+    def test_missing_task_returns_none(self, app, coalescer):
+        """Test coalesced writes to missing tasks report not found"""
+        assert Task.update('507f1f77bcf86cd799439011', {'title': 'x'}) is None
+    
+    def test_routes_with_coalescing(self, client, coalescer, create_task):
+        """Test PUT and toggle responses stay correct with coalescing on"""
+        task_id = create_task()['data']['id']
+        
+        response = client.put(f'/api/tasks/{task_id}', json={'title': 'Renamed', 'completed': True})
+        assert response.status_code == 200
+        assert response.get_json()['data']['title'] == 'Renamed'
+        assert response.get_json()['data']['completed_at'] is not None
+        
+        response = client.patch(f'/api/tasks/{task_id}/toggle')
+        assert response.get_json()['data']['completed'] is False
+    
+    def test_unmigrated_collection(self, client, coalescer):
+        """Test coalesced writes match tasks without tenant_id or is_deleted (before 0001/0002)"""
+        MigrationState.collection().delete_many({})
+        MigrationState.reset()
+        task_id = ObjectId()
+        Task.get_collection().insert_one({
+            '_id': task_id, 'title': 'Legacy', 'description': '', 'completed': False, 'priority': 'high',
+            'status': 'pending', 'due_date': None, 'created_at': utcnow(), 'updated_at': utcnow()
+        })
+        try:
+            response = client.put(f'/api/tasks/{task_id}', json={'title': 'Renamed'})
+            assert response.status_code == 200
+            assert response.get_json()['data']['title'] == 'Renamed'
+            
+            response = client.patch(f'/api/tasks/{task_id}/toggle')
+            assert response.status_code == 200
+            assert response.get_json()['data']['completed'] is True
+        finally:
+            MigrationState.collection().delete_many({})
+            MigrationState.reset()
@@ -0,0 +1,44 @@
+# utils/auth.py - Access control helpers
+import hmac
+from functools import wraps
+from flask import current_app, request
+from utils.response import error_response
+
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+def is_admin_request():
+    """Check whether the current request carries the configured admin token"""
+    admin_token = current_app.config.get('ADMIN_TOKEN')
+    if not admin_token:
+        return False
+    # Constant-time comparison so response timing does not leak the token
+    presented = request.headers.get(ADMIN_TOKEN_HEADER, '')
+    return hmac.compare_digest(presented.encode(), admin_token.encode())
+
+def require_admin(view):
+    """
+    Restrict a view to callers presenting the admin token
+    
+    Args:
+        view: Flask view function
+        
+    Returns:
+        Wrapped view function
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config.get('ADMIN_TOKEN'):
+            return error_response(
+                message='Admin access is disabled',
+                status_code=403
+            )
+        
+        if not is_admin_request():
+            return error_response(
+                message='Admin token required',
+                status_code=401
+            )
+        
+        return view(*args, **kwargs)
+    
+    return wrapper
@@ -0,0 +1,63 @@
+# utils/cooperative.py - gevent (cooperative concurrency) mode
+"""
+With CONCURRENCY_MODE=gevent, requests run in greenlets: the standard library
+is monkey-patched so sockets, locks and threads yield to the gevent hub.
+Patching must happen before anything else is imported (wsgi.py and
+gunicorn.conf.py call patch() first), otherwise locks and sockets created
+at import time stay native and can block the whole worker.
+
+This module must not import the application at module level.
+"""
+import os
+import sys
+
+
+def requested():
+    """Whether the environment asks for gevent mode"""
+    return os.environ.get('CONCURRENCY_MODE', 'threads') == 'gevent'
+
+
+def patch():
+    """
+    Monkey-patch the standard library for gevent
+
+    Must run before the application, pymongo or logging handlers are
+    imported. Calling it again is a no-op.
+
+    Raises:
+        RuntimeError: If gevent is not installed
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        raise RuntimeError('CONCURRENCY_MODE=gevent requires gevent: pip install gevent')
+
+    if not monkey.is_module_patched('socket'):
+        monkey.patch_all()
+
+
+def is_patched():
+    """Whether gevent has patched the standard library in this process"""
+    if 'gevent.monkey' not in sys.modules:
+        return False
+    return sys.modules['gevent.monkey'].is_module_patched('socket')
+
+
+def original(module, name):
+    """The unpatched standard library object (e.g. a native thread starter)"""
+    from gevent import monkey
+    return monkey.get_original(module, name)
+
+
+def check_app(app):
+    """
+    Refuse to run in gevent mode without early patching
+
+    Raises:
+        RuntimeError: If CONCURRENCY_MODE is gevent but the process is not patched
+    """
+    if app.config.get('CONCURRENCY_MODE', 'threads') == 'gevent' and not is_patched():
+        raise RuntimeError(
+            'CONCURRENCY_MODE=gevent but the standard library is not patched: '
+            'call utils.cooperative.patch() before importing the app (see wsgi.py)'
+        )
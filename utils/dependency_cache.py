@@ -0,0 +1,213 @@
+# utils/dependency_cache.py - In-process adjacency cache for hot tenants' dependency graphs
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def next_order_key(rank, due_date):
+    """Sort key of the next-task order: highest rank first (null last), then earliest due date (null first)"""
+    return (rank is None, -(rank or 0), due_date is not None, due_date or 0)
+
+
+class DependencyGraph:
+    """
+    Adjacency of one tenant's live tasks
+
+    Each node keeps what traversals need: whether the task is completed, its
+    next-task ordering and the _ids it depends on. The ordered list of
+    unblocked tasks is computed on first use and kept until the next change,
+    so repeated reads between writes only slice it.
+    """
+
+    def __init__(self, edges):
+        self.nodes = {}
+        self._unblocked = None
+        self._lock = threading.Lock()
+        for task in edges:
+            self.apply(task)
+
+    def apply(self, task):
+        """Add or replace a node from a task document"""
+        with self._lock:
+            self.nodes[task['_id']] = (
+                bool(task.get('completed')),
+                task.get('priority_rank'),
+                task.get('due_date'),
+                tuple(task.get('depends_on') or ())
+            )
+            self._unblocked = None
+
+    def discard(self, object_id):
+        with self._lock:
+            self.nodes.pop(object_id, None)
+            self._unblocked = None
+
+    def closure(self, object_ids):
+        """
+        _ids reachable from object_ids through one or more dependencies
+
+        Dependencies on tasks that are not live (deleted, archived or in
+        another tenant) are not followed.
+        """
+        nodes = self.nodes
+        seen = set()
+
+        with self._lock:
+            stack = [dependency for object_id in object_ids
+                     for dependency in nodes.get(object_id, (None, None, None, ()))[3]]
+
+            while stack:
+                object_id = stack.pop()
+                if object_id in seen or object_id not in nodes:
+                    continue
+                seen.add(object_id)
+                stack.extend(nodes[object_id][3])
+
+        return seen
+
+    def unblocked(self, limit):
+        """_ids of at most limit incomplete tasks with no incomplete live dependency, in next-task order"""
+        nodes = self.nodes
+
+        def is_open(object_id):
+            node = nodes.get(object_id)
+            return node is not None and not node[0]
+
+        with self._lock:
+            if self._unblocked is None:
+                candidates = [
+                    (next_order_key(rank, due_date), object_id)
+                    for object_id, (completed, rank, due_date, dependencies) in nodes.items()
+                    if not completed and not any(is_open(dependency) for dependency in dependencies)
+                ]
+                candidates.sort()
+                self._unblocked = [object_id for _, object_id in candidates]
+            return self._unblocked[:limit]
+
+
+class DependencyCache:
+    """
+    Dependency graphs of the tenants whose graphs are read most
+
+    A tenant's graph is built with one scan of its live tasks once it has
+    been read hot_reads times within ttl seconds; colder tenants are served by
+    the storage backend's own traversal. At most max_tenants graphs are kept
+    (least recently used first out). Writes made through this process are
+    applied to cached graphs as they happen; writes from other processes show
+    up when the graph expires after ttl seconds.
+    """
+
+    def __init__(self, max_tenants, ttl, hot_reads):
+        self.max_tenants = max_tenants
+        self.ttl = ttl
+        self.hot_reads = hot_reads
+        self._graphs = OrderedDict()
+        self._reads = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def get(self, tenant, load_edges):
+        """
+        Get a tenant's cached graph, building it when the tenant has turned hot
+
+        Args:
+            tenant: Tenant ID
+            load_edges: Callable returning the tenant's live task documents
+                (at least _id, completed, priority_rank, due_date, depends_on)
+
+        Returns:
+            DependencyGraph, or None while the tenant is cold
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._graphs.get(tenant)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._graphs.move_to_end(tenant)
+                self.hits += 1
+                return entry[1]
+            self._graphs.pop(tenant, None)
+            self.misses += 1
+
+            reads, since = self._reads.get(tenant, (0, now))
+            if now - since >= self.ttl:
+                reads, since = 0, now
+            reads += 1
+            if reads < self.hot_reads:
+                self._reads[tenant] = (reads, since)
+                return None
+            self._reads.pop(tenant, None)
+
+        # Built outside the lock; a concurrent build for the same tenant just wins or loses the race
+        started = time.perf_counter()
+        graph = DependencyGraph(load_edges())
+        logger.info(f"Dependency graph cached for tenant {tenant}: {len(graph.nodes)} tasks "
+                    f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+        with self._lock:
+            self._graphs[tenant] = (time.monotonic(), graph)
+            self._graphs.move_to_end(tenant)
+            while len(self._graphs) > self.max_tenants:
+                self._graphs.popitem(last=False)
+            self.builds += 1
+        return graph
+
+    def task_written(self, tenant, task):
+        """Apply a created or changed task to the tenant's cached graph, if any"""
+        with self._lock:
+            entry = self._graphs.get(tenant)
+            if entry is not None:
+                entry[1].apply(task)
+
+    def task_removed(self, tenant, object_id):
+        """Drop a deleted task from the tenant's cached graph, if any"""
+        with self._lock:
+            entry = self._graphs.get(tenant)
+            if entry is not None:
+                entry[1].discard(object_id)
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+            self._reads.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tenants': len(self._graphs),
+                'tasks': sum(len(graph.nodes) for _, graph in self._graphs.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'builds': self.builds
+            }
+
+
+def register_dependency_cache(app):
+    """
+    Keep hot tenants' dependency graphs in memory
+
+    Disabled with DEPENDENCY_CACHE_TENANTS = 0.
+
+    Args:
+        app: Flask application instance
+    """
+    if app.config.get('DEPENDENCY_CACHE_TENANTS', 0) <= 0:
+        return
+
+    app.extensions['dependency_cache'] = DependencyCache(
+        max_tenants=app.config['DEPENDENCY_CACHE_TENANTS'],
+        ttl=app.config['DEPENDENCY_CACHE_TTL'],
+        hot_reads=app.config['DEPENDENCY_CACHE_HOT_READS']
+    )
+
+
+def current_dependency_cache():
+    """Dependency cache of the current application, or None (disabled or outside an app)"""
+    if has_app_context():
+        return current_app.extensions.get('dependency_cache')
+    return None
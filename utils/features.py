@@ -0,0 +1,33 @@
+# utils/features.py - Storage backend feature checks for routes
+from functools import wraps
+from flask import current_app
+from storage import get_backend
+from utils.response import error_response
+
+def require_feature(feature):
+    """
+    Restrict a view to storage backends that support a MongoDB-only feature
+
+    Args:
+        feature: Feature name declared in StorageBackend.features
+
+    Returns:
+        Decorator answering 501 when the configured backend lacks the feature
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            backend = get_backend()
+            if not backend.supports(feature):
+                return error_response(
+                    message='Not supported by this storage backend',
+                    status_code=501,
+                    error_detail=f"{feature} requires STORAGE_BACKEND=mongo "
+                                 f"(configured: {current_app.config.get('STORAGE_BACKEND', backend.name)})"
+                )
+
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
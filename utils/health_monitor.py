@@ -0,0 +1,301 @@
+# utils/health_monitor.py - Cached background health checks for readiness probes
+import os
+import threading
+import time
+from pymongo import monitoring
+from pymongo.topology_description import TopologyDescription
+from database import Database
+from storage import get_backend
+from storage.mongo import MongoTaskBackend
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PoolUsageListener(monitoring.ConnectionPoolListener):
+    """Track checked-out connections per server to measure pool saturation"""
+
+    def __init__(self):
+        self._checked_out = {}
+        self._wait_failures = 0
+        self._lock = threading.Lock()
+
+    def _adjust(self, address, delta):
+        with self._lock:
+            self._checked_out[address] = max(0, self._checked_out.get(address, 0) + delta)
+
+    def connection_checked_out(self, event):
+        self._adjust(event.address, 1)
+
+    def connection_checked_in(self, event):
+        self._adjust(event.address, -1)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._wait_failures += 1
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._checked_out.pop(event.address, None)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def reset(self):
+        """Forget inherited counters (used after fork)"""
+        with self._lock:
+            self._checked_out.clear()
+            self._wait_failures = 0
+
+    def usage(self):
+        """
+        Get the busiest pool's checked-out count and failed checkouts
+
+        Returns:
+            Tuple of (max_checked_out, wait_failures)
+        """
+        with self._lock:
+            busiest = max(self._checked_out.values(), default=0)
+            return busiest, self._wait_failures
+
+
+def replication_lag_seconds(client):
+    """
+    Estimate replication lag from the driver's topology description
+
+    Uses the lastWrite dates reported in each server's hello response, so no
+    privileged replSetGetStatus call is needed.
+
+    Returns:
+        Largest primary-to-secondary lag in seconds, or None outside a replica set
+    """
+    describe = getattr(client, 'topology_description', None)
+    if not isinstance(describe, TopologyDescription):
+        return None
+
+    primary = None
+    secondaries = []
+    for server in describe.server_descriptions().values():
+        if server.last_write_date is None:
+            continue
+        if server.server_type_name == 'RSPrimary':
+            primary = server.last_write_date
+        elif server.server_type_name == 'RSSecondary':
+            secondaries.append(server.last_write_date)
+
+    if primary is None or not secondaries:
+        return None
+    return max(0.0, max((primary - secondary).total_seconds() for secondary in secondaries))
+
+
+class HealthMonitor:
+    """
+    Periodically check task storage and cache the result for readiness probes
+
+    Readiness uses hysteresis: it only drops after failure_threshold
+    consecutive failed checks and only recovers after recovery_threshold
+    consecutive good ones, so a single blip does not flap every pod.
+    """
+
+    def __init__(self, pool_listener, interval=5.0, failure_threshold=3, recovery_threshold=2,
+                 max_pool_utilization=0.9, max_replication_lag=30.0, max_pool_size=100):
+        self.pool_listener = pool_listener
+        self.interval = interval
+        self.failure_threshold = failure_threshold
+        self.recovery_threshold = recovery_threshold
+        self.max_pool_utilization = max_pool_utilization
+        self.max_replication_lag = max_replication_lag
+        self.max_pool_size = max_pool_size
+
+        self.ready = False
+        self.checks = {}
+        self.reason = 'No health check has run yet'
+        self.checked_at = None
+        self._checked_once = False
+        self._failures = 0
+        self._successes = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def check(self):
+        """
+        Run one health check and update the cached readiness
+
+        Returns:
+            Snapshot dictionary (see snapshot)
+        """
+        backend = get_backend()
+        started = time.perf_counter()
+        reachable = backend.ping()
+        ping_ms = (time.perf_counter() - started) * 1000.0
+
+        checks = {
+            backend.name: {'ok': reachable, 'ping_ms': round(ping_ms, 3), 'error': backend.last_error()}
+        }
+
+        # Pool and replication checks only apply when tasks live in MongoDB
+        if isinstance(backend, MongoTaskBackend):
+            checked_out, wait_failures = self.pool_listener.usage()
+            utilization = checked_out / self.max_pool_size if self.max_pool_size else 0.0
+
+            lag = None
+            if reachable:
+                try:
+                    lag = replication_lag_seconds(Database.get_client())
+                except Exception as e:
+                    logger.warning(f"Failed to read replication lag: {str(e)}")
+
+            checks['pool'] = {
+                'ok': utilization < self.max_pool_utilization,
+                'checked_out': checked_out,
+                'max_pool_size': self.max_pool_size,
+                'utilization': round(utilization, 3),
+                'checkout_failures': wait_failures
+            }
+            checks['replication'] = {
+                'ok': lag is None or lag <= self.max_replication_lag,
+                'lag_seconds': lag
+            }
+        failed = [name for name, result in checks.items() if not result['ok']]
+
+        with self._lock:
+            self.checks = checks
+            self.checked_at = time.time()
+            self._record(failed)
+            return self._snapshot()
+
+    def _record(self, failed):
+        if failed:
+            self._failures += 1
+            self._successes = 0
+        else:
+            self._successes += 1
+            self._failures = 0
+
+        if not self._checked_once:
+            # The first check decides directly so startup is not delayed
+            self._checked_once = True
+            self.ready = not failed
+        elif self.ready and self._failures >= self.failure_threshold:
+            self.ready = False
+            logger.warning(f"Readiness lost: {', '.join(failed)} failing")
+        elif not self.ready and self._successes >= self.recovery_threshold:
+            self.ready = True
+            logger.info("Readiness restored")
+
+        if failed:
+            self.reason = f"Failing checks: {', '.join(failed)}"
+        elif self.ready:
+            self.reason = None
+
+    def _snapshot(self):
+        return {
+            'ready': self.ready,
+            'reason': self.reason,
+            'checked_at': self.checked_at,
+            'consecutive_failures': self._failures,
+            'checks': self.checks
+        }
+
+    def snapshot(self):
+        """
+        Get the cached health result without doing any I/O
+
+        Returns:
+            Dictionary with ready, reason, checked_at, consecutive_failures and checks
+        """
+        with self._lock:
+            return self._snapshot()
+
+    def ensure_started(self):
+        """Start the monitor thread in this process if it is not running"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # Forked worker: counters and thread belong to the parent
+                self.pool_listener.reset()
+                self._checked_once = False
+                self._failures = self._successes = 0
+                self.ready = False
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the monitor thread"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Health check error: {str(e)}")
+            self._stop.wait(self.interval)
+
+
+def register_health_monitor(app):
+    """
+    Create the health monitor and attach its pool listener
+
+    Must be called before the database is initialized. The monitor thread is
+    started lazily by the first probe in each process, so pre-fork servers do
+    not lose it across fork.
+
+    Args:
+        app: Flask application instance
+    """
+    pool_listener = PoolUsageListener()
+    Database.add_event_listener(pool_listener)
+
+    app.extensions['health_monitor'] = HealthMonitor(
+        pool_listener,
+        interval=app.config['HEALTH_CHECK_INTERVAL'],
+        failure_threshold=app.config['HEALTH_FAILURE_THRESHOLD'],
+        recovery_threshold=app.config['HEALTH_RECOVERY_THRESHOLD'],
+        max_pool_utilization=app.config['HEALTH_MAX_POOL_UTILIZATION'],
+        max_replication_lag=app.config['HEALTH_MAX_REPLICATION_LAG'],
+        max_pool_size=app.config['MONGO_MAX_POOL_SIZE']
+    )
+
+
+def current_health():
+    """
+    Get the cached health snapshot for the current application
+
+    Starts the monitor on first use in this process and runs one check
+    synchronously if none has completed yet.
+    """
+    from flask import current_app
+
+    monitor = current_app.extensions['health_monitor']
+    monitor.ensure_started()
+    snapshot = monitor.snapshot()
+    if snapshot['checked_at'] is None:
+        snapshot = monitor.check()
+    return snapshot
@@ -1,7 +1,55 @@
 # utils/logger.py - Logging configuration
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+from utils import cooperative
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that creates its directory and file on first write"""
+    
+    def __init__(self, filename, **kwargs):
+        kwargs['delay'] = True
+        super().__init__(filename, **kwargs)
+    
+    def _open(self):
+        directory = os.path.dirname(self.baseFilename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        return super()._open()
+
+class NativeQueueListener(QueueListener):
+    """
+    QueueListener running in a native OS thread under gevent
+    
+    Greenlets only append records to an unpatched queue; the blocking file
+    and console writes (and handler locks) stay on this thread, so logging
+    never stalls or deadlocks the gevent hub. Threads do not survive fork, so
+    a forked child (gunicorn workers with preload_app) gets a fresh queue and
+    its own drain thread; otherwise its records would pile up unwritten.
+    """
+    
+    def __init__(self, *handlers):
+        super().__init__(self.new_queue(), *handlers, respect_handler_level=True)
+        # Handler the app logger writes through; follows the queue across fork
+        self.queue_handler = QueueHandler(self.queue)
+        self._pid = None
+        os.register_at_fork(after_in_child=self.restart_after_fork)
+    
+    @staticmethod
+    def new_queue():
+        return cooperative.original('queue', 'SimpleQueue')()
+    
+    def start(self):
+        self._pid = os.getpid()
+        cooperative.original('_thread', 'start_new_thread')(self._monitor, ())
+    
+    def restart_after_fork(self):
+        """Start this process's drain thread (records queued before fork are the parent's)"""
+        if self._pid is None or self._pid == os.getpid():
+            return
+        self.queue = self.new_queue()
+        self.queue_handler.queue = self.queue
+        self.start()
 
 def setup_logger(app):
     """
@@ -10,10 +58,6 @@ def setup_logger(app):
     Args:
         app: Flask application instance
     """
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-    
     # Get log level from config
     log_level = getattr(logging, app.config['LOG_LEVEL'].upper(), logging.INFO)
     
@@ -23,9 +67,9 @@ def setup_logger(app):
         format=app.config['LOG_FORMAT']
     )
     
-    # File handler with rotation
-    file_handler = RotatingFileHandler(
-        f"logs/{app.config['LOG_FILE']}",
+    # File handler with rotation; logs/ and the file are created on first write
+    file_handler = LazyRotatingFileHandler(
+        os.path.join('logs', app.config['LOG_FILE']),
         maxBytes=10485760,  # 10MB
         backupCount=10
     )
@@ -37,13 +81,20 @@ def setup_logger(app):
     console_handler.setLevel(log_level)
     console_handler.setFormatter(logging.Formatter(app.config['LOG_FORMAT']))
     
+    handlers = [file_handler, console_handler]
+    if cooperative.is_patched():
+        # gevent mode: hand records to a native thread instead of writing inline
+        listener = NativeQueueListener(*handlers)
+        listener.start()
+        handlers = [listener.queue_handler]
+    
     # Add handlers to app logger
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(console_handler)
+    for handler in handlers:
+        app.logger.addHandler(handler)
     app.logger.setLevel(log_level)
     
     # Log startup message
     app.logger.info("="*50)
     app.logger.info("Task Management Application Starting")
     app.logger.info(f"Log Level: {app.config['LOG_LEVEL']}")
-    app.logger.info("="*50)
\ No newline at end of file
+    app.logger.info("="*50)
@@ -0,0 +1,257 @@
+# utils/profiler.py - Opt-in per-request profiling
+import cProfile
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from flask import g, request
+from pymongo import monitoring
+from database import Database
+from utils.timestamps import utcnow
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Record MongoDB commands issued by the thread serving a profiled request"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def start(self):
+        self._local.commands = []
+        self._local.pending = {}
+
+    def stop(self):
+        commands = getattr(self._local, 'commands', None) or []
+        self._local.commands = None
+        self._local.pending = None
+        return commands
+
+    def started(self, event):
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            return
+        pending[event.request_id] = {
+            'command': event.command_name,
+            'database': event.database_name,
+            'collection': event.command.get(event.command_name),
+            'started_at': time.perf_counter()
+        }
+
+    def _finish(self, event, ok):
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            return
+        entry = pending.pop(event.request_id, None)
+        if entry is None:
+            return
+        entry.pop('started_at')
+        entry['duration_ms'] = event.duration_micros / 1000.0
+        entry['ok'] = ok
+        if not isinstance(entry['collection'], str):
+            entry['collection'] = None
+        self._local.commands.append(entry)
+
+    def succeeded(self, event):
+        self._finish(event, True)
+
+    def failed(self, event):
+        self._finish(event, False)
+
+
+class StackSampler:
+    """Statistical profiler sampling one thread's stack into folded stacks"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        """Return stacks in the collapsed format used by flamegraph.pl and speedscope"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileRing:
+    """Bounded on-disk store of profiles; the oldest profiles are removed first"""
+
+    def __init__(self, directory, max_profiles):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def write(self, metadata, profile_data, extension):
+        """
+        Write one profile and its metadata, pruning old entries
+
+        Args:
+            metadata: JSON serializable request/command metadata
+            profile_data: Profile contents (str for folded stacks, cProfile.Profile otherwise)
+            extension: File extension of the profile file
+
+        Returns:
+            Profile ID
+        """
+        with self._lock:
+            self._sequence += 1
+            profile_id = f"{utcnow().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}-{self._sequence}"
+
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory)
+
+            base = os.path.join(self.directory, profile_id)
+            if isinstance(profile_data, str):
+                with open(f"{base}.{extension}", 'w') as f:
+                    f.write(profile_data)
+            else:
+                profile_data.dump_stats(f"{base}.{extension}")
+
+            with open(f"{base}.json", 'w') as f:
+                json.dump(metadata, f, indent=2, default=str)
+
+            self._prune()
+
+        return profile_id
+
+    def _prune(self):
+        profiles = sorted(
+            name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json')
+        )
+        for profile_id in profiles[:max(0, len(profiles) - self.max_profiles)]:
+            for name in os.listdir(self.directory):
+                if name.startswith(f"{profile_id}."):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+
+
+def register_profiler(app):
+    """
+    Install profiling hooks on the application
+
+    Nothing is registered unless PROFILING_ENABLED is set, so the disabled
+    path costs nothing. Must be called before the database is initialized
+    so the command listener is attached to the MongoClient.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('PROFILING_ENABLED'):
+        return
+
+    recorder = CommandRecorder()
+    Database.add_event_listener(recorder)
+
+    ring = ProfileRing(app.config['PROFILING_OUTPUT_DIR'], app.config['PROFILING_MAX_PROFILES'])
+    header = app.config['PROFILING_HEADER']
+    admin_token = app.config.get('ADMIN_TOKEN')
+    sample_rate = app.config['PROFILING_SAMPLE_RATE']
+    mode = app.config['PROFILING_MODE']
+    interval = app.config['PROFILING_SAMPLE_INTERVAL_MS'] / 1000.0
+
+    def should_profile():
+        token = request.headers.get(header)
+        # Constant-time comparison, as in utils/auth.py
+        if token and admin_token and hmac.compare_digest(token.encode(), admin_token.encode()):
+            return True
+        return sample_rate > 0 and random.random() < sample_rate
+
+    @app.before_request
+    def start_profile():
+        if not should_profile():
+            return
+
+        try:
+            if mode == 'cprofile':
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                profiler = StackSampler(threading.get_ident(), interval)
+                profiler.start()
+        except ValueError as e:
+            # Only one cProfile can be active per process
+            logger.warning(f"Profiling skipped: {str(e)}")
+            return
+
+        recorder.start()
+
+        g.profiler = profiler
+        g.profile_started = time.perf_counter()
+
+    @app.after_request
+    def finish_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+
+        elapsed = time.perf_counter() - g.pop('profile_started')
+        if mode == 'cprofile':
+            profiler.disable()
+            profile_data, extension = profiler, 'prof'
+        else:
+            profiler.stop()
+            profile_data, extension = profiler.folded(), 'folded'
+
+        commands = recorder.stop()
+        metadata = {
+            'method': request.method,
+            'path': request.full_path,
+            'status_code': response.status_code,
+            'duration_ms': round(elapsed * 1000, 3),
+            'mode': mode,
+            'mongo_commands': commands,
+            'mongo_time_ms': round(sum(command['duration_ms'] for command in commands), 3)
+        }
+
+        try:
+            profile_id = ring.write(metadata, profile_data, extension)
+            response.headers['X-Profile-Id'] = profile_id
+            logger.info(f"Request profiled: {request.method} {request.path} -> {profile_id}")
+        except Exception as e:
+            logger.warning(f"Failed to write profile: {str(e)}")
+
+        return response
+
+    @app.teardown_request
+    def discard_profile(error=None):
+        # Requests that failed before after_request still need the sampler stopped
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        if mode == 'cprofile':
+            profiler.disable()
+        else:
+            profiler.stop()
+        recorder.stop()
+
+    logger.info(f"Request profiling enabled (mode={mode}, sample_rate={sample_rate})")
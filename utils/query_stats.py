@@ -0,0 +1,312 @@
+# utils/query_stats.py - Slow-query log with query-shape aggregation
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import monitoring
+from database import Database
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Commands that carry no query shape worth tracking
+IGNORED_COMMANDS = frozenset([
+    'hello', 'ismaster', 'isMaster', 'ping', 'buildInfo', 'saslStart', 'saslContinue',
+    'endSessions', 'explain', 'getMore', 'killCursors', 'listIndexes', 'createIndexes'
+])
+
+# Driver-added fields that must not be replayed in an explain
+SESSION_FIELDS = frozenset([
+    'lsid', '$db', '$clusterTime', 'txnNumber', '$readPreference', 'readConcern',
+    'writeConcern', 'startTransaction', 'autocommit', 'apiVersion'
+])
+
+
+def skip_bucket(skip):
+    """Bucket a skip value by order of magnitude (0, 1-9, 10-99, ...)"""
+    if not skip:
+        return '0'
+    lower = 10 ** (len(str(int(skip))) - 1)
+    return f'{lower}-{lower * 10 - 1}'
+
+
+def filter_shape(query):
+    """
+    Describe a filter document by its keys and operators, dropping values
+
+    Example: {'priority': 'high', 'due_date': {'$lt': x}} -> 'due_date.$lt,priority'
+    """
+    if not isinstance(query, dict):
+        return ''
+
+    parts = []
+    for key, value in query.items():
+        if key in ('$and', '$or', '$nor') and isinstance(value, list):
+            parts.append(f"{key}({'|'.join(filter_shape(item) for item in value)})")
+        elif isinstance(value, dict) and value and all(k.startswith('$') for k in value):
+            parts.extend(f'{key}.{operator}' for operator in sorted(value))
+        else:
+            parts.append(key)
+    return ','.join(sorted(parts))
+
+
+def sort_shape(sort):
+    """Describe a sort document, e.g. 'created_at:-1'"""
+    if not sort:
+        return ''
+    return ','.join(f'{key}:{direction}' for key, direction in sort.items())
+
+
+def normalize_command(command_name, command):
+    """
+    Normalize a MongoDB command to a query shape
+
+    Args:
+        command_name: Command name (find, aggregate, update, ...)
+        command: Command document as sent by the driver
+
+    Returns:
+        Shape string, or None for commands that are not tracked
+    """
+    if command_name in IGNORED_COMMANDS:
+        return None
+
+    collection = command.get(command_name)
+    shape = [command_name, str(collection)]
+
+    if command_name == 'find':
+        shape.append(f"filter={filter_shape(command.get('filter'))}")
+        shape.append(f"sort={sort_shape(command.get('sort'))}")
+        shape.append(f"skip={skip_bucket(command.get('skip'))}")
+    elif command_name == 'aggregate':
+        stages = []
+        for stage in command.get('pipeline', []):
+            name = next(iter(stage), '')
+            if name == '$match':
+                stages.append(f'$match({filter_shape(stage[name])})')
+            elif name == '$sort':
+                stages.append(f'$sort({sort_shape(stage[name])})')
+            elif name == '$skip':
+                stages.append(f'$skip({skip_bucket(stage[name])})')
+            else:
+                stages.append(name)
+        shape.append(f"pipeline={'>'.join(stages)}")
+    elif command_name in ('update', 'delete'):
+        statements = command.get('updates' if command_name == 'update' else 'deletes') or []
+        first = statements[0] if statements else {}
+        shape.append(f"filter={filter_shape(first.get('q'))}")
+    elif command_name in ('findAndModify', 'count', 'distinct'):
+        shape.append(f"filter={filter_shape(command.get('query'))}")
+
+    return ' '.join(shape)
+
+
+def explainable_command(command_name, command):
+    """Strip driver fields from a read command so it can be explained"""
+    if command_name not in ('find', 'aggregate', 'count', 'distinct'):
+        return None
+    return {key: value for key, value in command.items() if key not in SESSION_FIELDS}
+
+
+def summarize_plan(explain_result):
+    """
+    Summarize an explain result as its winning stage chain
+
+    Example: 'LIMIT > FETCH > IXSCAN(priority_1)'
+    """
+    planner = explain_result.get('queryPlanner')
+    if planner is None:
+        # Aggregations nest the planner inside the first stage
+        for stage in explain_result.get('stages', []):
+            if '$cursor' in stage:
+                planner = stage['$cursor'].get('queryPlanner')
+                break
+    if not planner:
+        return 'unavailable'
+
+    stages = []
+    plan = planner.get('winningPlan', {})
+    plan = plan.get('queryPlan', plan)
+    while plan:
+        stage = plan.get('stage', '?')
+        if plan.get('indexName'):
+            stage = f"{stage}({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get('inputStage') or (plan.get('inputStages') or [None])[0]
+
+    summary = ' > '.join(stages)
+    rejected = len(planner.get('rejectedPlans', []))
+    if rejected:
+        summary += f' [{rejected} rejected]'
+    return summary
+
+
+class ShapeStats:
+    """Aggregated timings for one query shape"""
+
+    def __init__(self, sample_size):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_count = 0
+        self.samples = deque(maxlen=sample_size)
+        self.last_plan = None
+
+    def record(self, duration_ms, slow):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.samples.append(duration_ms)
+        if slow:
+            self.slow_count += 1
+
+    def p95_ms(self):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def to_dict(self, shape):
+        return {
+            'shape': shape,
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p95_ms': round(self.p95_ms(), 3),
+            'max_ms': round(self.max_ms, 3),
+            'slow_count': self.slow_count,
+            'plan': self.last_plan
+        }
+
+
+class QueryStatsListener(monitoring.CommandListener):
+    """Aggregate command durations per query shape and log slow commands"""
+
+    SORT_KEYS = {
+        'total': lambda item: item[1].total_ms,
+        'count': lambda item: item[1].count,
+        'p95': lambda item: item[1].p95_ms(),
+        'max': lambda item: item[1].max_ms
+    }
+
+    def __init__(self, slow_threshold_ms=100, max_shapes=500, sample_size=1000, explain=True):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.max_shapes = max_shapes
+        self.sample_size = sample_size
+        self.explain = explain
+        self._shapes = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='explain') if explain else None
+        self._explaining = set()
+
+    def started(self, event):
+        shape = normalize_command(event.command_name, event.command)
+        if shape is None:
+            return
+        self._pending[(event.connection_id, event.request_id)] = (shape, event.command, event.database_name)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+
+        shape, command, database_name = pending
+        duration_ms = event.duration_micros / 1000.0
+        slow = duration_ms >= self.slow_threshold_ms
+
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    return
+                stats = self._shapes[shape] = ShapeStats(self.sample_size)
+            stats.record(duration_ms, slow)
+
+        if slow:
+            logger.warning(f"Slow query ({duration_ms:.1f} ms): {shape}")
+            self._schedule_explain(shape, event.command_name, command, database_name)
+
+    def _schedule_explain(self, shape, command_name, command, database_name):
+        if self._explainer is None:
+            return
+
+        explainable = explainable_command(command_name, command)
+        if explainable is None:
+            return
+
+        with self._lock:
+            # One explain per shape in flight; listeners must never block the caller
+            if shape in self._explaining:
+                return
+            self._explaining.add(shape)
+
+        self._explainer.submit(self._explain, shape, explainable, database_name)
+
+    def _explain(self, shape, command, database_name):
+        try:
+            result = Database.get_client()[database_name].command(
+                {'explain': command, 'verbosity': 'queryPlanner'}
+            )
+            summary = summarize_plan(result)
+            logger.warning(f"Slow query plan for {shape}: {summary}")
+
+            with self._lock:
+                if shape in self._shapes:
+                    self._shapes[shape].last_plan = summary
+        except Exception as e:
+            logger.warning(f"Failed to explain slow query {shape}: {str(e)}")
+        finally:
+            with self._lock:
+                self._explaining.discard(shape)
+
+    def top_shapes(self, limit=10, sort_by='total'):
+        """
+        Get the most expensive query shapes
+
+        Args:
+            limit: Number of shapes to return
+            sort_by: One of total, count, p95, max
+
+        Returns:
+            List of shape statistics dictionaries
+        """
+        key = self.SORT_KEYS.get(sort_by)
+        if key is None:
+            raise ValueError(f"sort_by must be one of: {', '.join(self.SORT_KEYS)}")
+
+        with self._lock:
+            items = sorted(self._shapes.items(), key=key, reverse=True)[:limit]
+            return [stats.to_dict(shape) for shape, stats in items]
+
+    def reset(self):
+        """Clear all aggregated statistics"""
+        with self._lock:
+            self._shapes.clear()
+
+
+def register_query_stats(app):
+    """
+    Attach the query-shape listener to the database client
+
+    Must be called before the database is initialized.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('QUERY_STATS_ENABLED'):
+        return
+
+    listener = QueryStatsListener(
+        slow_threshold_ms=app.config['SLOW_QUERY_THRESHOLD_MS'],
+        max_shapes=app.config['QUERY_STATS_MAX_SHAPES'],
+        sample_size=app.config['QUERY_STATS_SAMPLE_SIZE'],
+        explain=app.config['SLOW_QUERY_EXPLAIN']
+    )
+    Database.add_event_listener(listener)
+    app.extensions['query_stats'] = listener
@@ -0,0 +1,70 @@
+# utils/sessions.py - Causally consistent MongoDB sessions per request
+from bson.timestamp import Timestamp
+from flask import g, has_request_context, request
+from database import Database
+import logging
+
+logger = logging.getLogger(__name__)
+
+def parse_operation_time(value):
+    """Parse an operation time token of the form '<seconds>.<increment>'"""
+    if not value:
+        return None
+    try:
+        seconds, increment = value.split('.', 1)
+        return Timestamp(int(seconds), int(increment))
+    except (ValueError, TypeError):
+        return None
+
+def format_operation_time(timestamp):
+    """Format an operation time as '<seconds>.<increment>'"""
+    return f"{timestamp.time}.{timestamp.inc}"
+
+def current_session():
+    """MongoDB session bound to the current request, if any"""
+    if has_request_context():
+        return g.get('mongo_session')
+    return None
+
+def register_causal_sessions(app):
+    """
+    Run each request in a causally consistent session
+    
+    The session's operation time is returned in a response header. Clients
+    send it back on their next request so reads routed to secondaries wait
+    until they have caught up with the client's own writes.
+    
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('CAUSAL_CONSISTENCY'):
+        return
+    
+    header = app.config['OPERATION_TIME_HEADER']
+    
+    @app.before_request
+    def start_session():
+        try:
+            session = Database.get_client().start_session(causal_consistency=True)
+        except Exception as e:
+            logger.warning(f"Failed to start causal session: {str(e)}")
+            return
+        
+        operation_time = parse_operation_time(request.headers.get(header))
+        if operation_time is not None:
+            session.advance_operation_time(operation_time)
+        
+        g.mongo_session = session
+    
+    @app.after_request
+    def expose_operation_time(response):
+        session = g.get('mongo_session')
+        if session is not None and session.operation_time is not None:
+            response.headers[header] = format_operation_time(session.operation_time)
+        return response
+    
+    @app.teardown_request
+    def end_session(error=None):
+        session = g.pop('mongo_session', None)
+        if session is not None:
+            session.end_session()
@@ -0,0 +1,53 @@
+# utils/tenancy.py - Tenant resolution and routing
+import re
+from flask import current_app, g, has_request_context, request
+from config import Config
+
+TENANT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def validate_tenant_id(tenant_id):
+    """Validate a tenant identifier (also used in collection names)"""
+    if not isinstance(tenant_id, str) or not TENANT_ID_PATTERN.match(tenant_id):
+        raise ValueError('Tenant ID must be 1-64 letters, digits, underscores or hyphens')
+    # tasks_<tenant> must never look like (or be) another collection's archive
+    if f'_{tenant_id}'.endswith(Config.ARCHIVE_COLLECTION_SUFFIX):
+        raise ValueError(f'Tenant ID must not end with {Config.ARCHIVE_COLLECTION_SUFFIX!r}')
+    return tenant_id
+
+def resolve_tenant():
+    """
+    Resolve the tenant of the current request from the tenant header
+    
+    Returns:
+        Tenant ID (the configured default when the header is absent)
+        
+    Raises:
+        ValueError: If the header holds an invalid tenant ID
+    """
+    tenant_id = request.headers.get(current_app.config['TENANT_HEADER'])
+    if not tenant_id:
+        return current_app.config['DEFAULT_TENANT']
+    return validate_tenant_id(tenant_id)
+
+def get_current_tenant():
+    """Tenant resolved for the current request, if any"""
+    if has_request_context():
+        return g.get('tenant')
+    return None
+
+def tenant_collection_name(base_name, tenant_id, mode, default_tenant):
+    """
+    Name of the collection holding a tenant's documents
+    
+    Args:
+        base_name: Shared collection name
+        tenant_id: Tenant ID
+        mode: 'shared' or 'collection'
+        default_tenant: Tenant that keeps using the base collection
+        
+    Returns:
+        Collection name
+    """
+    if mode != 'collection' or tenant_id == default_tenant:
+        return base_name
+    return f'{base_name}_{tenant_id}'
@@ -0,0 +1,61 @@
+# utils/timestamps.py - ISO-8601 timestamp codec with UTC handling
+from datetime import datetime, timezone
+from functools import lru_cache
+
+UTC = timezone.utc
+
+
+def utcnow():
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(UTC)
+
+
+def to_utc(value):
+    """
+    Normalize a datetime to timezone-aware UTC
+
+    Naive datetimes are assumed to already be in UTC, which is how MongoDB
+    stores them.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    if value.utcoffset():
+        return value.astimezone(UTC)
+    return value
+
+
+@lru_cache(maxsize=4096)
+def parse_iso_or_none(value):
+    """
+    Parse an ISO-8601 string to an aware UTC datetime
+
+    Results are memoized: imports and UIs send the same due dates over and
+    over. Returns None for strings that are not valid ISO timestamps.
+    """
+    try:
+        return to_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    except ValueError:
+        return None
+
+
+def parse_iso(value):
+    """
+    Parse an ISO-8601 string to an aware UTC datetime
+
+    Raises:
+        ValueError: If the value is not a valid ISO timestamp string
+    """
+    if not isinstance(value, str):
+        raise ValueError(f'Invalid ISO timestamp: {value!r}')
+
+    parsed = parse_iso_or_none(value)
+    if parsed is None:
+        raise ValueError(f'Invalid ISO timestamp: {value!r}')
+    return parsed
+
+
+def format_iso(value):
+    """Format a datetime as an ISO-8601 UTC string (None passes through)"""
+    if value is None:
+        return None
+    return to_utc(value).isoformat()
@@ -1,67 +1,255 @@
 # utils/validators.py - Data validation functions
+import re
+from datetime import datetime
 from config import Config
+from utils.timestamps import parse_iso_or_none
+
+# Tags are identifiers: letters or digits first, then letters, digits, '_',
+# '-', ':' or '.' (no commas, which separate tags in ?tags= filters)
+TAG_PATTERN = re.compile(rf'[a-z0-9][a-z0-9_:.-]{{0,{Config.TAG_MAX_LENGTH - 1}}}', re.IGNORECASE)
+TAG_ERROR = (f"Tags must be 1-{Config.TAG_MAX_LENGTH} characters: letters, digits, '_', '-', ':' or '.', "
+             "starting with a letter or digit")
+TASK_ID_PATTERN = re.compile(r'[0-9a-f]{24}', re.IGNORECASE)
+
+# Declarative task schema. Fields are checked in this order and the first
+# error wins, so messages stay stable for clients. List fields hold strings
+# matching item_pattern.
+TASK_SCHEMA = {
+    'title': {'type': str, 'required': True, 'max_length': 200, 'label': 'Title'},
+    'description': {'type': str, 'max_length': 1000, 'label': 'Description'},
+    'priority': {'enum': Config.VALID_PRIORITIES, 'label': 'Priority'},
+    'status': {'enum': Config.VALID_STATUSES, 'label': 'Status'},
+    'completed': {'type': bool, 'label': 'Completed'},
+    'due_date': {'type': datetime, 'nullable': True, 'label': 'Due date'},
+    'tags': {
+        'type': list, 'max_items': Config.MAX_TAGS_PER_TASK, 'label': 'Tags',
+        'item_pattern': TAG_PATTERN, 'item_error': TAG_ERROR,
+        'bson_items': {'bsonType': 'string', 'maxLength': Config.TAG_MAX_LENGTH}
+    },
+    'depends_on': {
+        'type': list, 'max_items': Config.MAX_DEPENDENCIES, 'label': 'Dependencies',
+        'item_pattern': TASK_ID_PATTERN, 'item_error': 'Dependencies must be task IDs',
+        'bson_items': {'bsonType': 'objectId'}
+    }
+}
+
+VALID_PRIORITIES = frozenset(Config.VALID_PRIORITIES)
+VALID_STATUSES = frozenset(Config.VALID_STATUSES)
+# Task list sort keys accepted by every storage backend ('priority' sorts by priority_rank)
+SORT_FIELDS = ('created_at', 'updated_at', 'due_date', 'completed_at', 'priority', 'status', 'title')
+
+DUE_DATE_ERROR = 'Invalid due_date format. Use ISO format'
+
+def parse_due_date(value):
+    """
+    Parse an ISO-8601 due date to an aware UTC datetime
+
+    Args:
+        value: ISO formatted string
+
+    Returns:
+        datetime
+
+    Raises:
+        ValueError: If the value is not a valid ISO date string
+    """
+    if not isinstance(value, str):
+        raise ValueError(DUE_DATE_ERROR)
+
+    parsed = parse_iso_or_none(value)
+    if parsed is None:
+        raise ValueError(DUE_DATE_ERROR)
+    return parsed
+
+def normalize_tags(tags):
+    """Lowercase validated tags and drop duplicates, keeping the first occurrence order"""
+    return list(dict.fromkeys(tag.lower() for tag in tags))
+
+def validate_tag(tag):
+    """Validate one tag (as used in filters)"""
+    return isinstance(tag, str) and TAG_PATTERN.fullmatch(tag) is not None
 
 def validate_priority(priority):
     """Validate priority value"""
-    return priority in Config.VALID_PRIORITIES
+    return isinstance(priority, str) and priority in VALID_PRIORITIES
 
 def validate_status(status):
     """Validate status value"""
-    return status in Config.VALID_STATUSES
+    return isinstance(status, str) and status in VALID_STATUSES
+
+def validate_sort_field(sort_by):
+    """Validate a task list sort key"""
+    return isinstance(sort_by, str) and sort_by in SORT_FIELDS
+
+# Rule kinds of a compiled schema field, most common first
+STRING, ENUM, BOOL, DATE, LIST = range(5)
+
+VALID = (True, None)
+
+def _field_rule(field, rules):
+    """
+    Precompute one schema field's checks
+
+    Returns:
+        Tuple of (field, kind, checks, missing_error), where checks holds the
+        kind's prebuilt lookups and (False, message) error tuples and
+        missing_error is set for required fields
+    """
+    label = rules['label']
+    expected_type = rules.get('type')
+
+    def error(text):
+        return (False, text)
+
+    if 'enum' in rules:
+        kind = ENUM
+        checks = (frozenset(rules['enum']), error(f'{label} must be one of: {", ".join(rules["enum"])}'))
+    elif expected_type is datetime:
+        kind = DATE
+        checks = (error(DUE_DATE_ERROR),)
+    elif expected_type is bool:
+        kind = BOOL
+        checks = (error(f'{label} must be a boolean'),)
+    elif expected_type is list:
+        kind = LIST
+        checks = (
+            error(f'{label} must be a list of strings'),
+            int(rules['max_items']),
+            error(f"{label} may have at most {rules['max_items']} entries"),
+            rules['item_pattern'].fullmatch,
+            error(rules['item_error'])
+        )
+    else:
+        kind = STRING
+        checks = (
+            bool(rules.get('required')),
+            error(f'{label} cannot be empty'),
+            error(f'{label} is required'),
+            error(f'{label} must be a string'),
+            int(rules.get('max_length') or 0),
+            error(f"{label} must be {rules.get('max_length')} characters or less")
+        )
+
+    missing_error = error(f'{label} is required') if rules.get('required') else None
+    return (field, kind, checks, missing_error)
+
+class CompiledSchema:
+    """
+    Schema precomputed into per-field rule tuples
+
+    Validation loops over the rules with frozenset lookups, bound fullmatch
+    methods and prebuilt error tuples, so no messages or sets are built per
+    call.
+    """
+
+    def __init__(self, schema):
+        self.rules = tuple(_field_rule(field, rules) for field, rules in schema.items())
+
+    def validate(self, data, is_update=False):
+        """
+        Validate a payload against the schema
+
+        Returns:
+            Tuple of (is_valid, error_message) for the first failing field
+        """
+        for field, kind, checks, missing_error in self.rules:
+            if field not in data:
+                if missing_error is not None and not is_update:
+                    return missing_error
+                continue
+
+            value = data[field]
+            if kind == STRING:
+                required, empty_error, required_error, type_error, max_length, length_error = checks
+                if required and not value:
+                    return empty_error if is_update else required_error
+                if not isinstance(value, str):
+                    return type_error
+                if max_length and len(value) > max_length:
+                    return length_error
+            elif kind == ENUM:
+                if value.__class__ is not str or value not in checks[0]:
+                    return checks[1]
+            elif kind == BOOL:
+                if value is not True and value is not False:
+                    return checks[0]
+            elif kind == DATE:
+                # Nullable dates treat empty strings as "not set"
+                if value is not None and value != '' and (
+                        value.__class__ is not str or parse_iso_or_none(value) is None):
+                    return checks[0]
+            else:
+                type_error, max_items, count_error, fullmatch, item_error = checks
+                if value.__class__ is not list:
+                    return type_error
+                if len(value) > max_items:
+                    return count_error
+                for item in value:
+                    if item.__class__ is not str:
+                        return type_error
+                    if fullmatch(item) is None:
+                        return item_error
+
+        return VALID
+
+TASK_VALIDATOR = CompiledSchema(TASK_SCHEMA)
 
 def validate_task_data(data, is_update=False):
     """
     Validate task data
-    
+
     Args:
         data: Dictionary containing task data
         is_update: Boolean indicating if this is an update operation
-        
+
     Returns:
         Tuple of (is_valid, error_message)
     """
-    # Title validation
-    if not is_update:
-        if 'title' not in data or not data['title']:
-            return False, 'Title is required'
-        
-        if not isinstance(data['title'], str):
-            return False, 'Title must be a string'
-        
-        if len(data['title']) > 200:
-            return False, 'Title must be 200 characters or less'
-    else:
-        if 'title' in data:
-            if not data['title']:
-                return False, 'Title cannot be empty'
-            
-            if not isinstance(data['title'], str):
-                return False, 'Title must be a string'
-            
-            if len(data['title']) > 200:
-                return False, 'Title must be 200 characters or less'
-    
-    # Description validation
-    if 'description' in data:
-        if not isinstance(data['description'], str):
-            return False, 'Description must be a string'
-        
-        if len(data['description']) > 1000:
-            return False, 'Description must be 1000 characters or less'
-    
-    # Priority validation
-    if 'priority' in data:
-        if not validate_priority(data['priority']):
-            return False, f'Priority must be one of: {", ".join(Config.VALID_PRIORITIES)}'
-    
-    # Status validation
-    if 'status' in data:
-        if not validate_status(data['status']):
-            return False, f'Status must be one of: {", ".join(Config.VALID_STATUSES)}'
-    
-    # Completed validation
-    if 'completed' in data:
-        if not isinstance(data['completed'], bool):
-            return False, 'Completed must be a boolean'
-    
-    return True, None
\ No newline at end of file
+    return TASK_VALIDATOR.validate(data, is_update)
+
+def task_json_schema():
+    """
+    Build a MongoDB $jsonSchema validator from TASK_SCHEMA
+
+    Returns:
+        Dictionary usable as {'$jsonSchema': ...}
+    """
+    properties = {}
+
+    for field, rules in TASK_SCHEMA.items():
+        prop = {}
+
+        if 'enum' in rules:
+            prop['enum'] = list(rules['enum'])
+        elif rules.get('type') is str:
+            prop['bsonType'] = 'string'
+        elif rules.get('type') is bool:
+            prop['bsonType'] = 'bool'
+        elif rules.get('type') is datetime:
+            prop['bsonType'] = 'date'
+        elif rules.get('type') is list:
+            prop['bsonType'] = 'array'
+            prop['items'] = rules['bson_items']
+            prop['maxItems'] = rules['max_items']
+
+        if rules.get('nullable'):
+            prop['bsonType'] = [prop['bsonType'], 'null']
+        if rules.get('required'):
+            prop['minLength'] = 1
+        if rules.get('max_length'):
+            prop['maxLength'] = rules['max_length']
+
+        properties[field] = prop
+
+    properties['created_at'] = {'bsonType': 'date'}
+    properties['updated_at'] = {'bsonType': 'date'}
+    properties['completed_at'] = {'bsonType': ['date', 'null']}
+    properties['priority_rank'] = {'bsonType': ['int', 'null']}
+    properties['is_deleted'] = {'bsonType': 'bool'}
+    properties['deleted_at'] = {'bsonType': ['date', 'null']}
+
+    return {
+        'bsonType': 'object',
+        'required': sorted(field for field, rules in TASK_SCHEMA.items() if rules.get('required')),
+        'properties': properties
+    }
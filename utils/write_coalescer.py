@@ -0,0 +1,315 @@
+# utils/write_coalescer.py - Merge bursts of writes to the same document
+import threading
+import bson
+from pymongo import ReturnDocument
+from utils.sessions import current_session
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def set_op(fields):
+    """Coalescable operation setting literal field values"""
+    return ('set', fields)
+
+
+def stage_op(stage):
+    """Coalescable operation given as an update pipeline stage"""
+    return ('stage', stage)
+
+
+# Aggregation expression operators that replay_ops can evaluate
+EXPRESSION_OPERATORS = frozenset(['$literal', '$cond', '$eq', '$ne', '$not', '$ifNull'])
+
+
+def check_expression(expression):
+    """
+    Make sure an expression only uses operators replay_ops can evaluate
+
+    Raises:
+        ValueError: For any other operator
+    """
+    if isinstance(expression, list):
+        for item in expression:
+            check_expression(item)
+    elif isinstance(expression, dict):
+        for key, value in expression.items():
+            if key.startswith('$'):
+                if key not in EXPRESSION_OPERATORS:
+                    raise ValueError(f"Unsupported operator in coalesced write: {key}")
+                if key == '$literal':
+                    continue
+            check_expression(value)
+
+
+def check_stage(stage):
+    """
+    Make sure a pipeline stage can be replayed: a single $set of supported expressions
+
+    Raises:
+        ValueError: For other stages or operators
+    """
+    if list(stage) != ['$set']:
+        raise ValueError(f"Unsupported stage in coalesced write: {', '.join(stage)}")
+    for expression in stage['$set'].values():
+        check_expression(expression)
+
+
+def evaluate(expression, document):
+    """Evaluate an aggregation expression against a document, as the server would"""
+    if isinstance(expression, str) and expression.startswith('$'):
+        value = document
+        for part in expression[1:].split('.'):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+    if isinstance(expression, list):
+        return [evaluate(item, document) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+
+    if len(expression) == 1:
+        operator, args = next(iter(expression.items()))
+        if operator == '$literal':
+            return args
+        if operator == '$cond':
+            if isinstance(args, dict):
+                args = [args['if'], args['then'], args['else']]
+            condition, then, otherwise = args
+            return evaluate(then if _truthy(evaluate(condition, document)) else otherwise, document)
+        if operator in ('$eq', '$ne'):
+            left, right = evaluate(args, document)
+            return (left == right) == (operator == '$eq')
+        if operator == '$not':
+            return not _truthy(evaluate(args[0] if isinstance(args, list) else args, document))
+        if operator == '$ifNull':
+            values = evaluate(args, document)
+            return next((value for value in values[:-1] if value is not None), values[-1])
+
+    return {key: evaluate(value, document) for key, value in expression.items()}
+
+
+def _truthy(value):
+    """Aggregation truthiness: null, missing, false and zero are false"""
+    return value is not None and value is not False and value != 0
+
+
+def replay_ops(document, ops):
+    """
+    Apply queued operations to a document one by one
+
+    Yields the document as it stands after each operation, so every caller
+    of a coalesced batch can be given the state its own write produced.
+    """
+    for kind, value in ops:
+        if kind == 'set':
+            document = {**document, **value}
+        else:
+            # Every expression in a $set stage sees the stage's input document
+            document = {**document, **{
+                field: evaluate(expression, document) for field, expression in value['$set'].items()
+            }}
+        yield document
+
+
+def compile_pipeline(ops):
+    """
+    Compile queued operations into one update pipeline
+
+    Adjacent literal sets are merged (later values win); expression stages
+    such as toggles are kept in order, so applying the pipeline has the same
+    effect as applying every operation one after another.
+    """
+    pipeline = []
+    pending = None
+
+    for kind, value in ops:
+        if kind == 'set':
+            pending = {**(pending or {}), **value}
+            continue
+        if pending:
+            pipeline.append({'$set': {field: {'$literal': v} for field, v in pending.items()}})
+            pending = None
+        pipeline.append(value)
+
+    if pending:
+        pipeline.append({'$set': {field: {'$literal': v} for field, v in pending.items()}})
+
+    return pipeline
+
+
+class _Batch:
+    def __init__(self, collection, query, previous):
+        self.collection = collection
+        self.query = query
+        self.ops = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.previous = previous
+        self.results = None
+        self.error = None
+        self.session = None
+
+
+class WriteCoalescer:
+    """
+    Coalesce updates to the same document that arrive within a short window
+
+    The first caller for a document becomes the batch leader: it waits up to
+    window_ms for more operations, then applies them all in one
+    find_one_and_update with an update pipeline. The update returns the
+    document as it was before the batch, and the operations are replayed on
+    it in order, so every caller receives the document as it stood right
+    after its own write, exactly as if the requests had run one after
+    another. Batches for the same document are applied in arrival order.
+    """
+
+    def __init__(self, window_ms=5.0, max_batch=64):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._pending = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self.operations = 0
+        self.writes = 0
+        self.largest_batch = 0
+
+    def submit(self, collection, query, op):
+        """
+        Queue an update and wait for the batch that applies it
+
+        Args:
+            collection: Collection holding the document
+            query: Filter matching exactly one document
+            op: Operation from set_op() or stage_op()
+
+        Returns:
+            Document right after this operation, or None if nothing matched
+
+        Raises:
+            ValueError: If a stage uses an operator that cannot be replayed
+        """
+        if op[0] == 'stage':
+            check_stage(op[1])
+        # Filters may hold operator documents (e.g. {'$ne': True} before
+        # migrations finish), so key on their BSON encoding
+        key = (collection.full_name, bson.encode(query))
+
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = _Batch(collection, query, self._inflight.get(key))
+                self._pending[key] = batch
+                self._inflight[key] = batch
+            index = len(batch.ops)
+            batch.ops.append(op)
+            self.operations += 1
+            if len(batch.ops) >= self.max_batch:
+                batch.full.set()
+
+        if leader:
+            self._lead(key, batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+
+        self._advance_session(batch.session)
+        return batch.results[index] if batch.results is not None else None
+
+    def _lead(self, key, batch):
+        batch.full.wait(self.window)
+
+        with self._lock:
+            if self._pending.get(key) is batch:
+                del self._pending[key]
+
+        # Keep last-writer-wins across batches for the same document
+        if batch.previous is not None:
+            batch.previous.done.wait()
+            batch.previous = None
+
+        try:
+            batch.session = current_session()
+            before = batch.collection.find_one_and_update(
+                batch.query,
+                compile_pipeline(batch.ops),
+                return_document=ReturnDocument.BEFORE,
+                session=batch.session
+            )
+            if before is not None:
+                batch.results = list(replay_ops(before, batch.ops))
+        except Exception as e:
+            logger.error(f"Coalesced write failed: {str(e)}")
+            batch.error = e
+        finally:
+            with self._lock:
+                self.writes += 1
+                self.largest_batch = max(self.largest_batch, len(batch.ops))
+                if self._inflight.get(key) is batch:
+                    del self._inflight[key]
+            batch.done.set()
+
+    @staticmethod
+    def _advance_session(leader_session):
+        """Carry the leader's causal timestamps into the caller's own session"""
+        session = current_session()
+        if session is None or leader_session is None or session is leader_session:
+            return
+        if leader_session.cluster_time is not None:
+            session.advance_cluster_time(leader_session.cluster_time)
+        if leader_session.operation_time is not None:
+            session.advance_operation_time(leader_session.operation_time)
+
+    def stats(self):
+        """
+        Get coalescing metrics
+
+        Returns:
+            Dictionary with operations, writes, ratio and largest_batch
+        """
+        with self._lock:
+            return {
+                'operations': self.operations,
+                'writes': self.writes,
+                'coalescing_ratio': round(self.operations / self.writes, 3) if self.writes else None,
+                'largest_batch': self.largest_batch,
+                'window_ms': self.window * 1000.0
+            }
+
+    def reset(self):
+        """Clear the metrics"""
+        with self._lock:
+            self.operations = 0
+            self.writes = 0
+            self.largest_batch = 0
+
+
+def register_write_coalescing(app):
+    """
+    Route task updates and toggles through a write coalescer
+
+    Only the MongoDB storage backend coalesces; other backends apply writes
+    in memory and have nothing to batch.
+
+    Args:
+        app: Flask application instance
+    """
+    from storage import get_backend
+    from storage.mongo import MongoTaskBackend
+
+    backend = get_backend()
+    if not isinstance(backend, MongoTaskBackend):
+        return
+
+    if not app.config.get('WRITE_COALESCING_ENABLED'):
+        backend.coalescer = None
+        return
+
+    backend.coalescer = WriteCoalescer(
+        window_ms=app.config['WRITE_COALESCING_WINDOW_MS'],
+        max_batch=app.config['WRITE_COALESCING_MAX_BATCH']
+    )
+    app.extensions['write_coalescer'] = backend.coalescer
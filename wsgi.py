@@ -0,0 +1,12 @@
+# wsgi.py - WSGI entry point for production servers (gunicorn, uWSGI)
+from utils import cooperative
+
+# gevent mode: patch before anything else creates sockets, locks or threads
+if cooperative.requested():
+    cooperative.patch()
+
+import os
+from app import create_app
+from config import config
+
+app = create_app(config[os.environ.get('APP_CONFIG', 'production')])